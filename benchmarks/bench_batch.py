@@ -0,0 +1,54 @@
+"""批量占卜接口吞吐量基准
+
+用法：python benchmarks/bench_batch.py [行数]
+"""
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import divination_engine
+
+
+def make_triples(rows, seed=2024):
+    """生成随机输入数组"""
+    rng = random.Random(seed)
+    return tuple(array('l', (rng.randint(1, 9) for _ in range(rows))) for _ in range(3))
+
+
+def cross_check(n1, n2, n3, batch):
+    """与逐条标量算法逐行比对"""
+    for row in range(len(n1)):
+        expected = divination_engine.get_element_indexes(n1[row], n2[row], n3[row])
+        actual = (batch[0][row], batch[1][row], batch[2][row])
+        if tuple(int(x) for x in actual) != expected:
+            raise AssertionError(f"第{row}行结果不一致：{actual} != {expected}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n1, n2, n3 = make_triples(rows)
+    backend = "numpy" if divination_engine.np is not None else "array"
+
+    start = time.perf_counter()
+    scalar = [divination_engine.get_elements(a, b, c) for a, b, c in zip(n1, n2, n3)]
+    scalar_time = time.perf_counter() - start
+    del scalar
+
+    start = time.perf_counter()
+    batch = divination_engine.get_element_indexes_batch(n1, n2, n3)
+    batch_time = time.perf_counter() - start
+
+    cross_check(n1, n2, n3, batch)
+
+    print(f"行数：{rows}  批量后端：{backend}")
+    print(f"标量 get_elements：{scalar_time:.3f}s  {rows / scalar_time:,.0f} 行/秒")
+    print(f"批量 get_element_indexes_batch：{batch_time:.3f}s  {rows / batch_time:,.0f} 行/秒")
+    print(f"加速比：{scalar_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""掌诀解读目录内存分配基准
+
+对比旧版每次调用 get_element_details 都重建详情字典的做法与只读目录的做法，
+统计一次占卜（三掌详解、综合解读、简要信息）的耗时与临时内存峰值。
+
+用法：python benchmarks/bench_catalog.py [次数]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import divination_engine
+
+
+def legacy_get_element_details(element_name):
+    """旧版做法：每次调用都新建全部掌诀详情与默认详情字典"""
+    details = {name: dict(values) for name, values in divination_engine.ELEMENT_DETAILS.items()}
+    return details.get(element_name, dict(divination_engine.DEFAULT_DETAILS))
+
+
+def legacy_reading(n1, n2, n3):
+    """按旧版 calculate_divination 的调用次数查询详情"""
+    elements = divination_engine.get_elements(n1, n2, n3)
+    for element in elements:
+        legacy_get_element_details(element)
+    legacy_get_element_details(elements[2])
+    legacy_get_element_details(elements[2])
+    return elements
+
+
+def catalog_reading(n1, n2, n3):
+    """目录做法：同样的查询次数，只读共享记录"""
+    elements = divination_engine.get_elements(n1, n2, n3)
+    for element in elements:
+        divination_engine.get_element_details(element)
+    divination_engine.get_element_details(elements[2])
+    divination_engine.get_element_details(elements[2])
+    return elements
+
+
+def measure(func, rounds):
+    """返回 (每次耗时微秒, 单次调用临时内存峰值字节)"""
+    start = time.perf_counter()
+    for i in range(rounds):
+        func(i % 9 + 1, i // 9 % 9 + 1, i // 81 % 9 + 1)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    peak = 0
+    for i in range(729):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        func(i % 9 + 1, i // 9 % 9 + 1, i // 81 % 9 + 1)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return elapsed / rounds * 1e6, peak
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for label, func in (("旧版重建字典", legacy_reading), ("只读目录", catalog_reading)):
+        per_call, peak = measure(func, rounds)
+        print(f"{label}：{per_call:.2f} 微秒/次  临时内存峰值 {peak} 字节/次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""打包版冷启动基准
+
+依次启动单文件版与目录版（默认取 build_frozen.py 的输出），用 --profile-startup 让程序在首帧显示后退出，
+统计从创建进程到进程退出的总耗时以及程序内部记录的首帧时间。单文件版每次启动都要把归档解压到临时目录，
+两者之差即解压开销。无图形显示环境时可加 --batch，改为测量批量模式处理一行输入的耗时。
+
+用法：python benchmarks/bench_cold_start.py [--runs 10] [--batch] [--source] [可执行文件 ...]
+    --source 同时测量直接用当前 Python 运行源码的耗时
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_NAME = "小六壬占卜器"
+SUFFIX = ".exe" if sys.platform == "win32" else ""
+
+DEFAULT_TARGETS = (
+    ("单文件版", os.path.join(ROOT, "dist", "onefile", APP_NAME + SUFFIX)),
+    ("目录版", os.path.join(ROOT, "dist", "onedir", APP_NAME, APP_NAME + SUFFIX)),
+)
+
+
+def launch(command, batch, directory):
+    """启动一次，返回 (总耗时毫秒, 程序内首帧时间毫秒或 None)"""
+    report = os.path.join(directory, "startup.json")
+    if os.path.exists(report):
+        os.remove(report)
+    if batch:
+        args = command + ["--batch"]
+        start = time.perf_counter()
+        subprocess.run(args, input=b"1 2 3\n", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    else:
+        args = command + ["--profile-startup", report]
+        start = time.perf_counter()
+        subprocess.run(args, check=True)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    first_frame = None
+    if os.path.exists(report):
+        with open(report, encoding="utf-8") as f:
+            first_frame = json.load(f)["marks"].get("首帧显示")
+    return elapsed, first_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="打包版冷启动基准")
+    parser.add_argument("executables", nargs="*", help="要测量的可执行文件，默认取 dist/ 下的单文件版与目录版")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--batch", action="store_true", help="测量批量模式而非界面首帧（无图形显示环境时使用）")
+    parser.add_argument("--source", action="store_true", help="同时测量直接运行源码")
+    args = parser.parse_args()
+
+    targets = [(path, [path]) for path in args.executables] or \
+              [(label, [path]) for label, path in DEFAULT_TARGETS if os.path.exists(path)]
+    if args.source:
+        targets.append(("源码", [sys.executable, os.path.join(ROOT, "divination_app.py")]))
+    if not targets:
+        sys.exit("未找到打包版，请先运行 python build_frozen.py")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, command in targets:
+            results = [launch(command, args.batch, directory) for _ in range(args.runs)]
+            totals = [total for total, _ in results]
+            line = (f"{label}：中位数 {statistics.median(totals):.0f} 毫秒  最快 {min(totals):.0f}  "
+                    f"最慢 {max(totals):.0f}")
+            frames = [frame for _, frame in results if frame is not None]
+            if frames:
+                line += f"  首帧（程序内）中位数 {statistics.median(frames):.0f} 毫秒"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
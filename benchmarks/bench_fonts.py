@@ -0,0 +1,140 @@
+"""共享字体基准
+
+按主界面各字号的使用比例批量创建标签、按钮、输入框和文本框，对比每个控件各自传入字体元组
+与共用 FontRegistry 字体两种做法的创建耗时和进程内存增量，以及整体放大字体的耗时：
+元组字体只能销毁后按新字号重建控件，共享字体只需修改一次字号。需要图形显示环境。
+
+整个程序的启动耗时可用 python divination_app.py --profile-startup 对比。
+
+用法：python benchmarks/bench_fonts.py [控件组数]
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+import tkinter as tk
+from tkinter import scrolledtext
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fonts import FontRegistry
+
+# 主界面与对话框中各 (字号, 粗细) 的控件数量
+FONT_USAGE = ((11, 'normal', 12), (12, 'normal', 5), (10, 'normal', 5), (14, 'bold', 3), (9, 'normal', 2),
+              (24, 'bold', 2), (20, 'bold', 2), (13, 'normal', 2), (30, 'bold', 1), (16, 'bold', 1),
+              (14, 'normal', 1), (13, 'bold', 1), (11, 'bold', 1))
+
+
+def rss_kb():
+    """进程常驻内存（KB），不支持的平台返回 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize // 1024
+    return None
+
+
+def build(parent, groups, font_for):
+    """创建 groups 组控件，font_for(字号, 粗细) 给出字体"""
+    frame = tk.Frame(parent)
+    frame.pack(fill="both", expand=True)
+    for group in range(groups):
+        for index, (size, weight, count) in enumerate(FONT_USAGE):
+            font = font_for(size, weight)
+            for i in range(count):
+                kind = (group + index + i) % 4
+                if kind == 0:
+                    widget = tk.Label(frame, text="小六壬", font=font)
+                elif kind == 1:
+                    widget = tk.Button(frame, text="占卜", font=font)
+                elif kind == 2:
+                    widget = tk.Entry(frame, font=font, width=6)
+                else:
+                    widget = scrolledtext.ScrolledText(frame, font=font, width=8, height=1)
+                widget.grid(row=group, column=index * 3 + i)
+    return frame
+
+
+def measure(root, groups, font_for):
+    """返回 (创建并完成布局的耗时毫秒, 内存增量 KB)"""
+    before = rss_kb()
+    start = time.perf_counter()
+    frame = build(root, groups, font_for)
+    root.update()
+    elapsed = (time.perf_counter() - start) * 1000
+    after = rss_kb()
+    return frame, elapsed, (after - before) if before is not None and after is not None else None
+
+
+def run_variant(variant, groups):
+    """在当前进程中测量一种做法，返回 (创建耗时, 内存增量, 放大耗时, 共享字体数, 字体族)"""
+    root = tk.Tk()
+    root.geometry("1300x850")
+    fonts = FontRegistry(root)
+    if variant == "shared":
+        font_for = fonts.get
+    else:
+        family = fonts.family()
+        font_for = lambda size, weight: (family, size, weight)
+
+    # 预热：让 Tk 加载字体族，避免计入首次字体查找
+    build(root, 1, font_for).destroy()
+    frame, create_ms, memory_kb = measure(root, groups, font_for)
+
+    start = time.perf_counter()
+    if variant == "shared":
+        fonts.set_scale(1.2)
+    else:
+        # 元组字体只能按新字号重建控件
+        frame.destroy()
+        build(root, groups, lambda size, weight: (family, round(size * 1.2), weight))
+    root.update()
+    zoom_ms = (time.perf_counter() - start) * 1000
+    result = (create_ms, memory_kb, zoom_ms, len(fonts.fonts), fonts.family())
+    root.destroy()
+    return result
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--variant":
+        # 子进程：每种做法在独立进程中测量，内存增量互不影响
+        print(json.dumps(run_variant(sys.argv[2], int(sys.argv[3]))))
+        return
+
+    groups = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    widgets = groups * sum(count for _, _, count in FONT_USAGE)
+    results = {}
+    for variant in ("legacy", "shared"):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--variant", variant, str(groups)],
+                                capture_output=True, text=True, check=True).stdout
+        results[variant] = json.loads(output)
+
+    _, _, _, font_count, family = results["shared"]
+    print(f"{widgets} 个控件，共享字体 {font_count} 个（字体族：{family}）")
+    print(f"{'做法':<10}{'创建耗时':>12}{'内存增量':>12}{'放大 120%':>12}")
+    for variant, label in (("legacy", "字体元组"), ("shared", "共享字体")):
+        create_ms, memory_kb, zoom_ms, _, _ = results[variant]
+        memory = f"{memory_kb} KB" if memory_kb is not None else "—"
+        print(f"{label:<10}{create_ms:>10.1f} ms{memory:>12}{zoom_ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""二进制历史日志写入与扫描基准
+
+用法：python benchmarks/bench_history_log.py [记录数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import divination_engine
+import history_log
+
+
+def make_rows(count, seed=2024):
+    """生成随机占卜记录"""
+    rng = random.Random(seed)
+    table = divination_engine.READING_TABLE
+    start = 1_700_000_000
+    for i in range(count):
+        reading = table[rng.randrange(729)]
+        yield (start + i, *reading.numbers, *reading.indexes)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.log")
+
+        begin = time.perf_counter()
+        log = history_log.HistoryLog(path)
+        rows = make_rows(count)
+        while True:
+            chunk = [row for _, row in zip(range(100_000), rows)]
+            if not chunk:
+                break
+            log.append_many(chunk)
+        log.close()
+        write_time = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        counts = history_log.final_element_counts(path)
+        scan_time = time.perf_counter() - begin
+
+        size = os.path.getsize(path)
+        assert sum(counts) == count
+        print(f"记录数：{count}  文件大小：{size / 1e6:.1f} MB（{history_log.RECORD.size} 字节/条）")
+        print(f"写入：{write_time:.2f}s  {count / write_time:,.0f} 条/秒")
+        print(f"扫描统计最终掌诀：{scan_time:.3f}s  {count / scan_time:,.0f} 条/秒")
+
+
+if __name__ == "__main__":
+    main()
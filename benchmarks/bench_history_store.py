@@ -0,0 +1,68 @@
+"""SQLite 历史记录写入与虚拟化窗口查询基准
+
+写入指定条数的记录后，模拟历史窗口随机滚动与按日期跳转，统计每次取窗口的耗时。
+
+用法：python benchmarks/bench_history_store.py [记录数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import divination_engine
+import history_store
+import history_view
+
+VISIBLE_ROWS = 20
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(2024)
+    table = divination_engine.READING_TABLE
+    start = 1_700_000_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = history_store.HistoryStore(os.path.join(directory, "history.db"))
+
+        begin = time.perf_counter()
+        for i in range(count):
+            reading = table[rng.randrange(729)]
+            store.record(reading.numbers, reading.indexes, start + i * 60)
+        enqueue_time = time.perf_counter() - begin
+        store.flush()
+        write_time = time.perf_counter() - begin
+
+        min_id, max_id = store.id_range()
+        scroll = []
+        for _ in range(1000):
+            top = rng.randrange(max_id - min_id + 1)
+            begin = time.perf_counter()
+            store.fetch_window(max_id - top, VISIBLE_ROWS)
+            scroll.append((time.perf_counter() - begin) * 1000)
+
+        jump = []
+        for _ in range(1000):
+            begin = time.perf_counter()
+            record_id = store.id_at_or_before(start + rng.randrange(count) * 60)
+            store.fetch_window(record_id, VISIBLE_ROWS)
+            jump.append((time.perf_counter() - begin) * 1000)
+        store.close()
+
+    print(f"记录数：{count}")
+    print(f"写入：入队 {enqueue_time:.2f}s（界面线程开销）  全部落盘 {write_time:.2f}s  {count / write_time:,.0f} 条/秒")
+    for label, samples in (("随机滚动取窗口", scroll), ("按日期跳转", jump)):
+        print(f"{label}：p50 {percentile(samples, 0.5):.3f} ms  p99 {percentile(samples, 0.99):.3f} ms"
+              f"（预算 {history_view.FRAME_BUDGET_MS} ms）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""农历批量换算吞吐量基准
+
+按小时生成若干年的时间戳，对比逐条 LunarCalendar.get_lunar_date 与批量 lunar_numbers_batch
+（分别传入 datetime 列表与 UTC 秒数数组）。
+
+用法：python benchmarks/bench_lunar.py [年数]
+"""
+import os
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lunar_calendar
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    start = datetime(2000, 1, 1)
+    timestamps = [start + timedelta(hours=hour) for hour in range(years * 365 * 24)]
+    backend = "numpy" if lunar_calendar.np is not None else "array"
+
+    begin = time.perf_counter()
+    scalar = [lunar_calendar.LunarCalendar.get_lunar_date(value) for value in timestamps]
+    scalar_time = time.perf_counter() - begin
+
+    epoch = array('d', (value.timestamp() for value in timestamps))
+    if lunar_calendar.np is not None:
+        epoch = lunar_calendar.np.frombuffer(epoch)
+
+    count = len(timestamps)
+    print(f"时间戳：{count}（{years} 年逐小时）  批量后端：{backend}")
+    print(f"逐条 get_lunar_date：{scalar_time:.3f}s  {count / scalar_time:,.0f} 条/秒")
+
+    for label, values in (("datetime 列表", timestamps), ("UTC 秒数数组", epoch)):
+        begin = time.perf_counter()
+        batch = lunar_calendar.lunar_numbers_batch(values)
+        batch_time = time.perf_counter() - begin
+
+        for row in range(0, count, 997):
+            expected = (scalar[row]["月数字"], scalar[row]["日数字"], scalar[row]["时数字"])
+            actual = tuple(int(column[row]) for column in batch)
+            if actual != expected:
+                raise AssertionError(f"{timestamps[row]} 结果不一致：{actual} != {expected}")
+
+        print(f"批量 lunar_numbers_batch（{label}）：{batch_time:.3f}s  {count / batch_time:,.0f} 条/秒")
+
+
+if __name__ == "__main__":
+    main()
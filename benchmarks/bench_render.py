@@ -0,0 +1,116 @@
+"""结果区域渲染延迟基准
+
+模拟按住随机占卜快捷键连续占卜：每次占卜后处理一次界面事件（含重绘），对比旧版每次
+重写全部标签与文本框的做法与差量渲染的做法，统计每次占卜的端到端耗时。
+需要图形显示环境。
+
+用法：python benchmarks/bench_render.py [次数] [每次处理事件前连续占卜的次数]
+"""
+import os
+import random
+import sys
+import time
+import tkinter as tk
+from tkinter import scrolledtext
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import divination_engine
+from result_renderer import ResultRenderer
+
+
+def build_widgets(root):
+    """按主界面的结果区域创建三个掌诀标签、三个详解文本框和提示文本框"""
+    container = tk.Frame(root)
+    container.pack(fill="both", expand=True)
+    labels = []
+    texts = []
+    for i in range(3):
+        label = tk.Label(container, text="待推算", font=('Microsoft YaHei UI', 24, 'bold'), width=10, height=2)
+        label.grid(row=0, column=i)
+        text = scrolledtext.ScrolledText(container, height=15, width=30, font=('Microsoft YaHei UI', 12), wrap="word")
+        text.grid(row=1, column=i)
+        text.config(state='disabled')
+        labels.append(label)
+        texts.append(text)
+    hint = scrolledtext.ScrolledText(container, height=10, font=('Microsoft YaHei UI', 13), wrap="word")
+    hint.grid(row=2, column=0, columnspan=3, sticky="ew")
+    hint.config(state='disabled')
+    return labels, texts, hint
+
+
+def hint_for(reading):
+    n1, n2, n3 = reading.numbers
+    hints = f"✨ 占卜完成 ✨\n\n📊 输入数字：{n1}, {n2}, {n3}\n🎯 最终结果：{reading.elements[2]}\n\n"
+    return hints + divination_engine.get_brief_element_info(reading.elements[2])
+
+
+def legacy_render(widgets, reading):
+    """旧版做法：每次都重写全部控件"""
+    labels, texts, hint = widgets
+    for i, element in enumerate(reading.elements):
+        labels[i].config(text=element, fg="#ffffff", bg="#0f3460")
+        texts[i].config(state='normal')
+        texts[i].delete(1.0, tk.END)
+        texts[i].insert(1.0, reading.details[i])
+        texts[i].config(state='disabled')
+    hint.config(state='normal')
+    hint.delete(1.0, tk.END)
+    hint.insert(1.0, hint_for(reading))
+    hint.config(state='disabled')
+
+
+def make_diff_render(root, widgets):
+    renderer = ResultRenderer(root)
+    labels, texts, hint = widgets
+
+    def render(_, reading):
+        for i, element in enumerate(reading.elements):
+            renderer.set_label(labels[i], text=element, fg="#ffffff")
+            renderer.set_text(texts[i], reading.details[i])
+        renderer.set_text(hint, hint_for(reading))
+
+    return render, renderer
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(root, widgets, render, rounds, burst):
+    """返回每次占卜的耗时列表（毫秒），每 burst 次占卜处理一次事件"""
+    rng = random.Random(2024)
+    table = divination_engine.READING_TABLE
+    timings = []
+    for _ in range(rounds // burst):
+        start = time.perf_counter()
+        for _ in range(burst):
+            render(widgets, table[rng.randrange(len(table))])
+        root.update()
+        timings.append((time.perf_counter() - start) * 1000 / burst)
+    return timings
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    burst = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"无法创建窗口（需要图形显示环境）：{e}")
+
+    widgets = build_widgets(root)
+    root.update()
+
+    diff_render, renderer = make_diff_render(root, widgets)
+    for label, render in (("旧版全部重写", legacy_render), ("差量渲染", diff_render)):
+        timings = measure(root, widgets, render, rounds, burst)
+        print(f"{label}：平均 {sum(timings) / len(timings):.3f} 毫秒/次  "
+              f"p95 {percentile(timings, 0.95):.3f}  最大 {max(timings):.3f}")
+    print(f"差量渲染：刷新 {renderer.frames} 次，写入控件 {renderer.updates} 个，跳过未变控件 {renderer.skipped} 个")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
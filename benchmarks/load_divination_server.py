@@ -0,0 +1,110 @@
+"""占卜 HTTP 服务压测
+
+在本进程中启动服务（或通过 --url 连接已运行的服务），开启若干长连接并发发送请求，
+统计吞吐量与 p50/p99 延迟。
+
+用法：python benchmarks/load_divination_server.py [--connections 50] [--requests 200] [--batch 0] [--url http://127.0.0.1:8765]
+    --batch 为 0 时发送单次占卜请求，大于 0 时每个请求批量占卜该数量的数字组
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from divination_server import DivinationServer
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def build_request(host, rng, batch):
+    if not batch:
+        numbers = ",".join(str(rng.randint(1, 9)) for _ in range(3))
+        return (f"GET /reading?numbers={numbers} HTTP/1.1\r\nHost: {host}\r\n\r\n").encode("latin-1")
+    body = json.dumps({"numbers": [[rng.randint(1, 9) for _ in range(3)] for _ in range(batch)],
+                       "summary": False}).encode("utf-8")
+    return (f"POST /readings HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+
+
+async def read_response(reader):
+    """读取一个响应，返回状态码"""
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, count, batch, seed, latencies, errors):
+    """一个长连接上依次发送 count 个请求"""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            request = build_request(host, rng, batch)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        server = await DivinationServer("127.0.0.1", 0).start()
+        host, port = server.host, server.port
+
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, args.requests, args.batch, seed, latencies, errors)
+                           for seed in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        await server.close()
+
+    total = len(latencies)
+    readings = total * (args.batch or 1)
+    print(f"连接 {args.connections} 个，请求 {total} 个（{readings} 次占卜），耗时 {elapsed:.2f} 秒")
+    print(f"吞吐量：{total / elapsed:.0f} 请求/秒，{readings / elapsed:.0f} 占卜/秒")
+    print(f"延迟：p50 {percentile(latencies, 0.50):.2f} 毫秒  p99 {percentile(latencies, 0.99):.2f} 毫秒  "
+          f"最大 {max(latencies):.2f} 毫秒")
+    if errors:
+        print(f"失败请求：{len(errors)} 个")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="占卜 HTTP 服务压测")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200, help="每个连接发送的请求数")
+    parser.add_argument("--batch", type=int, default=0)
+    parser.add_argument("--url", help="已运行服务的地址，默认在本进程中启动服务")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""热点路径基准测试集
+
+覆盖掌诀推算（标量与批量）、掌诀详情、综合解读、农历换算、界面 calculate_divination、
+历史记录写入与导出吞吐量。每项重复若干轮取中位数，结果以 JSON 输出，并可与基线对比，
+任何一项慢于基线超过容差时以非零状态退出，便于发布前发现性能回退。
+
+界面项需要图形显示：没有 DISPLAY 时若系统装有 Xvfb 会自动启动虚拟显示，否则跳过并在结果中注明。
+运行时把 HOME 指向临时目录，不会读写真实的历史记录。
+
+用法：python benchmarks/suite.py [-o 结果.json] [--baseline 基线.json] [--tolerance 0.15] [--quick] [-k 名称片段]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime, timedelta
+
+# 在导入历史模块前隔离数据目录（history_store 在导入时确定默认路径）
+SANDBOX = tempfile.mkdtemp(prefix="divination_bench_")
+os.environ["HOME"] = os.environ["USERPROFILE"] = SANDBOX
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import divination_engine
+import history_export
+import lunar_calendar
+from history_log import HistoryLog
+from history_store import HistoryStore
+from lunar_calendar import LunarCalendar
+
+# 名称 -> (函数, 每轮次数, 快速模式每轮次数)
+CASES = {}
+
+
+def benchmark(name, number, quick=None):
+    """注册一个基准项：func(number) 执行 number 次操作，可返回跳过原因"""
+    def register(func):
+        CASES[name] = (func, number, quick or max(1, number // 10))
+        return func
+    return register
+
+
+def triples(count, seed=2024):
+    rng = random.Random(seed)
+    return [(rng.randint(1, 9), rng.randint(1, 9), rng.randint(1, 9)) for _ in range(count)]
+
+
+@benchmark("engine.get_elements", 100_000)
+def bench_get_elements(number):
+    get_elements = divination_engine.get_elements
+    for n1, n2, n3 in TRIPLES[:number]:
+        get_elements(n1, n2, n3)
+
+
+@benchmark("engine.get_element_indexes_batch", 1_000_000)
+def bench_batch(number):
+    columns = [array('l', column) for column in zip(*TRIPLES[:number])]
+    start = time.perf_counter()
+    divination_engine.get_element_indexes_batch(*columns)
+    return time.perf_counter() - start
+
+
+@benchmark("engine.get_element_details", 100_000)
+def bench_element_details(number):
+    get_element_details = divination_engine.get_element_details
+    elements = divination_engine.ELEMENTS
+    for i in range(number):
+        get_element_details(elements[i % 9])
+
+
+@benchmark("engine.generate_summary_analysis", 20_000)
+def bench_summary(number):
+    now = datetime(2024, 1, 1, 8, 0)
+    for n1, n2, n3 in TRIPLES[:number]:
+        elements = divination_engine.get_elements(n1, n2, n3)
+        divination_engine.generate_summary_analysis(n1, n2, n3, elements, now)
+
+
+@benchmark("engine.generate_summary_analysis.cold", 5_000)
+def bench_summary_cold(number):
+    now = datetime(2024, 1, 1, 8, 0)
+    cache = divination_engine.SUMMARY_CACHE
+    for n1, n2, n3 in TRIPLES[:number]:
+        cache.clear()
+        elements = divination_engine.get_elements(n1, n2, n3)
+        divination_engine.generate_summary_analysis(n1, n2, n3, elements, now)
+
+
+@benchmark("lunar.get_lunar_date", 50_000)
+def bench_lunar(number):
+    start = datetime(2000, 1, 1)
+    moments = [start + timedelta(hours=hour) for hour in range(number)]
+    begin = time.perf_counter()
+    for moment in moments:
+        LunarCalendar.get_lunar_date(moment)
+    return time.perf_counter() - begin
+
+
+@benchmark("lunar.lunar_numbers_batch", 500_000)
+def bench_lunar_batch(number):
+    timestamps = array('d', (946684800 + hour * 3600 for hour in range(number)))
+    begin = time.perf_counter()
+    lunar_calendar.lunar_numbers_batch(timestamps, tz_offset=28800)
+    return time.perf_counter() - begin
+
+
+@benchmark("history.store_record", 200_000)
+def bench_store(number):
+    with tempfile.TemporaryDirectory() as directory:
+        store = HistoryStore(os.path.join(directory, "history.db"))
+        table = divination_engine.READING_TABLE
+        begin = time.perf_counter()
+        for i in range(number):
+            reading = table[i % 729]
+            store.record(reading.numbers, reading.indexes, 1_700_000_000 + i)
+        store.flush()
+        elapsed = time.perf_counter() - begin
+        store.close()
+    return elapsed
+
+
+@benchmark("history.log_append", 200_000)
+def bench_log(number):
+    with tempfile.TemporaryDirectory() as directory:
+        log = HistoryLog(os.path.join(directory, "history.log"))
+        table = divination_engine.READING_TABLE
+        begin = time.perf_counter()
+        for i in range(number):
+            reading = table[i % 729]
+            log.append(reading.numbers, reading.indexes, 1_700_000_000 + i)
+        log.flush()
+        elapsed = time.perf_counter() - begin
+        log.close()
+    return elapsed
+
+
+def export_case(fmt):
+    def run(number):
+        store = export_store(number)
+        path = os.path.join(SANDBOX, f"export.{fmt}")
+        begin = time.perf_counter()
+        history_export.export_history(store, path, fmt)
+        return time.perf_counter() - begin
+    return run
+
+
+_export_stores = {}
+
+
+def export_store(number):
+    """按条数缓存一个已写入记录的临时数据库，供各导出格式共用"""
+    store = _export_stores.get(number)
+    if store is None:
+        store = HistoryStore(os.path.join(SANDBOX, f"export_{number}.db"))
+        table = divination_engine.READING_TABLE
+        for i in range(number):
+            reading = table[i % 729]
+            store.record(reading.numbers, reading.indexes, 1_700_000_000 + i * 60)
+        store.flush()
+        _export_stores[number] = store
+    return store
+
+
+for _fmt in history_export.FORMATS:
+    benchmark(f"history.export.{_fmt}", 200_000)(export_case(_fmt))
+
+
+def ensure_display():
+    """确保有可用的图形显示，返回 (是否可用, 需要结束的 Xvfb 进程或 None)"""
+    if sys.platform == "win32" or sys.platform == "darwin" or os.environ.get("DISPLAY"):
+        return True, None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return False, None
+    for number in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        process = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1400x900x24", "-nolisten", "tcp"],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return True, process
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+        process.kill()
+    return False, None
+
+
+_app = {}
+
+
+@benchmark("app.calculate_divination", 2_000, 200)
+def bench_calculate(number):
+    """通过界面输入框驱动 calculate_divination，每次占卜后处理一次界面事件"""
+    app = _app.get("app")
+    if app is None:
+        available, process = ensure_display()
+        if not available:
+            return "没有图形显示且未安装 Xvfb"
+        import tkinter as tk
+        from divination_app import DivinationApp
+        root = tk.Tk()
+        app = _app["app"] = DivinationApp(root)
+        _app["xvfb"] = process
+        root.update()
+
+    begin = time.perf_counter()
+    for n1, n2, n3 in TRIPLES[:number]:
+        for entry, value in zip(app.entry_widgets, (n1, n2, n3)):
+            entry.delete(0, "end")
+            entry.insert(0, str(value))
+        app.calculate_divination()
+        app.root.update()
+    return time.perf_counter() - begin
+
+
+def close_app():
+    app = _app.pop("app", None)
+    if app is not None:
+        app.close()
+        app.root.destroy()
+    process = _app.pop("xvfb", None)
+    if process is not None:
+        process.kill()
+
+
+def run_case(func, number, repeat):
+    """返回 (各轮每次操作耗时微秒列表, 跳过原因)"""
+    timings = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = func(number)
+        elapsed = time.perf_counter() - begin
+        if isinstance(result, str):
+            return [], result
+        if isinstance(result, float):
+            # 函数自行计时，不含准备数据的时间
+            elapsed = result
+        timings.append(elapsed / number * 1e6)
+    return timings, None
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "numpy": getattr(divination_engine.np, "__version__", None),
+        "commit": commit,
+        "time": datetime.now().isoformat(timespec="seconds")
+    }
+
+
+def compare(results, baseline, tolerance):
+    """与基线对比，返回回退的项目列表"""
+    regressions = []
+    print(f"\n与基线对比（容差 {tolerance:.0%}）")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or result.get("skipped") or base.get("skipped"):
+            continue
+        ratio = result["us_per_op"] / base["us_per_op"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  ⚠️ 回退"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            flag = "  ✅ 提升"
+        print(f"{name:<40}{base['us_per_op']:>12.3f} -> {result['us_per_op']:>10.3f} 微秒/次  {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热点路径基准测试集")
+    parser.add_argument("-o", "--output", help="结果 JSON 文件，默认只打印")
+    parser.add_argument("--baseline", help="基线结果 JSON 文件")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="允许慢于基线的比例，默认 0.15")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复轮数，取中位数")
+    parser.add_argument("--quick", action="store_true", help="缩小规模，快速检查")
+    parser.add_argument("-k", dest="keyword", help="只运行名称包含该片段的项目")
+    args = parser.parse_args()
+
+    global TRIPLES
+    largest = max(number for _, number, _ in CASES.values())
+    TRIPLES = triples(largest)
+
+    results = {}
+    try:
+        for name, (func, number, quick) in CASES.items():
+            if args.keyword and args.keyword not in name:
+                continue
+            count = quick if args.quick else number
+            timings, skipped = run_case(func, count, args.repeat)
+            if skipped:
+                results[name] = {"skipped": skipped}
+                print(f"{name:<40}跳过：{skipped}")
+                continue
+            results[name] = {
+                "us_per_op": round(statistics.median(timings), 4),
+                "min_us_per_op": round(min(timings), 4),
+                "ops_per_s": round(1e6 / statistics.median(timings)),
+                "number": count,
+                "repeat": args.repeat
+            }
+            print(f"{name:<40}{results[name]['us_per_op']:>12.3f} 微秒/次  {results[name]['ops_per_s']:>12,} 次/秒")
+    finally:
+        close_app()
+        for store in _export_stores.values():
+            store.close()
+        shutil.rmtree(SANDBOX, ignore_errors=True)
+
+    report = {"environment": environment(), "quick": args.quick, "results": results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} 项慢于基线：{', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""生成打包版
+
+先用 Cython 把占卜引擎与农历换算编译为扩展模块（未安装 Cython 时跳过，使用字节码），
+再按 divination_app.spec 的精简配置生成单文件版与目录版，完成后删除编译产物，
+以免开发时源码修改被旧的扩展模块遮蔽。
+
+用法：python build_frozen.py [--onefile | --onedir] [--no-compile]
+    输出到 dist/onefile/ 与 dist/onedir/，冷启动对比见 benchmarks/bench_cold_start.py
+"""
+import argparse
+import glob
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 编译为扩展模块的纯计算模块
+ENGINE_MODULES = ("divination_engine", "lunar_calendar")
+
+SPEC = os.path.join(ROOT, "divination_app.spec")
+
+
+def compile_engine():
+    """编译引擎模块，返回生成的文件列表；未安装 Cython 时返回空列表"""
+    try:
+        from Cython.Build import cythonize
+        from setuptools import Distribution
+    except ImportError:
+        print("未安装 Cython，引擎以字节码打包")
+        return []
+
+    sources = [os.path.join(ROOT, f"{module}.py") for module in ENGINE_MODULES]
+    extensions = cythonize(sources, compiler_directives={"language_level": 3}, quiet=True)
+    distribution = Distribution({"ext_modules": extensions})
+    command = distribution.get_command_obj("build_ext")
+    command.inplace = True
+    command.build_temp = os.path.join(ROOT, "build", "cython")
+    distribution.run_command("build_ext")
+
+    generated = []
+    for module in ENGINE_MODULES:
+        generated.append(os.path.join(ROOT, f"{module}.c"))
+        for pattern in (f"{module}.*.pyd", f"{module}.*.so"):
+            generated.extend(glob.glob(os.path.join(ROOT, pattern)))
+    return generated
+
+
+def build(onedir):
+    import PyInstaller.__main__
+
+    variant = "onedir" if onedir else "onefile"
+    args = [SPEC, "--noconfirm",
+            "--distpath", os.path.join(ROOT, "dist", variant),
+            "--workpath", os.path.join(ROOT, "build", variant)]
+    if onedir:
+        args += ["--", "--onedir"]
+    PyInstaller.__main__.run(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成精简的打包版")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--onefile", action="store_true", help="只生成单文件版")
+    group.add_argument("--onedir", action="store_true", help="只生成目录版")
+    parser.add_argument("--no-compile", action="store_true", help="不编译引擎，直接以字节码打包")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    generated = [] if args.no_compile else compile_engine()
+    try:
+        if not args.onedir:
+            build(onedir=False)
+        if not args.onefile:
+            build(onedir=True)
+    finally:
+        for path in generated:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
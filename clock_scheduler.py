@@ -0,0 +1,186 @@
+"""界面时钟调度
+
+整个界面只用一个 root.after 定时器：每次触发后按订阅的最细粒度计算到下一个整秒、整分、
+时辰交替（奇数整点）或零点的时间，恰好在边界之后触发，并通知该边界及更粗粒度的订阅者。
+窗口最小化时不再按秒触发，恢复显示后立即补上。
+
+LunarForecast 在空闲时预先算好下一个时辰（或次日零点）的农历数字与掌诀，
+边界到来时直接换上，“农历数字”按钮无需临时换算。
+"""
+from datetime import datetime, timedelta
+
+import divination_engine
+from lunar_calendar import SHICHEN_BY_HOUR, LunarCalendar
+
+# 粒度从细到粗
+GRANULARITIES = ("second", "minute", "shichen", "day")
+
+# 在边界之后多等的毫秒数，避免定时器略早触发时仍停在边界之前
+BOUNDARY_SLACK_MS = 2
+
+
+def next_boundary(granularity, now):
+    """now 之后第一个该粒度的边界时间"""
+    if granularity == "second":
+        return now.replace(microsecond=0) + timedelta(seconds=1)
+    if granularity == "minute":
+        return now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    if granularity == "shichen":
+        # 时辰在奇数整点交替（子时自 23 点起）
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        return hour + timedelta(hours=1 if now.hour % 2 == 0 else 2)
+    return datetime.combine(now.date(), datetime.min.time()) + timedelta(days=1)
+
+
+def boundary_key(granularity, now):
+    """同一区间内相同、跨过边界后改变的键"""
+    if granularity == "second":
+        return now.replace(microsecond=0)
+    if granularity == "minute":
+        return now.replace(second=0, microsecond=0)
+    if granularity == "shichen":
+        # 子时跨越零点（23 点至次日 1 点），后移一小时使同一时辰落在同一天
+        return (now + timedelta(hours=1)).date(), SHICHEN_BY_HOUR[now.hour]
+    return now.date()
+
+
+class ClockScheduler:
+    """单定时器时钟，callback(now) 在订阅粒度的边界触发"""
+
+    def __init__(self, root, clock=datetime.now):
+        self.root = root
+        self.clock = clock
+        # 粒度 -> 回调列表
+        self.subscribers = {granularity: [] for granularity in GRANULARITIES}
+        # 粒度 -> 上次触发时的边界键
+        self.keys = {}
+        self.ticks = 0
+        self._after = None
+        self.running = False
+
+    def subscribe(self, granularity, callback):
+        """订阅某一粒度的边界事件，立即以当前时间调用一次"""
+        self.subscribers[granularity].append(callback)
+        callback(self.clock())
+        if self.running:
+            self.reschedule()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        now = self.clock()
+        for granularity in GRANULARITIES:
+            self.keys[granularity] = boundary_key(granularity, now)
+        # 最小化后恢复时立即补上按秒的更新
+        self.root.bind('<Map>', lambda e: self.reschedule() if e.widget is self.root else None, '+')
+        self.reschedule()
+
+    def stop(self):
+        self.running = False
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+
+    def reschedule(self):
+        """按当前订阅与窗口状态重新设定唯一的定时器"""
+        if not self.running:
+            return
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+        now = self.clock()
+        visible = self.root.state() in ("normal", "zoomed")
+        due = None
+        for granularity in GRANULARITIES:
+            if not self.subscribers[granularity] or (granularity == "second" and not visible):
+                continue
+            boundary = next_boundary(granularity, now)
+            if due is None or boundary < due:
+                due = boundary
+        if due is not None:
+            delay = int((due - now).total_seconds() * 1000) + BOUNDARY_SLACK_MS
+            self._after = self.root.after(max(1, delay), self.tick)
+
+    def tick(self):
+        """通知所有跨过边界的粒度，再设定下一次触发"""
+        self._after = None
+        self.ticks += 1
+        now = self.clock()
+        try:
+            for granularity in GRANULARITIES:
+                key = boundary_key(granularity, now)
+                if key == self.keys.get(granularity):
+                    continue
+                self.keys[granularity] = key
+                for callback in self.subscribers[granularity]:
+                    callback(now)
+        finally:
+            # 回调出错时时钟也不停止
+            self.reschedule()
+
+
+class LunarForecast:
+    """当前时辰的农历信息，以及预先算好的下一时辰的农历信息与掌诀
+
+    农历日数字在零点变化、时数字在时辰交替时变化，两者都视为边界。
+    """
+
+    def __init__(self, root, lookup=LunarCalendar.get_lunar_date):
+        self.root = root
+        self.lookup = lookup
+        self.key = None
+        # 换到当前区间时的时间
+        self.since = None
+        self.info = None
+        self.reading = None
+        # (边界键, 农历信息, 掌诀) 预先算好的下一区间
+        self.upcoming = None
+        self.hits = 0
+        self.misses = 0
+        self._pending = None
+
+    @staticmethod
+    def key_for(now):
+        return now.date(), SHICHEN_BY_HOUR[now.hour]
+
+    def current(self, now=None):
+        """当前时间的农历信息（dict，同 LunarCalendar.get_lunar_date）"""
+        if now is None:
+            now = datetime.now()
+        if self.key_for(now) != self.key:
+            self.advance(now)
+        return self.info
+
+    def advance(self, now):
+        """换到 now 所在区间：已预先算好时直接换上，否则现算；随后在空闲时准备下一区间"""
+        key = self.key_for(now)
+        if self.upcoming and self.upcoming[0] == key:
+            _, self.info, self.reading = self.upcoming
+            self.hits += 1
+        else:
+            self.info = self.lookup(now)
+            self.reading = reading_for(self.info)
+            self.misses += 1
+        self.key = key
+        self.since = now
+        self.upcoming = None
+        if self._pending is None:
+            self._pending = self.root.after_idle(self.prefetch)
+
+    def prefetch(self):
+        """计算下一个时辰或零点（取较早者）开始时的农历信息与掌诀"""
+        self._pending = None
+        start = min(next_boundary("shichen", self.since), next_boundary("day", self.since))
+        info = self.lookup(start)
+        self.upcoming = (self.key_for(start), info, reading_for(info, start))
+
+
+def reading_for(info, now=None):
+    """农历数字对应的掌诀，并预热综合解读缓存；数字超出 1-9 时返回 None"""
+    numbers = (info["月数字"], info["日数字"], info["时数字"])
+    if not all(1 <= n <= 9 for n in numbers):
+        return None
+    reading = divination_engine.lookup_reading(*numbers)
+    divination_engine.generate_summary_analysis(*numbers, reading.elements, now)
+    return reading
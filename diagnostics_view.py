@@ -0,0 +1,128 @@
+"""诊断窗口
+
+不在菜单中显示，按 Ctrl+Shift+D 打开。可开关运行指标收集、查看各热点路径的耗时与计数，
+并把指标导出为 JSON 或 Prometheus 文本文件。
+"""
+import tkinter as tk
+from tkinter import filedialog, scrolledtext
+from datetime import datetime
+
+
+class DiagnosticsView:
+    """诊断窗口内容，由调用方提供 Toplevel
+
+    details() 返回附加的诊断文本（控件数、渲染统计等），save(path, content) 负责写入导出文件，
+    开关指标收集后调用 on_toggle(enabled)。
+    """
+
+    def __init__(self, window, metrics, colors, fonts, details, save, on_toggle=None):
+        self.metrics = metrics
+        self.colors = colors
+        self.fonts = fonts
+        self.details = details
+        self.save = save
+        self.on_toggle = on_toggle
+
+        self.window = window
+        self.window.title("🩺 诊断信息")
+        self.window.configure(bg=colors['bg_dark'])
+
+        self.create_toolbar()
+        self.create_report()
+        self.create_footer()
+
+    def create_toolbar(self):
+        toolbar = tk.Frame(self.window, bg=self.colors['bg_dark'])
+        toolbar.pack(fill="x", padx=15, pady=(15, 5))
+
+        self.enabled_var = tk.BooleanVar(value=self.metrics.enabled)
+        tk.Checkbutton(toolbar,
+                       text="启用指标收集",
+                       variable=self.enabled_var,
+                       command=self.toggle,
+                       font=self.fonts.get(11),
+                       bg=self.colors['bg_dark'],
+                       fg=self.colors['text_light'],
+                       selectcolor=self.colors['bg_light'],
+                       activebackground=self.colors['bg_dark'],
+                       activeforeground=self.colors['text_light']).pack(side="left")
+
+        buttons = [
+            ("🔄 刷新", self.refresh, self.colors['warning']),
+            ("🧹 清零", self.reset, self.colors['secondary'])
+        ]
+        for text, command, color in reversed(buttons):
+            tk.Button(toolbar,
+                      text=text,
+                      command=command,
+                      font=self.fonts.get(10),
+                      bg=color,
+                      fg='white',
+                      padx=12,
+                      cursor="hand2").pack(side="right", padx=(5, 0))
+
+    def create_report(self):
+        self.text_area = scrolledtext.ScrolledText(self.window,
+                                                   font=self.fonts.get(11, mono=True),
+                                                   bg=self.colors['bg_light'],
+                                                   fg=self.colors['text_light'],
+                                                   wrap="none",
+                                                   padx=15,
+                                                   pady=15)
+        self.text_area.pack(fill="both", expand=True, padx=15, pady=5)
+        self.text_area.config(state='disabled')
+
+    def create_footer(self):
+        footer = tk.Frame(self.window, bg=self.colors['bg_dark'])
+        footer.pack(pady=(5, 15))
+
+        buttons = [
+            ("📄 导出 JSON", lambda: self.export("json"), self.colors['success']),
+            ("📈 导出 Prometheus", lambda: self.export("prometheus"), self.colors['accent_blue']),
+            ("❌ 关闭", self.window.withdraw, self.colors['danger'])
+        ]
+        for text, command, color in buttons:
+            tk.Button(footer,
+                      text=text,
+                      command=command,
+                      font=self.fonts.get(11),
+                      bg=color,
+                      fg='white',
+                      padx=20,
+                      pady=6,
+                      cursor="hand2").pack(side="left", padx=8)
+
+    def toggle(self):
+        self.metrics.enabled = self.enabled_var.get()
+        if self.on_toggle:
+            self.on_toggle(self.metrics.enabled)
+        self.refresh()
+
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
+
+    def refresh(self):
+        """重新生成报告"""
+        self.enabled_var.set(self.metrics.enabled)
+        report = self.metrics.format_report()
+        details = self.details()
+        if details:
+            report += "\n\n" + "\n".join(details)
+        self.text_area.config(state='normal')
+        self.text_area.delete(1.0, tk.END)
+        self.text_area.insert(1.0, report)
+        self.text_area.config(state='disabled')
+
+    def export(self, fmt):
+        """选择文件后导出当前指标"""
+        now = datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = ".prom" if fmt == "prometheus" else ".json"
+        filetypes = [("Prometheus 文本", "*.prom")] if fmt == "prometheus" else [("JSON 文件", "*.json")]
+        path = filedialog.asksaveasfilename(parent=self.window,
+                                            title="导出运行指标",
+                                            initialfile=f"运行指标_{now}{extension}",
+                                            defaultextension=extension,
+                                            filetypes=filetypes + [("所有文件", "*.*")])
+        if path:
+            self.save(path, self.metrics.render(fmt))
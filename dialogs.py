@@ -0,0 +1,86 @@
+"""对话框复用管理
+
+每种对话框只创建一次：关闭时隐藏，再次打开时刷新内容后重新显示，
+避免反复按快捷键时堆积窗口和控件。
+"""
+import time
+import tkinter as tk
+
+from startup_profile import count_widgets
+
+
+class DialogManager:
+    """按名称缓存 Toplevel 对话框"""
+
+    def __init__(self, root, theme=None):
+        self.root = root
+        # 主题管理器：对话框显示前与当前主题同步
+        self.theme = theme
+        # 名称 -> (窗口, 刷新函数)
+        self.dialogs = {}
+        # 名称 -> [打开次数, 最近一次耗时毫秒, 最长耗时毫秒]
+        self.latencies = {}
+
+    def show(self, name, builder, width, height):
+        """显示对话框
+
+        首次打开时调用 builder(window) 创建控件，builder 返回刷新内容的函数（可为 None）；
+        之后每次打开只调用该刷新函数。
+        """
+        start = time.perf_counter()
+        entry = self.dialogs.get(name)
+        if entry is None or not entry[0].winfo_exists():
+            window = tk.Toplevel(self.root)
+            window.withdraw()
+            window.transient(self.root)
+            window.protocol("WM_DELETE_WINDOW", window.withdraw)
+            refresh = builder(window)
+            self.center(window, width, height)
+            entry = self.dialogs[name] = (window, refresh)
+
+        window, refresh = entry
+        if self.theme:
+            self.theme.sync(window)
+        if refresh:
+            refresh()
+        window.deiconify()
+        window.lift()
+        window.focus_set()
+
+        elapsed = (time.perf_counter() - start) * 1000
+        stats = self.latencies.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] = elapsed
+        stats[2] = max(stats[2], elapsed)
+        return window
+
+    def hide(self, name):
+        """隐藏对话框（保留控件供下次使用）"""
+        entry = self.dialogs.get(name)
+        if entry and entry[0].winfo_exists():
+            entry[0].withdraw()
+
+    def is_visible(self, name):
+        entry = self.dialogs.get(name)
+        return bool(entry) and entry[0].winfo_exists() and entry[0].state() != "withdrawn"
+
+    def visible_windows(self):
+        """当前显示中的对话框窗口"""
+        return [self.dialogs[name][0] for name in self.dialogs if self.is_visible(name)]
+
+    def refresh(self, name):
+        """刷新正在显示的对话框内容"""
+        if self.is_visible(name):
+            refresh = self.dialogs[name][1]
+            if refresh:
+                refresh()
+
+    def center(self, window, width, height):
+        """按给定尺寸居中，无需 update_idletasks 等待布局"""
+        x = (self.root.winfo_screenwidth() - width) // 2
+        y = (self.root.winfo_screenheight() - height) // 2
+        window.geometry(f"{width}x{height}+{x}+{y}")
+
+    def widget_count(self):
+        """当前界面中的控件总数，用于观察长时间使用后控件是否增长"""
+        return count_widgets(self.root)
@@ -1,185 +1,230 @@
+import time
+
+# 启动计时起点，供 --profile-startup 统计模块导入耗时
+STARTUP_BEGIN = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 from datetime import datetime
+import argparse
+import os
 import random
+import sqlite3
+import sys
+import threading
 
-class LunarCalendar:
-    """农历查询类"""
-    LUNAR_MONTHS = ["正月", "二月", "三月", "四月", "五月", "六月", 
-                   "七月", "八月", "九月", "十月", "冬月", "腊月"]
-    
-    @classmethod
-    def get_lunar_date(cls):
-        """获取今日农历日期"""
-        now = datetime.now()
-        year = now.year
-        month = now.month
-        day = now.day
-        hour = now.hour
-        
-        lunar_month = cls.LUNAR_MONTHS[(month - 1) % 12]
-        
-        # 计算时辰
-        if hour < 1 or hour >= 23:
-            shichen = "子时"
-            shichen_num = 1
-        elif hour < 3:
-            shichen = "丑时"
-            shichen_num = 2
-        elif hour < 5:
-            shichen = "寅时"
-            shichen_num = 3
-        elif hour < 7:
-            shichen = "卯时"
-            shichen_num = 4
-        elif hour < 9:
-            shichen = "辰时"
-            shichen_num = 5
-        elif hour < 11:
-            shichen = "巳时"
-            shichen_num = 6
-        elif hour < 13:
-            shichen = "午时"
-            shichen_num = 7
-        elif hour < 15:
-            shichen = "未时"
-            shichen_num = 8
-        elif hour < 17:
-            shichen = "申时"
-            shichen_num = 9
-        elif hour < 19:
-            shichen = "酉时"
-            shichen_num = 10
-        elif hour < 21:
-            shichen = "戌时"
-            shichen_num = 11
-        else:
-            shichen = "亥时"
-            shichen_num = 12
-        
-        return {
-            "月数字": month % 12 or 12,
-            "日数字": day % 9 or 9,
-            "时数字": shichen_num % 9 or 9,
-            "时辰": shichen,
-            "农历": f"{lunar_month}"
-        }
+import divination_engine
+from clock_scheduler import ClockScheduler, LunarForecast
+from diagnostics_view import DiagnosticsView
+from dialogs import DialogManager
+from file_writer import FileWriter, atomic_write
+from fonts import FontRegistry
+from history_export import export_history
+from history_log import HistoryLog
+from history_store import HistoryStore
+from history_view import HistoryView
+from lag_monitor import LagMonitor
+from lunar_calendar import LunarCalendar
+from metrics import METRICS, format_for_path
+from result_renderer import ResultRenderer
+from startup_profile import StartupProfiler
+from theme import THEME_SETTINGS_PATH, ThemeManager, lighten, load_theme_name, theme_names, theme_settings
+from trend_engine import DEFAULT_TRENDS_PATH, TrendEngine
+
+IMPORTS_DONE = time.perf_counter()
+
+# 主窗口初始尺寸
+WINDOW_WIDTH = 1300
+WINDOW_HEIGHT = 850
+
+# 趋势汇总在最后一次更新后多久写入文件（毫秒），连续占卜只写一次
+TRENDS_SAVE_DELAY_MS = 5000
 
 class DivinationApp:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
+        self.profiler = profiler or StartupProfiler()
         self.root.title("✨ 隧三小六壬占卜器 v3.1 ✨")
-        self.root.geometry("1300x850")
+        self.root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
         self.root.minsize(1100, 700)
         
-        # 颜色方案
-        self.colors = {
-            'bg_dark': '#1a1a2e',
-            'bg_medium': '#16213e',
-            'bg_light': '#0f3460',
-            'primary': '#e94560',
-            'secondary': '#533483',
-            'success': '#4CAF50',
-            'warning': '#FF9800',
-            'danger': '#F44336',
-            'text_light': '#ffffff',
-            'text_muted': '#b0b0b0',
-            'accent_gold': '#FFD700',
-            'accent_blue': '#2196F3',
-            'accent_purple': '#9C27B0'
-        }
+        # 颜色方案（切换主题时原地更新）
+        self.theme = ThemeManager(self.root, load_theme_name())
+        self.colors = self.theme.colors
+        
+        # 共享字体，整体缩放时只需修改字号
+        self.fonts = FontRegistry(self.root)
         
         # 设置窗口背景
         self.root.configure(bg=self.colors['bg_dark'])
         
         # 初始化数据
-        self.elements = ["大安", "留连", "速喜", "赤口", "小吉", "空亡", "病符", "桃花", "天德"]
+        self.elements = list(divination_engine.ELEMENTS)
         
         # 掌诀颜色映射
-        self.element_colors = {
-            "大安": self.colors['success'],
-            "留连": self.colors['warning'],
-            "速喜": self.colors['danger'],
-            "赤口": self.colors['accent_purple'],
-            "小吉": self.colors['accent_blue'],
-            "空亡": "#607D8B",
-            "病符": "#795548",
-            "桃花": "#E91E63",
-            "天德": self.colors['accent_gold']
-        }
+        self.element_colors = self.theme.element_colors
         
         # 当前占卜结果
         self.current_result = None
-        self.current_summary = ""
+        self.current_numbers = None
+        self.reading_time = None
+        
+        # 历史记录与趋势汇总
+        with self.profiler.section("历史记录"):
+            self.open_history()
+        
+        # 后台文件写入，保存结果不阻塞界面
+        self.file_writer = FileWriter()
+        self.closing = False
+        self.exporting = False
+        # 后台重建趋势汇总期间新增的 (时间戳, 最终掌诀序号)，未在重建时为 None
+        self.trend_rebuild = None
+        self._trends_save = None
+        
+        # 对话框复用
+        self.dialogs = DialogManager(self.root, self.theme)
+        
+        # 结果区域差量渲染
+        self.renderer = ResultRenderer(self.root)
         
         # 创建界面
-        self.create_menu()
+        with self.profiler.section("菜单栏", self.root):
+            self.create_menu()
         self.create_interface()
         
+        # 界面时钟：全界面唯一的定时器，按秒更新时间，在时辰交替与零点更新农历并预先算好下一时辰
+        self.lunar = LunarForecast(self.root, self.get_lunar_date)
+        self.clock = ClockScheduler(self.root)
+        self.clock.start()
+        self.clock.subscribe("shichen", self.on_lunar_boundary)
+        self.clock.subscribe("day", self.on_lunar_boundary)
+        self.clock.subscribe("second", self.update_clock)
+        
         # 窗口居中
         self.center_window()
+        
+        # 首帧显示后再创建详解文本框
+        self.root.bind('<Map>', self.on_first_map, '+')
+        
+        # 事件循环卡顿监测，随运行指标一同启用
+        self.lag_monitor = LagMonitor(self.root)
+        if METRICS.enabled:
+            self.root.after_idle(self.lag_monitor.start)
+        
+        # 上次未正常退出时趋势汇总可能落后于日志，在后台补上
+        if self.trends_behind_log():
+            self.root.after_idle(self.rebuild_trends)
+    
+    def open_history(self):
+        """打开历史记录数据库、二进制日志并读取趋势汇总"""
+        # 历史记录数据库
+        try:
+            self.history = HistoryStore()
+        except (sqlite3.Error, OSError):
+            self.history = None
+        
+        # 二进制历史日志，供离线统计分析
+        try:
+            self.history_log = HistoryLog()
+        except (OSError, ValueError):
+            self.history_log = None
+        
+        # 运势趋势汇总
+        self.trends = TrendEngine.load()
     
     def center_window(self):
-        """窗口居中"""
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
-        self.root.geometry(f'{width}x{height}+{x}+{y}')
+        """窗口居中（按初始尺寸计算，无需 update_idletasks 等待布局）"""
+        x = (self.root.winfo_screenwidth() // 2) - (WINDOW_WIDTH // 2)
+        y = (self.root.winfo_screenheight() // 2) - (WINDOW_HEIGHT // 2)
+        self.root.geometry(f'{WINDOW_WIDTH}x{WINDOW_HEIGHT}+{x}+{y}')
+    
+    def on_first_map(self, event):
+        # 根窗口的绑定也会收到子控件的 Map 事件；不解除绑定，以免影响其他 <Map> 绑定
+        # 用定时器而非 after_idle，使首帧的重绘先于创建文本框完成
+        if event.widget is self.root and not self.detail_texts:
+            self.root.after(1, self.create_detail_panes)
+    
+    def add_lazy_menu(self, menubar, label, builder):
+        """添加下拉菜单，菜单项在首次展开时才由 builder(menu) 创建"""
+        menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_medium'], fg=self.colors['text_light'])
+        
+        def populate():
+            menu.config(postcommand="")
+            builder(menu)
+        
+        menu.config(postcommand=populate)
+        menubar.add_cascade(label=label, menu=menu)
     
     def create_menu(self):
         """创建菜单栏"""
         menubar = tk.Menu(self.root, bg=self.colors['bg_medium'], fg=self.colors['text_light'])
         self.root.config(menu=menubar)
         
-        # 文件菜单
-        file_menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_medium'], fg=self.colors['text_light'])
-        menubar.add_cascade(label="📁 文件", menu=file_menu)
+        self.add_lazy_menu(menubar, "📁 文件", self.build_file_menu)
+        # 解读菜单 - 新增的综合解读菜单
+        self.add_lazy_menu(menubar, "📖 综合解读", self.build_analysis_menu)
+        self.add_lazy_menu(menubar, "🔧 工具", self.build_tools_menu)
+        self.add_lazy_menu(menubar, "📜 历史", self.build_history_menu)
+        self.add_lazy_menu(menubar, "❓ 帮助", self.build_help_menu)
+        
+        # 绑定快捷键
+        self.root.bind('<Control-s>', lambda e: self.save_result())
+        self.root.bind('<Control-a>', lambda e: self.show_summary_analysis())
+        self.root.bind('<Control-l>', lambda e: self.show_lunar_calendar())
+        self.root.bind('<Control-r>', lambda e: self.random_divination())
+        self.root.bind('<Control-q>', lambda e: self.root.quit())
+        self.root.bind('<Control-equal>', lambda e: self.zoom_fonts(1))
+        self.root.bind('<Control-plus>', lambda e: self.zoom_fonts(1))
+        self.root.bind('<Control-minus>', lambda e: self.zoom_fonts(-1))
+        self.root.bind('<Control-0>', lambda e: self.reset_font_scale())
+        # 诊断窗口不在菜单中显示
+        self.root.bind('<Control-Shift-D>', lambda e: self.show_diagnostics())
+    
+    def build_file_menu(self, file_menu):
+        """文件菜单"""
         file_menu.add_command(label="💾 保存结果", command=self.save_result, accelerator="Ctrl+S")
         file_menu.add_command(label="📤 导出为文本", command=self.export_text)
+        file_menu.add_command(label="📦 导出历史记录...", command=self.export_history)
         file_menu.add_separator()
         file_menu.add_command(label="🚪 退出", command=self.root.quit, accelerator="Ctrl+Q")
-        
-        # 解读菜单 - 新增的综合解读菜单
-        analysis_menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_medium'], fg=self.colors['text_light'])
-        menubar.add_cascade(label="📖 综合解读", menu=analysis_menu)
+    
+    def build_analysis_menu(self, analysis_menu):
+        """综合解读菜单"""
         analysis_menu.add_command(label="📊 查看详细解读", command=self.show_summary_analysis, accelerator="Ctrl+A")
         analysis_menu.add_command(label="📈 运势趋势分析", command=self.show_trend_analysis)
         analysis_menu.add_command(label="💡 开运建议", command=self.show_luck_suggestions)
         analysis_menu.add_separator()
         analysis_menu.add_command(label="🔄 刷新解读", command=self.refresh_analysis)
-        
-        # 工具菜单
-        tools_menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_medium'], fg=self.colors['text_light'])
-        menubar.add_cascade(label="🔧 工具", menu=tools_menu)
+    
+    def build_tools_menu(self, tools_menu):
+        """工具菜单"""
         tools_menu.add_command(label="📅 今日农历", command=self.show_lunar_calendar, accelerator="Ctrl+L")
         tools_menu.add_command(label="🌙 使用农历占卜", command=self.use_lunar_for_divination)
-        tools_menu.add_command(label="🎲 随机占卜", command=self.random_divination)
+        tools_menu.add_command(label="🎲 随机占卜", command=self.random_divination, accelerator="Ctrl+R")
         tools_menu.add_command(label="⚡ 快速占卜", command=self.quick_divination)
         tools_menu.add_separator()
-        tools_menu.add_command(label="🎨 更换主题", command=self.change_theme)
-        
-        # 历史菜单
-        history_menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_medium'], fg=self.colors['text_light'])
-        menubar.add_cascade(label="📜 历史", menu=history_menu)
+        theme_menu = tk.Menu(tools_menu, tearoff=0, bg=self.colors['bg_medium'], fg=self.colors['text_light'])
+        self.theme_var = tk.StringVar(value=self.theme.name)
+        for name, label in theme_names():
+            theme_menu.add_radiobutton(label=label, value=name, variable=self.theme_var,
+                                       command=lambda name=name: self.change_theme(name))
+        tools_menu.add_cascade(label="🎨 更换主题", menu=theme_menu)
+        tools_menu.add_command(label="🔍 放大字体", command=lambda: self.zoom_fonts(1), accelerator="Ctrl+=")
+        tools_menu.add_command(label="🔎 缩小字体", command=lambda: self.zoom_fonts(-1), accelerator="Ctrl+-")
+        tools_menu.add_command(label="🔤 恢复默认字号", command=self.reset_font_scale, accelerator="Ctrl+0")
+    
+    def build_history_menu(self, history_menu):
+        """历史菜单"""
         history_menu.add_command(label="📋 查看历史记录", command=self.show_history)
         history_menu.add_command(label="🗑️ 清除历史", command=self.clear_history)
-        
-        # 帮助菜单
-        help_menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_medium'], fg=self.colors['text_light'])
-        menubar.add_cascade(label="❓ 帮助", menu=help_menu)
+    
+    def build_help_menu(self, help_menu):
+        """帮助菜单"""
         help_menu.add_command(label="📚 使用教程", command=self.show_tutorial)
         help_menu.add_command(label="📖 掌诀详解", command=self.show_element_guide)
         help_menu.add_separator()
         help_menu.add_command(label="⚖️ 版权信息", command=self.show_copyright)
         help_menu.add_command(label="ℹ️ 关于", command=self.show_about)
-        
-        # 绑定快捷键
-        self.root.bind('<Control-s>', lambda e: self.save_result())
-        self.root.bind('<Control-a>', lambda e: self.show_summary_analysis())
-        self.root.bind('<Control-l>', lambda e: self.show_lunar_calendar())
-        self.root.bind('<Control-q>', lambda e: self.root.quit())
     
     def create_interface(self):
         """创建主界面"""
@@ -188,19 +233,24 @@ class DivinationApp:
         main_container.pack(fill="both", expand=True, padx=20, pady=15)
         
         # 1. 标题区域
-        self.create_title_section(main_container)
+        with self.profiler.section("标题区域", self.root):
+            self.create_title_section(main_container)
         
         # 2. 输入区域 - 确保可见
-        self.create_input_section(main_container)
+        with self.profiler.section("输入区域", self.root):
+            self.create_input_section(main_container)
         
-        # 3. 掌诀结果区域
-        self.create_result_section(main_container)
+        # 3. 掌诀结果区域（详解文本框在首帧后创建）
+        with self.profiler.section("结果区域", self.root):
+            self.create_result_section(main_container)
         
         # 4. 快捷操作区域（替代原来的综合解读区域）
-        self.create_quick_actions_section(main_container)
+        with self.profiler.section("快捷操作区域", self.root):
+            self.create_quick_actions_section(main_container)
         
         # 5. 状态栏
-        self.create_status_bar()
+        with self.profiler.section("状态栏", self.root):
+            self.create_status_bar()
     
     def create_title_section(self, parent):
         """创建标题区域"""
@@ -210,7 +260,7 @@ class DivinationApp:
         # 主标题
         title_label = tk.Label(title_frame,
                               text="✨ 隧三小六壬占卜器 ✨",
-                              font=('Microsoft YaHei UI', 30, 'bold'),
+                              font=self.fonts.get(30, 'bold'),
                               bg=self.colors['bg_dark'],
                               fg=self.colors['accent_gold'])
         title_label.pack()
@@ -218,7 +268,7 @@ class DivinationApp:
         # 副标题
         subtitle_label = tk.Label(title_frame,
                                  text="六壬神课 · 掌诀推演 · 运势预测",
-                                 font=('Microsoft YaHei UI', 14),
+                                 font=self.fonts.get(14),
                                  bg=self.colors['bg_dark'],
                                  fg=self.colors['text_muted'])
         subtitle_label.pack()
@@ -234,18 +284,32 @@ class DivinationApp:
         now = datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")
         time_label = tk.Label(time_frame,
                              text=f"📅 当前时间：{now}",
-                             font=('Microsoft YaHei UI', 12),
+                             font=self.fonts.get(12),
                              bg=self.colors['bg_medium'],
                              fg=self.colors['text_light'],
                              padx=15,
                              pady=8)
         time_label.pack()
+        self.time_label = time_label
+    
+    def update_clock(self, now):
+        """每秒更新标题区的时间与农历"""
+        text = f"📅 当前时间：{now.strftime('%Y年%m月%d日 %H:%M:%S')}"
+        if self.lunar.info:
+            text += f"  |  🌙 农历{self.lunar.info['农历']} {self.lunar.info['时辰']}"
+        self.time_label.config(text=text)
+    
+    def on_lunar_boundary(self, now):
+        """时辰交替或零点：换上预先算好的农历信息"""
+        self.lunar.current(now)
+        self.update_clock(now)
+        self.dialogs.refresh("lunar")
     
     def create_input_section(self, parent):
         """创建输入区域"""
         input_frame = tk.LabelFrame(parent,
                                    text="🔢 输入三个数字 (1-9)",
-                                   font=('Microsoft YaHei UI', 14, 'bold'),
+                                   font=self.fonts.get(14, 'bold'),
                                    bg=self.colors['bg_medium'],
                                    fg=self.colors['text_light'],
                                    relief="groove",
@@ -267,21 +331,21 @@ class DivinationApp:
             # 数字标签
             label = tk.Label(box_frame,
                             text=f"数字 {i+1}",
-                            font=('Microsoft YaHei UI', 13, 'bold'),
+                            font=self.fonts.get(13, 'bold'),
                             bg=self.colors['bg_medium'],
                             fg=self.colors['accent_blue'])
             label.pack()
             
             # 输入框
             entry = tk.Entry(box_frame,
-                           font=('Microsoft YaHei UI', 20, 'bold'),
+                           font=self.fonts.get(20, 'bold'),
                            width=6,
                            justify='center',
                            bd=4,
                            relief="solid",
                            bg=self.colors['bg_light'],
                            fg=self.colors['text_light'],
-                           insertbackground='white')
+                           insertbackground=self.colors['text_light'])
             entry.pack(pady=10, ipady=8)
             self.entry_widgets.append(entry)
             
@@ -289,7 +353,7 @@ class DivinationApp:
             tip_text = ["月", "日", "时"][i]
             tip = tk.Label(box_frame,
                           text=f"(通常对应农历{tip_text})",
-                          font=('Microsoft YaHei UI', 11),
+                          font=self.fonts.get(11),
                           bg=self.colors['bg_medium'],
                           fg=self.colors['text_muted'])
             tip.pack()
@@ -311,7 +375,7 @@ class DivinationApp:
             btn = tk.Button(button_frame,
                           text=text,
                           command=command,
-                          font=('Microsoft YaHei UI', 12),
+                          font=self.fonts.get(12),
                           bg=color,
                           fg='white',
                           bd=0,
@@ -326,7 +390,7 @@ class DivinationApp:
         """创建结果展示区域"""
         result_frame = tk.LabelFrame(parent,
                                     text="📊 掌诀推演结果",
-                                    font=('Microsoft YaHei UI', 14, 'bold'),
+                                    font=self.fonts.get(14, 'bold'),
                                     bg=self.colors['bg_medium'],
                                     fg=self.colors['text_light'],
                                     relief="groove",
@@ -344,6 +408,7 @@ class DivinationApp:
         
         # 三个掌诀显示区域
         self.result_labels = []
+        self.detail_frames = []
         self.detail_texts = []
         
         for i in range(3):
@@ -359,7 +424,7 @@ class DivinationApp:
             # 标题
             title_label = tk.Label(element_frame,
                                  text=f"第{i+1}掌",
-                                 font=('Microsoft YaHei UI', 16, 'bold'),
+                                 font=self.fonts.get(16, 'bold'),
                                  bg=self.colors['bg_light'],
                                  fg=self.colors['accent_gold'])
             title_label.grid(row=0, column=0, pady=(15, 10), sticky="n")
@@ -367,7 +432,7 @@ class DivinationApp:
             # 掌诀名称显示
             result_label = tk.Label(element_frame,
                                   text="待推算",
-                                  font=('Microsoft YaHei UI', 24, 'bold'),
+                                  font=self.fonts.get(24, 'bold'),
                                   bg=self.colors['bg_light'],
                                   fg=self.colors['text_light'],
                                   width=10,
@@ -382,26 +447,33 @@ class DivinationApp:
             detail_frame.grid(row=2, column=0, pady=10, padx=15, sticky="nsew")
             detail_frame.grid_rowconfigure(0, weight=1)
             detail_frame.grid_columnconfigure(0, weight=1)
-            
-            # 详细信息文本区域
-            detail_text = scrolledtext.ScrolledText(detail_frame,
-                                                   height=15,
-                                                   font=('Microsoft YaHei UI', 12),
-                                                   bg=self.colors['bg_light'],
-                                                   fg=self.colors['text_light'],
-                                                   relief="flat",
-                                                   bd=2,
-                                                   wrap="word",
-                                                   spacing1=3)
-            detail_text.grid(row=0, column=0, sticky="nsew")
-            detail_text.config(state='disabled')
-            self.detail_texts.append(detail_text)
+            self.detail_frames.append(detail_frame)
+    
+    def create_detail_panes(self):
+        """创建三个详细信息文本框（首帧显示后或首次占卜时创建，只创建一次）"""
+        if self.detail_texts:
+            return
+        with self.profiler.section("详解文本框（延后）", self.root):
+            for detail_frame in self.detail_frames:
+                # 详细信息文本区域
+                detail_text = scrolledtext.ScrolledText(detail_frame,
+                                                       height=15,
+                                                       font=self.fonts.get(12),
+                                                       bg=self.colors['bg_light'],
+                                                       fg=self.colors['text_light'],
+                                                       relief="flat",
+                                                       bd=2,
+                                                       wrap="word",
+                                                       spacing1=3)
+                detail_text.grid(row=0, column=0, sticky="nsew")
+                detail_text.config(state='disabled')
+                self.detail_texts.append(detail_text)
     
     def create_quick_actions_section(self, parent):
         """创建快捷操作区域（替代原来的综合解读区域）"""
         actions_frame = tk.LabelFrame(parent,
                                      text="⚡ 快捷操作与提示",
-                                     font=('Microsoft YaHei UI', 14, 'bold'),
+                                     font=self.fonts.get(14, 'bold'),
                                      bg=self.colors['bg_medium'],
                                      fg=self.colors['text_light'],
                                      relief="groove",
@@ -411,7 +483,7 @@ class DivinationApp:
         # 创建提示文本区域
         self.hint_text = scrolledtext.ScrolledText(actions_frame,
                                                   height=10,
-                                                  font=('Microsoft YaHei UI', 13),
+                                                  font=self.fonts.get(13),
                                                   bg=self.colors['bg_light'],
                                                   fg=self.colors['text_light'],
                                                   relief="solid",
@@ -440,7 +512,7 @@ class DivinationApp:
             btn = tk.Button(quick_buttons_frame,
                           text=text,
                           command=command,
-                          font=('Microsoft YaHei UI', 11),
+                          font=self.fonts.get(11),
                           bg=color,
                           fg='white',
                           bd=0,
@@ -477,10 +549,7 @@ class DivinationApp:
 占卜结果仅供参考，命运掌握在自己手中。
 请以积极心态面对生活，创造美好未来。"""
         
-        self.hint_text.config(state='normal')
-        self.hint_text.delete(1.0, tk.END)
-        self.hint_text.insert(1.0, hints)
-        self.hint_text.config(state='disabled')
+        self.renderer.set_text(self.hint_text, hints)
     
     def create_status_bar(self):
         """创建状态栏"""
@@ -495,7 +564,7 @@ class DivinationApp:
         # 状态信息
         self.status_label = tk.Label(status_frame,
                                     text="🟢 准备就绪 | 请输入三个数字进行占卜",
-                                    font=('Microsoft YaHei UI', 10),
+                                    font=self.fonts.get(10),
                                     bg=self.colors['bg_light'],
                                     fg=self.colors['text_light'],
                                     anchor='w')
@@ -504,7 +573,7 @@ class DivinationApp:
         # 快捷提示
         hint_label = tk.Label(status_frame,
                              text="💡 提示：按 Ctrl+A 查看综合解读，Ctrl+S 保存结果",
-                             font=('Microsoft YaHei UI', 9),
+                             font=self.fonts.get(9),
                              bg=self.colors['bg_light'],
                              fg=self.colors['text_muted'])
         hint_label.pack(side="left", padx=10)
@@ -512,21 +581,16 @@ class DivinationApp:
         # 版权信息
         copyright_label = tk.Label(status_frame,
                                   text="© 2024 小六壬占卜器 v3.1 | 仅供娱乐参考",
-                                  font=('Microsoft YaHei UI', 9),
+                                  font=self.fonts.get(9),
                                   bg=self.colors['bg_light'],
                                   fg=self.colors['text_muted'])
         copyright_label.pack(side="right", padx=15)
     
     def get_elements(self, n1, n2, n3):
         """核心占卜算法"""
-        first_index = (n1 - 1) % len(self.elements)
-        second_index = (n1 + n2 - 2) % len(self.elements)
-        third_index = (n1 + n2 + n3 - 3) % len(self.elements)
-        
-        return (self.elements[first_index], 
-                self.elements[second_index], 
-                self.elements[third_index])
+        return divination_engine.get_elements(n1, n2, n3)
     
+    @METRICS.timed("calculate_divination")
     def calculate_divination(self):
         """计算占卜结果"""
         try:
@@ -549,41 +613,34 @@ class DivinationApp:
                     return
             
             n1, n2, n3 = numbers
+            self.create_detail_panes()
             
-            # 计算掌诀
-            elements = self.get_elements(n1, n2, n3)
+            # 查表获取预计算的掌诀结果
+            reading = divination_engine.lookup_reading(n1, n2, n3)
+            elements = reading.elements
             self.current_result = elements
+            self.current_numbers = reading.numbers
+            timestamp = time.time()
+            self.reading_time = datetime.fromtimestamp(timestamp)
             
-            # 显示掌诀结果
+            # 显示掌诀结果（空闲时统一写入，掌诀未变的控件不会重绘）
             for i, element in enumerate(elements):
                 color = self.element_colors.get(element, self.colors['text_light'])
                 
                 # 更新掌诀显示
-                self.result_labels[i].config(
-                    text=element,
-                    fg=color,
-                    bg=self.colors['bg_light']
-                )
+                self.renderer.set_label(self.result_labels[i], text=element, fg=color)
                 
                 # 更新详细解释
-                details = self.get_element_details(element)
-                detail_text = f"【{element}】\n\n"
-                detail_text += f"📊 吉凶：{details.get('吉凶', '未知')}\n"
-                detail_text += f"🏷️ 属性：{details.get('属性', '未知')}\n"
-                detail_text += f"🧭 方位：{details.get('方位', '未知')}\n"
-                detail_text += f"🎲 数字：{details.get('数字', '未知')}\n"
-                detail_text += f"🌈 颜色：{details.get('颜色', '未知')}\n"
-                detail_text += f"⏰ 时辰：{details.get('时辰', '未知')}\n\n"
-                detail_text += f"📖 含义：\n{details.get('含义', '未知')}\n\n"
-                detail_text += f"💡 建议：\n{details.get('建议', '未知')}"
-                
-                self.detail_texts[i].config(state='normal')
-                self.detail_texts[i].delete(1.0, tk.END)
-                self.detail_texts[i].insert(1.0, detail_text)
-                self.detail_texts[i].config(state='disabled')
+                self.renderer.set_text(self.detail_texts[i], reading.details[i])
             
-            # 生成综合解读
-            self.generate_summary_analysis(n1, n2, n3, elements)
+            # 综合解读在首次查看时才生成，见 current_summary
+            
+            # 记录历史
+            if self.history:
+                self.history.record(reading.numbers, reading.indexes, timestamp)
+            if self.history_log:
+                self.history_log.append(reading.numbers, reading.indexes, timestamp)
+            self.update_trends(timestamp, reading.indexes[2])
             
             # 更新提示信息
             self.update_hint_text(n1, n2, n3, elements[2])
@@ -596,43 +653,18 @@ class DivinationApp:
             self.status_label.config(text=f"❌ 计算过程中发生错误：{str(e)}")
             messagebox.showerror("错误", f"占卜计算失败：{str(e)}")
     
+    @METRICS.timed("summary_generate")
     def generate_summary_analysis(self, n1, n2, n3, elements):
         """生成综合解读分析"""
-        final_element = elements[2]
-        details = self.get_element_details(final_element)
-        
-        summary = f"🔮 【{final_element}】综合运势深度解读 🔮\n"
-        summary += "═" * 65 + "\n\n"
-        
-        # 基本信息
-        summary += "📊 基本分析\n"
-        summary += f"• 占卜数字：{n1}, {n2}, {n3}\n"
-        summary += f"• 最终掌诀：{final_element}\n"
-        summary += f"• 吉凶等级：{details.get('吉凶', '未知')}\n"
-        summary += f"• 五行属性：{details.get('属性', '未知')}\n"
-        summary += f"• 有利方位：{details.get('方位', '未知')}\n"
-        summary += f"• 吉利数字：{details.get('数字', '未知')}\n"
-        summary += f"• 幸运颜色：{details.get('颜色', '未知')}\n"
-        summary += f"• 推算时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        
-        # 运势分析
-        summary += "🌟 运势分析\n"
-        summary += f"{details.get('运势分析', '暂无详细分析')}\n\n"
-        
-        # 详细解读
-        summary += "📖 掌诀深度解读\n"
-        summary += f"{details.get('详细解读', details.get('含义', '暂无详细解读'))}\n\n"
-        
-        # 建议与提醒
-        summary += "💡 建议与提醒\n"
-        summary += f"• 适宜事项：{details.get('宜', '暂无建议')}\n"
-        summary += f"• 忌讳事项：{details.get('忌', '暂无建议')}\n"
-        summary += f"• 开运方法：{details.get('开运', '保持积极心态')}\n\n"
-        
-        summary += "═" * 65 + "\n"
-        summary += "🔮 温馨提示：命运掌握在自己手中，占卜结果仅供参考\n"
-        
-        self.current_summary = summary
+        return divination_engine.generate_summary_analysis(n1, n2, n3, elements, self.reading_time)
+    
+    @property
+    def current_summary(self):
+        """当前结果的综合解读，访问时由缓存的片段填入推算时间生成"""
+        if not self.current_result:
+            return ""
+        n1, n2, n3 = self.current_numbers
+        return self.generate_summary_analysis(n1, n2, n3, self.current_result)
     
     def update_hint_text(self, n1, n2, n3, final_element):
         """更新提示文本"""
@@ -647,76 +679,15 @@ class DivinationApp:
         hints += "📚 掌诀简要：\n"
         hints += self.get_brief_element_info(final_element)
         
-        self.hint_text.config(state='normal')
-        self.hint_text.delete(1.0, tk.END)
-        self.hint_text.insert(1.0, hints)
-        self.hint_text.config(state='disabled')
+        self.renderer.set_text(self.hint_text, hints)
     
     def get_element_details(self, element_name):
         """获取掌诀详情"""
-        details = {
-            "大安": {
-                "吉凶": "★★★★★ 大吉",
-                "属性": "青龙星君",
-                "方位": "东方",
-                "数字": "1, 5, 7",
-                "颜色": "青色、绿色",
-                "时辰": "寅卯时",
-                "含义": "身未动时，属木青龙，凡谋事主一、五、七。象征稳定安宁，如沐春风，万事亨通。",
-                "运势分析": "整体运势极佳，如龙得水，势不可挡。事业顺利，贵人相助；感情美满，家庭和睦；财运亨通，投资有利；健康良好，精力充沛。",
-                "宜": "求财、出行、婚嫁、动土、上任",
-                "忌": "诉讼、争吵",
-                "开运": "多穿绿色衣物，佩戴木制饰品，在东方摆放绿植",
-                "建议": "适合求财、出行、婚嫁等事宜，宜积极进取"
-            },
-            "留连": {
-                "吉凶": "★★☆☆☆ 凶",
-                "属性": "玄武星君",
-                "方位": "南方",
-                "数字": "2, 8, 10",
-                "颜色": "黑色、蓝色",
-                "时辰": "巳午时",
-                "含义": "卒未归时，属水玄武，凡谋事主二、八、十。象征停滞不前，如陷泥潭，难以自拔。",
-                "运势分析": "整体运势不佳，阻碍重重，进展缓慢。事业多阻碍，合作不顺；感情易误会，沟通困难；财运平平，不宜投资；健康需注意肠胃问题。",
-                "宜": "静守、等待、学习、反思",
-                "忌": "出行、投资、签约",
-                "开运": "多喝水，佩戴蓝色水晶，保持耐心",
-                "建议": "需耐心等待时机，不宜冒进，宜静心思考"
-            },
-            "速喜": {
-                "吉凶": "★★★★☆ 吉",
-                "属性": "朱雀星君",
-                "方位": "南方",
-                "数字": "3, 6, 9",
-                "颜色": "红色、紫色",
-                "时辰": "巳午时",
-                "含义": "人便至时，属火朱雀，凡谋事主三、六、九。象征喜事临门，如沐春风，万事亨通。",
-                "运势分析": "整体运势顺畅，喜事连连，进展迅速。机会来临，宜快速行动；感情升温，喜事将近；财运亨通，投资获利；精神饱满，状态良好。",
-                "宜": "求财、考试、婚嫁、出行、签约",
-                "忌": "诉讼、争吵、拖延",
-                "开运": "多穿红色衣物，佩戴火属性饰品，保持热情",
-                "建议": "机会来临，宜快速行动，把握时机"
-            }
-        }
-        return details.get(element_name, {
-            "吉凶": "未知",
-            "属性": "未知",
-            "方位": "未知",
-            "数字": "未知",
-            "颜色": "未知",
-            "时辰": "未知",
-            "含义": "暂无详细解释",
-            "运势分析": "暂无运势分析",
-            "宜": "暂无建议",
-            "忌": "暂无建议",
-            "开运": "保持积极心态",
-            "建议": "谨慎行事，多思考"
-        })
+        return divination_engine.get_element_details(element_name)
     
     def get_brief_element_info(self, element_name):
         """获取掌诀简要信息"""
-        details = self.get_element_details(element_name)
-        return f"【{element_name}】\n吉凶：{details.get('吉凶', '未知')}\n含义：{details.get('含义', '未知')[:50]}...\n建议：{details.get('建议', '暂无建议')}"
+        return divination_engine.get_brief_element_info(element_name)
     
     def show_summary_analysis(self):
         """显示综合解读窗口"""
@@ -724,20 +695,12 @@ class DivinationApp:
             messagebox.showinfo("提示", "请先进行占卜再查看综合解读")
             return
         
-        # 创建解读窗口
-        summary_window = tk.Toplevel(self.root)
+        self.dialogs.show("summary", self.build_summary_window, 900, 700)
+    
+    def build_summary_window(self, summary_window):
+        """创建综合解读窗口，返回刷新内容的函数"""
         summary_window.title("📖 综合运势解读")
-        summary_window.geometry("900x700")
         summary_window.configure(bg=self.colors['bg_dark'])
-        summary_window.transient(self.root)
-        
-        # 窗口居中
-        summary_window.update_idletasks()
-        width = summary_window.winfo_width()
-        height = summary_window.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
-        summary_window.geometry(f'+{x}+{y}')
         
         # 标题
         title_frame = tk.Frame(summary_window, bg=self.colors['bg_dark'])
@@ -745,7 +708,7 @@ class DivinationApp:
         
         title_label = tk.Label(title_frame,
                               text="📖 综合运势深度解读",
-                              font=('Microsoft YaHei UI', 24, 'bold'),
+                              font=self.fonts.get(24, 'bold'),
                               bg=self.colors['bg_dark'],
                               fg=self.colors['accent_gold'])
         title_label.pack()
@@ -756,7 +719,7 @@ class DivinationApp:
         
         # 滚动文本区域
         text_area = scrolledtext.ScrolledText(content_frame,
-                                            font=('Microsoft YaHei UI', 13),
+                                            font=self.fonts.get(13),
                                             bg=self.colors['bg_light'],
                                             fg=self.colors['text_light'],
                                             wrap="word",
@@ -765,9 +728,6 @@ class DivinationApp:
                                             padx=20,
                                             pady=20)
         text_area.pack(fill="both", expand=True)
-        
-        # 插入内容
-        text_area.insert(1.0, self.current_summary)
         text_area.config(state='disabled')
         
         # 按钮区域
@@ -778,20 +738,28 @@ class DivinationApp:
             ("💾 保存解读", lambda: self.save_summary_to_file(text_area), self.colors['success']),
             ("🖨️ 打印", lambda: self.print_summary(text_area), self.colors['accent_blue']),
             ("🔄 刷新", self.refresh_analysis, self.colors['warning']),
-            ("❌ 关闭", summary_window.destroy, self.colors['danger'])
+            ("❌ 关闭", summary_window.withdraw, self.colors['danger'])
         ]
         
         for text, command, color in buttons:
             btn = tk.Button(button_frame,
                           text=text,
                           command=command,
-                          font=('Microsoft YaHei UI', 11),
+                          font=self.fonts.get(11),
                           bg=color,
                           fg='white',
                           padx=20,
                           pady=8,
                           cursor="hand2")
             btn.pack(side="left", padx=8)
+        
+        def refresh():
+            text_area.config(state='normal')
+            text_area.delete(1.0, tk.END)
+            text_area.insert(1.0, self.current_summary)
+            text_area.config(state='disabled')
+        
+        return refresh
     
     def save_summary_to_file(self, text_widget):
         """保存解读到文件"""
@@ -803,13 +771,24 @@ class DivinationApp:
             content = text_widget.get(1.0, tk.END)
             text_widget.config(state='disabled')
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            messagebox.showinfo("保存成功", f"解读已保存到文件：\n{filename}")
+            self.status_label.config(text=f"💾 正在保存解读：{filename}")
+            self.file_writer.write(filename, content, lambda path, error: self.on_file_saved(path, error, "解读"))
         except Exception as e:
             messagebox.showerror("保存失败", f"保存解读时出错：{str(e)}")
     
+    def on_file_saved(self, path, error, what):
+        """后台写入完成（在写入线程上调用），切回界面线程更新状态栏"""
+        if not self.closing:
+            self.root.after(0, self.show_save_status, path, error, what)
+    
+    def show_save_status(self, path, error, what):
+        """在状态栏显示保存结果"""
+        if error is None:
+            self.status_label.config(text=f"💾 {what}已保存到文件：{os.path.abspath(path)}")
+        else:
+            self.status_label.config(text=f"❌ {what}保存失败：{error}")
+            messagebox.showerror("保存失败", f"保存{what}时发生错误：{str(error)}")
+    
     def print_summary(self, text_widget):
         """打印解读"""
         messagebox.showinfo("打印", "打印功能正在开发中...")
@@ -817,25 +796,12 @@ class DivinationApp:
     def refresh_analysis(self):
         """刷新解读"""
         if self.current_result:
-            elements = self.current_result
-            # 重新生成解读
-            self.generate_summary_analysis(
-                self.get_current_numbers(),
-                elements[0], elements[1], elements[2]
-            )
+            # 使当前结果的缓存失效，下次查看时按当前时间重新生成
+            divination_engine.SUMMARY_CACHE.invalidate(self.current_numbers, self.current_result)
+            self.reading_time = datetime.now()
+            self.dialogs.refresh("summary")
             messagebox.showinfo("刷新", "解读已刷新")
     
-    def get_current_numbers(self):
-        """获取当前输入的数字"""
-        numbers = []
-        for entry in self.entry_widgets:
-            try:
-                num = int(entry.get())
-                numbers.append(num)
-            except:
-                numbers.append(0)
-        return numbers[:3]
-    
     def fill_random_numbers(self):
         """填充随机数字"""
         for entry in self.entry_widgets:
@@ -849,49 +815,84 @@ class DivinationApp:
             entry.delete(0, tk.END)
         
         for label in self.result_labels:
-            label.config(text="待推算", fg=self.colors['text_light'])
+            self.renderer.set_label(label, text="待推算", fg=self.colors['text_light'])
         
+        self.create_detail_panes()
         for text_widget in self.detail_texts:
-            text_widget.config(state='normal')
-            text_widget.delete(1.0, tk.END)
-            text_widget.config(state='disabled')
+            self.renderer.set_text(text_widget, "")
         
         self.current_result = None
-        self.current_summary = ""
+        self.current_numbers = None
         self.set_default_hints()
         self.status_label.config(text="🟢 输入已清空 | 请输入三个数字进行占卜")
     
     def show_lunar_calendar(self):
         """显示今日农历"""
         try:
-            lunar_info = LunarCalendar.get_lunar_date()
-            
-            lunar_window = tk.Toplevel(self.root)
-            lunar_window.title("📅 今日农历时间")
-            lunar_window.geometry("500x350")
-            lunar_window.configure(bg=self.colors['bg_medium'])
-            lunar_window.transient(self.root)
-            
-            # 居中
-            lunar_window.update_idletasks()
-            x = (self.root.winfo_screenwidth() // 2) - (500 // 2)
-            y = (self.root.winfo_screenheight() // 2) - (350 // 2)
-            lunar_window.geometry(f'+{x}+{y}')
-            
-            # 标题
-            title = tk.Label(lunar_window,
-                           text="🌙 今日农历时间",
-                           font=('Microsoft YaHei UI', 20, 'bold'),
-                           bg=self.colors['bg_medium'],
-                           fg=self.colors['accent_gold'])
-            title.pack(pady=20)
-            
-            # 卡片
-            card = tk.Frame(lunar_window,
-                          bg=self.colors['bg_light'],
-                          relief="ridge",
-                          bd=3)
-            card.pack(pady=10, padx=30, fill="both", expand=True)
+            self.dialogs.show("lunar", self.build_lunar_window, 500, 350)
+        except Exception as e:
+            messagebox.showerror("错误", f"获取农历信息失败：{str(e)}")
+    
+    def build_lunar_window(self, lunar_window):
+        """创建今日农历窗口，返回刷新内容的函数"""
+        lunar_window.title("📅 今日农历时间")
+        lunar_window.configure(bg=self.colors['bg_medium'])
+        
+        # 当前显示的农历信息
+        state = {}
+        
+        # 标题
+        title = tk.Label(lunar_window,
+                       text="🌙 今日农历时间",
+                       font=self.fonts.get(20, 'bold'),
+                       bg=self.colors['bg_medium'],
+                       fg=self.colors['accent_gold'])
+        title.pack(pady=20)
+        
+        # 卡片
+        card = tk.Frame(lunar_window,
+                      bg=self.colors['bg_light'],
+                      relief="ridge",
+                      bd=3)
+        card.pack(pady=10, padx=30, fill="both", expand=True)
+        
+        info_label = tk.Label(card,
+                            font=self.fonts.get(12),
+                            bg=self.colors['bg_light'],
+                            fg=self.colors['text_light'],
+                            justify=tk.LEFT,
+                            padx=20,
+                            pady=20)
+        info_label.pack()
+        
+        # 按钮
+        btn_frame = tk.Frame(lunar_window, bg=self.colors['bg_medium'])
+        btn_frame.pack(pady=15)
+        
+        btn_use = tk.Button(btn_frame,
+                          text="✨ 使用这些数字占卜",
+                          command=lambda: self.use_lunar_numbers(state['info'], lunar_window),
+                          font=self.fonts.get(11),
+                          bg=self.colors['primary'],
+                          fg='white',
+                          padx=20,
+                          pady=10,
+                          cursor="hand2")
+        btn_use.pack(side="left", padx=5)
+        
+        btn_close = tk.Button(btn_frame,
+                            text="关闭",
+                            command=lunar_window.withdraw,
+                            font=self.fonts.get(11),
+                            bg=self.colors['secondary'],
+                            fg='white',
+                            padx=20,
+                            pady=10,
+                            cursor="hand2")
+        btn_close.pack(side="left", padx=5)
+        
+        def refresh():
+            lunar_info = state['info'] = self.lunar.current()
             
             now = datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")
             info_text = f"\n📅 公历时间：{now}\n\n"
@@ -903,45 +904,14 @@ class DivinationApp:
             info_text += f"   日数字：{lunar_info['日数字']:2d}\n"
             info_text += f"   时数字：{lunar_info['时数字']:2d}\n\n"
             info_text += "💡 提示：点击下方按钮使用这些数字进行占卜"
-            
-            info_label = tk.Label(card,
-                                text=info_text,
-                                font=('Microsoft YaHei UI', 12),
-                                bg=self.colors['bg_light'],
-                                fg=self.colors['text_light'],
-                                justify=tk.LEFT,
-                                padx=20,
-                                pady=20)
-            info_label.pack()
-            
-            # 按钮
-            btn_frame = tk.Frame(lunar_window, bg=self.colors['bg_medium'])
-            btn_frame.pack(pady=15)
-            
-            btn_use = tk.Button(btn_frame,
-                              text="✨ 使用这些数字占卜",
-                              command=lambda: self.use_lunar_numbers(lunar_info, lunar_window),
-                              font=('Microsoft YaHei UI', 11),
-                              bg=self.colors['primary'],
-                              fg='white',
-                              padx=20,
-                              pady=10,
-                              cursor="hand2")
-            btn_use.pack(side="left", padx=5)
-            
-            btn_close = tk.Button(btn_frame,
-                                text="关闭",
-                                command=lunar_window.destroy,
-                                font=('Microsoft YaHei UI', 11),
-                                bg=self.colors['secondary'],
-                                fg='white',
-                                padx=20,
-                                pady=10,
-                                cursor="hand2")
-            btn_close.pack(side="left", padx=5)
-            
-        except Exception as e:
-            messagebox.showerror("错误", f"获取农历信息失败：{str(e)}")
+            info_label.config(text=info_text)
+        
+        return refresh
+    
+    @METRICS.timed("lunar_lookup")
+    def get_lunar_date(self, when=None):
+        """农历信息，when 默认为当前时间"""
+        return LunarCalendar.get_lunar_date(when)
     
     def use_lunar_numbers(self, lunar_info, window):
         """使用农历数字进行占卜"""
@@ -951,12 +921,12 @@ class DivinationApp:
         self.entry_widgets[0].insert(0, str(lunar_info['月数字']))
         self.entry_widgets[1].insert(0, str(lunar_info['日数字']))
         self.entry_widgets[2].insert(0, str(lunar_info['时数字']))
-        window.destroy()
+        window.withdraw()
         self.calculate_divination()
     
     def use_lunar_for_divination(self):
         """使用农历数字进行占卜的快捷方式"""
-        lunar_info = LunarCalendar.get_lunar_date()
+        lunar_info = self.lunar.current()
         for i, entry in enumerate(self.entry_widgets):
             entry.delete(0, tk.END)
         
@@ -977,17 +947,143 @@ class DivinationApp:
     
     def show_trend_analysis(self):
         """显示运势趋势分析"""
-        if not self.current_result:
-            messagebox.showinfo("提示", "请先进行占卜再查看趋势分析")
+        self.dialogs.show("trend", self.build_trend_window, 600, 650)
+    
+    def build_trend_window(self, trend_window):
+        """创建运势趋势窗口，返回刷新内容的函数"""
+        trend_window.title("📈 运势趋势分析")
+        trend_window.configure(bg=self.colors['bg_dark'])
+        
+        text_area = scrolledtext.ScrolledText(trend_window,
+                                            font=self.fonts.get(12),
+                                            bg=self.colors['bg_light'],
+                                            fg=self.colors['text_light'],
+                                            wrap="word",
+                                            spacing1=4,
+                                            padx=20,
+                                            pady=20)
+        text_area.pack(fill="both", expand=True, padx=20, pady=(20, 10))
+        
+        def show_report():
+            text_area.config(state='normal')
+            text_area.delete(1.0, tk.END)
+            text_area.insert(1.0, self.trends.format_report())
+            text_area.config(state='disabled')
+        
+        def rebuild():
+            if not self.history_log:
+                messagebox.showerror("重新统计", "历史日志不可用", parent=trend_window)
+                return
+            self.rebuild_trends()
+        
+        button_frame = tk.Frame(trend_window, bg=self.colors['bg_dark'])
+        button_frame.pack(pady=(0, 15))
+        
+        buttons = [
+            ("🔄 从日志重新统计", rebuild, self.colors['warning']),
+            ("❌ 关闭", trend_window.withdraw, self.colors['danger'])
+        ]
+        
+        for text, command, color in buttons:
+            btn = tk.Button(button_frame,
+                          text=text,
+                          command=command,
+                          font=self.fonts.get(11),
+                          bg=color,
+                          fg='white',
+                          padx=20,
+                          pady=8,
+                          cursor="hand2")
+            btn.pack(side="left", padx=8)
+        
+        return show_report
+    
+    def update_trends(self, timestamp, final_index):
+        """记入一次占卜；后台重建期间同时记下，重建完成后补到新汇总中"""
+        self.trends.update(timestamp, final_index)
+        if self.trend_rebuild is not None:
+            self.trend_rebuild.append((timestamp, final_index))
+        self.schedule_trends_save()
+    
+    def schedule_trends_save(self):
+        """稍后在后台保存趋势汇总，使意外退出时汇总不会落后太多"""
+        if self._trends_save is None:
+            self._trends_save = self.root.after(TRENDS_SAVE_DELAY_MS, self.save_trends)
+    
+    def save_trends(self):
+        self._trends_save = None
+        self.file_writer.write(DEFAULT_TRENDS_PATH, self.trends.dumps())
+    
+    def trends_behind_log(self):
+        if not self.history_log:
+            return False
+        self.history_log.flush()
+        try:
+            return self.trends.behind_log(self.history_log.path)
+        except (OSError, ValueError):
+            return False
+    
+    def rebuild_trends(self):
+        """在后台线程中从二进制日志重建趋势汇总，完成后在界面线程上替换"""
+        if self.trend_rebuild is not None:
+            self.status_label.config(text="📈 正在重新统计，请稍候")
             return
-        messagebox.showinfo("趋势分析", "运势趋势分析功能正在开发中...")
+        self.history_log.flush()
+        path = self.history_log.path
+        pending = self.trend_rebuild = []
+        
+        def run():
+            engine = TrendEngine()
+            try:
+                engine.rebuild_from_log(path)
+                error = None
+            except (OSError, ValueError) as e:
+                error = e
+            if not self.closing:
+                self.root.after(0, finish, engine, error)
+        
+        def finish(engine, error):
+            # 重建期间清除了历史记录时放弃结果
+            if self.trend_rebuild is not pending:
+                return
+            self.trend_rebuild = None
+            if error is not None:
+                self.status_label.config(text=f"❌ 重新统计失败：{error}")
+                return
+            for timestamp, final_index in pending:
+                engine.update(timestamp, final_index)
+            self.trends = engine
+            self.schedule_trends_save()
+            self.dialogs.refresh("trend")
+            self.status_label.config(text=f"📈 已从日志重新统计 {engine.total} 条记录")
+        
+        self.status_label.config(text="📈 正在从日志重新统计...")
+        threading.Thread(target=run, name="trend-rebuild", daemon=True).start()
     
     def show_luck_suggestions(self):
         """显示开运建议"""
         if not self.current_result:
             messagebox.showinfo("提示", "请先进行占卜再查看开运建议")
             return
-        messagebox.showinfo("开运建议", "开运建议功能正在开发中...")
+        
+        final_element = self.current_result[2]
+        record = self.get_element_details(final_element)
+        suggestions = f"【{final_element}】开运建议\n\n"
+        suggestions += f"🍀 开运方法：{record.luck}\n"
+        suggestions += f"✅ 适宜事项：{record.suitable}\n"
+        suggestions += f"⛔ 忌讳事项：{record.avoid}\n"
+        suggestions += f"🧭 有利方位：{record.direction}\n"
+        suggestions += f"🌈 幸运颜色：{record.colors}\n"
+        
+        if self.trends.total:
+            most_common = max(range(len(self.elements)), key=lambda i: self.trends.element_counts[i])
+            suggestions += f"\n📈 近期最常出现：{self.elements[most_common]}"
+            if self.trends.bad_streak >= 2:
+                suggestions += f"\n⚠️ 已连续 {self.trends.bad_streak} 次凶卦，宜静心守成，暂缓重大决定"
+            elif self.trends.good_streak >= 2:
+                suggestions += f"\n🌟 已连续 {self.trends.good_streak} 次吉卦，宜把握时机，积极进取"
+        
+        messagebox.showinfo("开运建议", suggestions)
     
     def save_result(self):
         """保存结果到文件"""
@@ -1009,19 +1105,15 @@ class DivinationApp:
             
             content += f"输入数字：{', '.join(numbers)}\n\n"
             content += "掌诀结果：\n"
-            for i in range(3):
-                element = self.result_labels[i].cget("text")
+            for i, element in enumerate(self.current_result):
                 content += f"  第{i+1}掌：{element}\n"
             
             content += f"\n综合解读：\n{self.current_summary}\n"
             content += f"保存时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
             content += "=" * 50
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            self.status_label.config(text=f"💾 结果已保存到文件：{filename}")
-            messagebox.showinfo("保存成功", f"占卜结果已保存到：\n{filename}")
+            self.status_label.config(text=f"💾 正在保存结果：{filename}")
+            self.file_writer.write(filename, content, lambda path, error: self.on_file_saved(path, error, "结果"))
             
         except Exception as e:
             messagebox.showerror("保存失败", f"保存结果时发生错误：{str(e)}")
@@ -1030,17 +1122,156 @@ class DivinationApp:
         """导出为文本"""
         self.save_result()
     
-    def change_theme(self):
-        """更换主题"""
-        messagebox.showinfo("主题更换", "主题更换功能正在开发中...")
+    def export_history(self):
+        """在后台把全部历史记录导出为 CSV、JSONL 或列式文件"""
+        if not self.history:
+            messagebox.showerror("导出历史", "历史记录数据库不可用")
+            return
+        if self.exporting:
+            messagebox.showinfo("导出历史", "正在导出，请等待当前导出完成")
+            return
+        path = filedialog.asksaveasfilename(
+            title="导出历史记录",
+            defaultextension=".csv",
+            initialfile=f"占卜历史_{datetime.now().strftime('%Y%m%d')}.csv",
+            filetypes=[("CSV 表格", "*.csv"), ("JSON Lines", "*.jsonl"), ("列式二进制", "*.xlrc")])
+        if not path:
+            return
+        
+        def report(done, total):
+            if not self.closing:
+                self.root.after(0, self.status_label.config,
+                                {'text': f"📦 正在导出历史记录：{done}/{total} 条"})
+        
+        def run():
+            try:
+                count = export_history(self.history, path, progress=report)
+                error = None
+            except Exception as e:
+                count, error = 0, e
+            if not self.closing:
+                self.root.after(0, finish, count, error)
+        
+        def finish(count, error):
+            self.exporting = False
+            if error is None:
+                self.status_label.config(text=f"📦 已导出 {count} 条历史记录到：{path}")
+            else:
+                self.status_label.config(text=f"❌ 导出历史记录失败：{error}")
+                messagebox.showerror("导出失败", f"导出历史记录时发生错误：{str(error)}")
+        
+        self.exporting = True
+        self.status_label.config(text="📦 正在导出历史记录...")
+        threading.Thread(target=run, name="history-export", daemon=True).start()
+    
+    @METRICS.timed("theme_switch")
+    def change_theme(self, name):
+        """更换主题：原地为主窗口和可见的对话框着色，隐藏的对话框在下次打开时着色"""
+        if name == self.theme.name:
+            return
+        start = time.perf_counter()
+        changed = self.theme.apply(name, [self.root] + self.dialogs.visible_windows())
+        # 着色已直接修改控件，差量渲染记住的旧颜色作废
+        self.renderer.invalidate()
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        label = dict(theme_names())[name]
+        self.status_label.config(text=f"🎨 已切换到{label}主题 | 更新 {changed} 处颜色，耗时 {elapsed:.1f} ms")
+        self.file_writer.write(THEME_SETTINGS_PATH, theme_settings(name))
+    
+    def zoom_fonts(self, steps):
+        """放大或缩小全部界面文字"""
+        if self.fonts.zoom(steps):
+            self.status_label.config(text=f"🔍 字体缩放：{self.fonts.scale:.0%}")
+    
+    def reset_font_scale(self):
+        """恢复默认字号"""
+        if self.fonts.set_scale(1.0):
+            self.status_label.config(text="🔤 已恢复默认字号")
     
     def show_history(self):
         """显示历史记录"""
-        messagebox.showinfo("历史记录", "历史记录功能正在开发中...")
+        if not self.history:
+            messagebox.showerror("历史记录", "历史记录数据库不可用")
+            return
+        self.dialogs.show("history", self.build_history_window, 760, 560)
+    
+    def build_history_window(self, history_window):
+        """创建历史记录窗口，返回刷新内容的函数"""
+        view = HistoryView(history_window, self.history, self.colors, self.element_colors, self.fonts)
+        return view.reload
     
     def clear_history(self):
         """清除历史记录"""
-        messagebox.showinfo("清除历史", "清除历史功能正在开发中...")
+        if not self.history:
+            messagebox.showerror("清除历史", "历史记录数据库不可用")
+            return
+        if messagebox.askyesno("清除历史", "确定要清除全部历史记录吗？此操作不可恢复。"):
+            self.history.clear()
+            if self.history_log:
+                self.history_log.clear()
+            self.trends.reset()
+            self.trend_rebuild = None
+            self.schedule_trends_save()
+            self.dialogs.refresh("history")
+            self.dialogs.refresh("trend")
+            self.status_label.config(text="🗑️ 历史记录已清除")
+    
+    def show_diagnostics(self):
+        """显示诊断窗口（Ctrl+Shift+D）"""
+        self.dialogs.show("diagnostics", self.build_diagnostics_window, 760, 560)
+    
+    def build_diagnostics_window(self, diagnostics_window):
+        """创建诊断窗口，返回刷新内容的函数"""
+        def save(path, content):
+            self.file_writer.write(path, content, lambda path, error: self.on_file_saved(path, error, "运行指标"))
+        
+        def toggle(enabled):
+            if enabled:
+                self.lag_monitor.start()
+            else:
+                self.lag_monitor.stop()
+        
+        return DiagnosticsView(diagnostics_window, METRICS, self.colors, self.fonts, self.diagnostic_details, save,
+                               toggle).refresh
+    
+    def diagnostic_details(self):
+        """诊断窗口中附加显示的界面与缓存统计"""
+        cache = divination_engine.SUMMARY_CACHE
+        lines = [
+            f"控件总数：{self.dialogs.widget_count()}",
+            f"结果渲染：刷新 {self.renderer.frames} 次，写入 {self.renderer.updates} 个控件，"
+            f"跳过 {self.renderer.skipped} 个",
+            f"解读缓存：命中 {cache.hits} 次，未命中 {cache.misses} 次"
+        ]
+        for name, (count, last, longest) in self.dialogs.latencies.items():
+            lines.append(f"对话框 {name}：打开 {count} 次，最近 {last:.1f} ms，最长 {longest:.1f} ms")
+        lines.append(f"界面时钟：触发 {self.clock.ticks} 次，农历预取命中 {self.lunar.hits} 次，"
+                     f"现算 {self.lunar.misses} 次")
+        if self.lag_monitor.running or self.lag_monitor.beats:
+            lines.append("")
+            lines.extend(self.lag_monitor.summary())
+        return lines
+    
+    def close(self):
+        """退出前写完待保存的文件并关闭历史记录，保存趋势汇总"""
+        self.closing = True
+        self.clock.stop()
+        self.lag_monitor.stop()
+        if self._trends_save is not None:
+            self.root.after_cancel(self._trends_save)
+            self._trends_save = None
+        self.file_writer.close()
+        if self.history:
+            self.history.close()
+            self.history = None
+        if self.history_log:
+            self.history_log.close()
+            self.history_log = None
+        try:
+            self.trends.save()
+        except OSError:
+            pass
     
     def show_tutorial(self):
         """显示使用教程"""
@@ -1172,13 +1403,56 @@ class DivinationApp:
     
     def lighten_color(self, color, amount=30):
         """颜色变亮"""
-        return color
+        return lighten(color, amount)
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="隧三小六壬占卜器")
+    parser.add_argument("--serve", action="store_true", help="不启动界面，以本地 HTTP/JSON 服务方式运行")
+    parser.add_argument("--host", help="服务监听地址，默认 127.0.0.1")
+    parser.add_argument("--port", type=int, help="服务端口，默认 8765")
+    parser.add_argument("--batch", action="store_true",
+                        help="不启动界面，批量占卜，其余参数见 divination_batch.py --help")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="启用运行指标，退出时写入 FILE（.prom、.txt 为 Prometheus 文本格式，其余为 JSON）")
+    parser.add_argument("--profile-startup", nargs="?", const="-", metavar="JSON",
+                        help="统计启动耗时并在首帧显示后退出；指定文件时写入 JSON，否则打印到标准错误")
+    args, rest = parser.parse_known_args()
+    
+    # 命令行模式按需导入，不拖慢界面启动
+    if args.batch:
+        import divination_batch
+        sys.exit(divination_batch.main(rest))
+    if rest:
+        parser.error(f"无法识别的参数：{' '.join(rest)}")
+    if args.serve:
+        import divination_server
+        divination_server.run(args.host or divination_server.DEFAULT_HOST,
+                              args.port or divination_server.DEFAULT_PORT)
+        return
+    
+    if args.metrics:
+        METRICS.enabled = True
+    
+    profiler = StartupProfiler(STARTUP_BEGIN)
+    profiler.mark("模块导入", IMPORTS_DONE)
     root = tk.Tk()
-    app = DivinationApp(root)
+    profiler.mark("创建根窗口")
+    app = DivinationApp(root, profiler)
+    profiler.mark("界面构建完成")
+    if args.profile_startup:
+        def finish(profiler):
+            profiler.report(args.profile_startup)
+            root.quit()
+        profiler.watch_first_frame(root, finish)
     root.mainloop()
+    app.close()
+    if args.metrics:
+        atomic_write(args.metrics, METRICS.render(format_for_path(args.metrics)))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if getattr(sys, "frozen", False):
+        # 打包版中 --batch --workers 的子进程需要
+        import multiprocessing
+        multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,76 @@
+# -*- mode: python ; coding: utf-8 -*-
+"""精简的 PyInstaller 打包配置
+
+只打包界面实际用到的标准库，排除网络、邮件、压缩、测试等模块以减小归档体积、缩短单文件版每次启动时的解压时间。
+可选依赖 NumPy 只用于批量接口，界面不需要，同样排除。
+
+用法：
+    pyinstaller divination_app.spec               单文件版 dist/小六壬占卜器.exe
+    pyinstaller divination_app.spec -- --onedir   目录版 dist/小六壬占卜器/（启动无需解压，冷启动更快）
+
+先运行 python build_frozen.py 可把占卜引擎编译为扩展模块（需要 Cython），打包时自动使用编译后的版本。
+"""
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--onedir", action="store_true", help="生成目录版而非单文件版")
+options = parser.parse_args()
+
+APP_NAME = "小六壬占卜器"
+
+# 界面用不到的模块；命令行模式（--serve、--batch）所需的 asyncio、concurrent.futures 保留
+EXCLUDES = [
+    "numpy",
+    # hashlib 缺少 _hashlib 时使用内置实现，不再带入 OpenSSL
+    "ssl", "_ssl", "_hashlib",
+    "email", "http", "urllib.request", "ftplib", "netrc", "mimetypes", "xmlrpc", "xml",
+    # zipfile 为 PyInstaller 的 inspect 运行时钩子所需，不能排除
+    "bz2", "_bz2", "lzma", "_lzma", "tarfile",
+    "unittest", "doctest", "pdb", "pydoc", "tracemalloc",
+    "decimal", "_decimal", "_pydecimal", "fractions", "statistics",
+    "lib2to3", "pydoc_data", "turtle", "turtledemo", "tkinter.tix", "idlelib",
+]
+
+a = Analysis(
+    ['divination_app.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDES,
+    noarchive=False,
+    optimize=2,
+)
+pyz = PYZ(a.pure)
+
+if options.onedir:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name=APP_NAME,
+        debug=False,
+        strip=False,
+        upx=False,
+        console=False,
+    )
+    coll = COLLECT(exe, a.binaries, a.datas, strip=False, upx=False, name=APP_NAME)
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        name=APP_NAME,
+        debug=False,
+        strip=False,
+        # UPX 压缩的文件每次启动都要解压，反而更慢
+        upx=False,
+        runtime_tmpdir=None,
+        console=False,
+    )
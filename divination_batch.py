@@ -0,0 +1,282 @@
+"""命令行批量占卜
+
+逐行读取 "n1 n2 n3[ 时间]" 或 CSV "n1,n2,n3[,时间]"，输出 JSONL 或 CSV 结果，内存占用与输入规模无关，
+无需图形界面。时间可为 POSIX 时间戳或 ISO 格式（如 2024-01-01 08:00:00），用于综合解读中的推算时间。
+每行按界面 calculate_divination 的规则校验，不合法的行跳过并在标准错误输出中说明，行号为所在输入文件中的行号。
+大文件可用 --workers 按字节范围分片，由多个进程并行处理后按原顺序合并。
+
+用法：python divination_batch.py [输入文件 ...] [-o 输出文件] [--format jsonl|csv] [--summary] [--skip-header] [--workers N]
+      不指定输入文件或为 - 时从标准输入读取，不指定输出文件时写到标准输出
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import divination_engine
+
+# 小于该大小的文件不分片
+MIN_SHARD_SIZE = 1024 * 1024
+
+CSV_HEADER = ["行号", "数字1", "数字2", "数字3", "时间", "第1掌", "第2掌", "第3掌"]
+
+# 每组数字的 JSON 片段，输出时只需拼接行号与时间
+JSON_FRAGMENTS = tuple(
+    '"数字": ' + json.dumps(reading.numbers) +
+    ', "掌诀": ' + json.dumps(reading.elements, ensure_ascii=False)
+    for reading in divination_engine.READING_TABLE)
+
+
+def parse_line(text):
+    """按 calculate_divination 的规则校验一行，返回 (掌诀查表序号, 时间戳或 None)
+
+    不合法时抛出 ValueError，错误信息与界面一致。
+    """
+    text = text.strip()
+    if "," in text:
+        # 按 CSV 解析，兼容表格软件导出的带引号字段
+        fields = [field.strip() for field in next(csv.reader([text], skipinitialspace=True))]
+    else:
+        fields = text.split(None, 3)
+
+    numbers = []
+    for i in range(3):
+        value = fields[i] if i < len(fields) else ""
+        if not value:
+            raise ValueError(f"请输入第{i+1}个数字")
+        try:
+            num = int(value)
+        except ValueError:
+            raise ValueError(f"第{i+1}个输入不是有效的数字")
+        if not 1 <= num <= 9:
+            raise ValueError(f"第{i+1}个数字必须在1-9之间")
+        numbers.append(num)
+
+    timestamp = None
+    if len(fields) > 3 and fields[3]:
+        value = fields[3]
+        try:
+            timestamp = float(value)
+        except ValueError:
+            try:
+                timestamp = datetime.fromisoformat(value).timestamp()
+            except ValueError:
+                raise ValueError(f"时间格式错误：{value}")
+        else:
+            # nan、inf 无法写成 JSON，超出 datetime 范围的时间戳无法推算综合解读
+            if not math.isfinite(timestamp):
+                raise ValueError(f"时间格式错误：{value}")
+            try:
+                datetime.fromtimestamp(timestamp)
+            except (OverflowError, OSError, ValueError):
+                raise ValueError(f"时间超出范围：{value}")
+
+    n1, n2, n3 = numbers
+    return (n1 - 1) * 81 + (n2 - 1) * 9 + (n3 - 1), timestamp
+
+
+class JsonlWriter:
+    """每行一个 JSON 对象"""
+
+    def __init__(self, out, summary):
+        self.out = out
+        self.summary = summary
+
+    def write_header(self):
+        pass
+
+    def write(self, line_no, key, timestamp, now):
+        text = f'{{"行号": {line_no}, {JSON_FRAGMENTS[key]}, "时间": {"null" if timestamp is None else timestamp}'
+        if self.summary:
+            reading = divination_engine.READING_TABLE[key]
+            summary = divination_engine.render_summary(reading, now if timestamp is None else datetime.fromtimestamp(timestamp))
+            text += ', "综合解读": ' + json.dumps(summary, ensure_ascii=False)
+        self.out.write(text + "}\n")
+
+
+class CsvWriter:
+    """CSV，首行为表头"""
+
+    def __init__(self, out, summary):
+        self.writer = csv.writer(out)
+        self.summary = summary
+
+    def write_header(self):
+        self.writer.writerow(CSV_HEADER + ["综合解读"] if self.summary else CSV_HEADER)
+
+    def write(self, line_no, key, timestamp, now):
+        reading = divination_engine.READING_TABLE[key]
+        row = [line_no, *reading.numbers, "" if timestamp is None else timestamp, *reading.elements]
+        if self.summary:
+            row.append(divination_engine.render_summary(reading, now if timestamp is None else datetime.fromtimestamp(timestamp)))
+        self.writer.writerow(row)
+
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter}
+
+
+def process_lines(lines, writer, errors, name, first_line=1, now=None):
+    """逐行占卜并写出，返回 (成功行数, 不合法行数)"""
+    if now is None:
+        now = datetime.now()
+    written = invalid = 0
+    for line_no, text in enumerate(lines, first_line):
+        if not text.strip() or text.lstrip().startswith("#"):
+            continue
+        try:
+            key, timestamp = parse_line(text)
+        except ValueError as e:
+            errors.write(f"{name} 第{line_no}行：{e}\n")
+            invalid += 1
+            continue
+        writer.write(line_no, key, timestamp, now)
+        written += 1
+    return written, invalid
+
+
+def shard_ranges(path, workers):
+    """按字节把文件分为若干片，边界对齐到行首，返回 [(起点, 终点, 首行行号)]"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for k in range(1, workers):
+            f.seek(max(size * k // workers, bounds[-1]))
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                f.readline()
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+
+        # 统计每片之前的行数，使分片输出的行号与原文件一致
+        ranges = []
+        line_no = 1
+        for start, end in zip(bounds, bounds[1:]):
+            if start >= end:
+                continue
+            ranges.append((start, end, line_no))
+            f.seek(start)
+            remaining = end - start
+            while remaining:
+                chunk = f.read(min(remaining, 1 << 20))
+                line_no += chunk.count(b"\n")
+                remaining -= len(chunk)
+    return ranges
+
+
+def _iter_range(f, start, end):
+    """读取 [start, end) 内的各行"""
+    f.seek(start)
+    encoding = "utf-8-sig" if start == 0 else "utf-8"
+    while f.tell() < end:
+        line = f.readline()
+        if not line:
+            break
+        yield line.decode(encoding, errors="replace")
+        encoding = "utf-8"
+
+
+def process_shard(path, start, end, first_line, fmt, summary, skip_header, part_path, error_path, now):
+    """子进程：处理一个分片，结果与错误分别写入临时文件"""
+    with open(path, "rb") as f, \
+            open(part_path, "w", encoding="utf-8", newline="") as out, \
+            open(error_path, "w", encoding="utf-8") as errors:
+        lines = _iter_range(f, start, end)
+        if skip_header and start == 0:
+            next(lines, None)
+            first_line += 1
+        return process_lines(lines, WRITERS[fmt](out, summary), errors, path, first_line, now)
+
+
+def process_sharded(path, fmt, summary, skip_header, workers, out_text, out_binary, now):
+    """多进程处理一个文件，按原顺序合并输出"""
+    ranges = shard_ranges(path, workers)
+    with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(len(ranges)) as executor:
+        futures = []
+        for k, (start, end, first_line) in enumerate(ranges):
+            part_path = os.path.join(directory, f"part{k}")
+            error_path = os.path.join(directory, f"error{k}")
+            futures.append((part_path, error_path, executor.submit(
+                process_shard, path, start, end, first_line, fmt, summary, skip_header, part_path, error_path, now)))
+
+        written = invalid = 0
+        out_text.flush()
+        for part_path, error_path, future in futures:
+            part_written, part_invalid = future.result()
+            written += part_written
+            invalid += part_invalid
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, out_binary)
+            with open(error_path, encoding="utf-8") as errors:
+                shutil.copyfileobj(errors, sys.stderr)
+    return written, invalid
+
+
+def run(inputs, output="-", fmt="jsonl", summary=False, skip_header=False, workers=1):
+    """批量占卜，返回 (成功行数, 不合法行数)"""
+    now = datetime.now()
+    out_binary = sys.stdout.buffer if output == "-" else open(output, "wb")
+    out_text = io.TextIOWrapper(out_binary, encoding="utf-8", newline="")
+    writer = WRITERS[fmt](out_text, summary)
+    written = invalid = 0
+    try:
+        writer.write_header()
+        for path in inputs or ["-"]:
+            if path != "-" and workers > 1 and os.path.getsize(path) >= MIN_SHARD_SIZE:
+                counts = process_sharded(path, fmt, summary, skip_header, workers, out_text, out_binary, now)
+            else:
+                if path == "-":
+                    source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", errors="replace")
+                    name = "标准输入"
+                else:
+                    source = open(path, encoding="utf-8-sig", errors="replace")
+                    name = path
+                try:
+                    first_line = 1
+                    if skip_header:
+                        next(source, None)
+                        first_line = 2
+                    counts = process_lines(source, writer, sys.stderr, name, first_line, now)
+                finally:
+                    if path == "-":
+                        source.detach()
+                    else:
+                        source.close()
+            written += counts[0]
+            invalid += counts[1]
+    finally:
+        out_text.flush()
+        if output == "-":
+            out_text.detach()
+        else:
+            out_text.close()
+    return written, invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="小六壬命令行批量占卜")
+    parser.add_argument("inputs", nargs="*", help="输入文件，- 或不指定时读取标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认标准输出")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="输出格式，默认按输出文件扩展名判断，否则为 jsonl")
+    parser.add_argument("--summary", action="store_true", help="同时输出综合解读")
+    parser.add_argument("--skip-header", action="store_true", help="跳过每个输入文件的首行表头")
+    parser.add_argument("--workers", type=int, default=1, help="处理大文件时使用的进程数")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    try:
+        written, invalid = run(args.inputs, args.output, fmt, args.summary, args.skip_header, max(1, args.workers))
+    except OSError as e:
+        sys.exit(f"批量占卜失败：{e}")
+    sys.stderr.write(f"完成：输出 {written} 条，跳过不合法的行 {invalid} 条\n")
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""小六壬占卜核心引擎
+
+纯 Python 实现，不依赖 tkinter，可在无图形界面的环境（后台任务、服务端）中直接导入使用。
+"""
+import sys
+import threading
+from array import array
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时批量接口退回纯 Python 实现
+    np = None
+
+# 九宫掌诀
+ELEMENTS = ("大安", "留连", "速喜", "赤口", "小吉", "空亡", "病符", "桃花", "天德")
+
+# 掌诀名称到序号的映射
+ELEMENT_INDEX = {name: index for index, name in enumerate(ELEMENTS)}
+
+# 掌诀详情
+ELEMENT_DETAILS = {
+    "大安": {
+        "吉凶": "★★★★★ 大吉",
+        "属性": "青龙星君",
+        "方位": "东方",
+        "数字": "1, 5, 7",
+        "颜色": "青色、绿色",
+        "时辰": "寅卯时",
+        "含义": "身未动时，属木青龙，凡谋事主一、五、七。象征稳定安宁，如沐春风，万事亨通。",
+        "运势分析": "整体运势极佳，如龙得水，势不可挡。事业顺利，贵人相助；感情美满，家庭和睦；财运亨通，投资有利；健康良好，精力充沛。",
+        "宜": "求财、出行、婚嫁、动土、上任",
+        "忌": "诉讼、争吵",
+        "开运": "多穿绿色衣物，佩戴木制饰品，在东方摆放绿植",
+        "建议": "适合求财、出行、婚嫁等事宜，宜积极进取"
+    },
+    "留连": {
+        "吉凶": "★★☆☆☆ 凶",
+        "属性": "玄武星君",
+        "方位": "南方",
+        "数字": "2, 8, 10",
+        "颜色": "黑色、蓝色",
+        "时辰": "巳午时",
+        "含义": "卒未归时，属水玄武，凡谋事主二、八、十。象征停滞不前，如陷泥潭，难以自拔。",
+        "运势分析": "整体运势不佳，阻碍重重，进展缓慢。事业多阻碍，合作不顺；感情易误会，沟通困难；财运平平，不宜投资；健康需注意肠胃问题。",
+        "宜": "静守、等待、学习、反思",
+        "忌": "出行、投资、签约",
+        "开运": "多喝水，佩戴蓝色水晶，保持耐心",
+        "建议": "需耐心等待时机，不宜冒进，宜静心思考"
+    },
+    "速喜": {
+        "吉凶": "★★★★☆ 吉",
+        "属性": "朱雀星君",
+        "方位": "南方",
+        "数字": "3, 6, 9",
+        "颜色": "红色、紫色",
+        "时辰": "巳午时",
+        "含义": "人便至时，属火朱雀，凡谋事主三、六、九。象征喜事临门，如沐春风，万事亨通。",
+        "运势分析": "整体运势顺畅，喜事连连，进展迅速。机会来临，宜快速行动；感情升温，喜事将近；财运亨通，投资获利；精神饱满，状态良好。",
+        "宜": "求财、考试、婚嫁、出行、签约",
+        "忌": "诉讼、争吵、拖延",
+        "开运": "多穿红色衣物，佩戴火属性饰品，保持热情",
+        "建议": "机会来临，宜快速行动，把握时机"
+    }
+}
+
+# 未收录掌诀的默认详情
+DEFAULT_DETAILS = {
+    "吉凶": "未知",
+    "属性": "未知",
+    "方位": "未知",
+    "数字": "未知",
+    "颜色": "未知",
+    "时辰": "未知",
+    "含义": "暂无详细解释",
+    "运势分析": "暂无运势分析",
+    "宜": "暂无建议",
+    "忌": "暂无建议",
+    "开运": "保持积极心态",
+    "建议": "谨慎行事，多思考"
+}
+
+
+class ElementRecord(namedtuple("ElementRecord", [
+        "index", "name", "fortune", "attribute", "direction", "numbers", "colors",
+        "shichen", "meaning", "analysis", "suitable", "avoid", "luck", "advice", "detail"])):
+    """掌诀解读记录
+
+    不可变，可在界面与工作线程间共享只读使用。仍支持以中文键名 get，兼容原有的字典用法。
+    """
+    __slots__ = ()
+
+    KEYS = {
+        "吉凶": "fortune",
+        "属性": "attribute",
+        "方位": "direction",
+        "数字": "numbers",
+        "颜色": "colors",
+        "时辰": "shichen",
+        "含义": "meaning",
+        "运势分析": "analysis",
+        "宜": "suitable",
+        "忌": "avoid",
+        "开运": "luck",
+        "建议": "advice",
+        "详细解读": "detail"
+    }
+
+    def get(self, key, default=None):
+        """按中文键名取值，未收录的字段返回 default"""
+        field = self.KEYS.get(key)
+        value = getattr(self, field) if field else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            value = self.get(key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        return super().__getitem__(key)
+
+
+def _make_record(index, name, details):
+    """由详情字典生成掌诀记录"""
+    values = {field: details.get(key) for key, field in ElementRecord.KEYS.items()}
+    return ElementRecord(index=index, name=name, **values)
+
+
+# 掌诀解读目录，按掌诀序号索引，导入时生成一次
+ELEMENT_CATALOG = tuple(_make_record(index, name, ELEMENT_DETAILS.get(name, DEFAULT_DETAILS))
+                        for index, name in enumerate(ELEMENTS))
+
+# 未知掌诀使用的默认记录
+DEFAULT_RECORD = _make_record(-1, None, DEFAULT_DETAILS)
+
+
+def get_element_indexes(n1, n2, n3):
+    """核心占卜算法，返回三掌掌诀序号"""
+    count = len(ELEMENTS)
+    first_index = (n1 - 1) % count
+    second_index = (n1 + n2 - 2) % count
+    third_index = (n1 + n2 + n3 - 3) % count
+    return first_index, second_index, third_index
+
+
+def get_elements(n1, n2, n3):
+    """核心占卜算法"""
+    first_index, second_index, third_index = get_element_indexes(n1, n2, n3)
+
+    return (ELEMENTS[first_index],
+            ELEMENTS[second_index],
+            ELEMENTS[third_index])
+
+
+def get_element_indexes_batch(n1, n2, n3):
+    """批量占卜算法
+
+    n1、n2、n3 为等长的整数数组（NumPy 数组或任何支持缓冲区协议的整数数组，
+    如 array.array），返回三个等长的 uint8 掌诀序号数组，不为每行创建字符串元组。
+    安装了 NumPy 时返回 numpy.ndarray，否则返回 array.array('B')。
+    """
+    count = len(ELEMENTS)
+    if np is not None:
+        n1 = np.asarray(n1, dtype=np.int64)
+        n2 = np.asarray(n2, dtype=np.int64)
+        n3 = np.asarray(n3, dtype=np.int64)
+        if not n1.shape == n2.shape == n3.shape:
+            raise ValueError("n1、n2、n3 长度必须一致")
+        total = n1 - 1
+        first = np.remainder(total, count).astype(np.uint8)
+        total += n2 - 1
+        second = np.remainder(total, count).astype(np.uint8)
+        total += n3 - 1
+        third = np.remainder(total, count).astype(np.uint8)
+        return first, second, third
+
+    n1, n2, n3 = memoryview(n1), memoryview(n2), memoryview(n3)
+    if not len(n1) == len(n2) == len(n3):
+        raise ValueError("n1、n2、n3 长度必须一致")
+    first = array('B', bytes(len(n1)))
+    second = array('B', first)
+    third = array('B', first)
+    for row, (a, b, c) in enumerate(zip(n1, n2, n3)):
+        index = (a - 1) % count
+        first[row] = index
+        index = (index + b - 1) % count
+        second[row] = index
+        third[row] = (index + c - 1) % count
+    return first, second, third
+
+
+def get_element_record(index):
+    """按掌诀序号获取解读记录"""
+    return ELEMENT_CATALOG[index]
+
+
+def get_element_details(element_name):
+    """获取掌诀详情"""
+    index = ELEMENT_INDEX.get(element_name)
+    return DEFAULT_RECORD if index is None else ELEMENT_CATALOG[index]
+
+
+def format_element_detail(element_name):
+    """生成单个掌诀的详细解释文本"""
+    record = get_element_details(element_name)
+    detail_text = f"【{element_name}】\n\n"
+    detail_text += f"📊 吉凶：{record.fortune}\n"
+    detail_text += f"🏷️ 属性：{record.attribute}\n"
+    detail_text += f"🧭 方位：{record.direction}\n"
+    detail_text += f"🎲 数字：{record.numbers}\n"
+    detail_text += f"🌈 颜色：{record.colors}\n"
+    detail_text += f"⏰ 时辰：{record.shichen}\n\n"
+    detail_text += f"📖 含义：\n{record.meaning}\n\n"
+    detail_text += f"💡 建议：\n{record.advice}"
+    return detail_text
+
+
+def get_brief_element_info(element_name):
+    """获取掌诀简要信息"""
+    record = get_element_details(element_name)
+    return f"【{element_name}】\n吉凶：{record.fortune}\n含义：{record.meaning[:50]}...\n建议：{record.advice}"
+
+
+def build_summary_parts(n1, n2, n3, elements):
+    """生成综合解读中推算时间之前与之后的两段固定文本"""
+    final_element = elements[2]
+    record = get_element_details(final_element)
+
+    head = f"🔮 【{final_element}】综合运势深度解读 🔮\n"
+    head += "═" * 65 + "\n\n"
+
+    # 基本信息
+    head += "📊 基本分析\n"
+    head += f"• 占卜数字：{n1}, {n2}, {n3}\n"
+    head += f"• 最终掌诀：{final_element}\n"
+    head += f"• 吉凶等级：{record.fortune}\n"
+    head += f"• 五行属性：{record.attribute}\n"
+    head += f"• 有利方位：{record.direction}\n"
+    head += f"• 吉利数字：{record.numbers}\n"
+    head += f"• 幸运颜色：{record.colors}\n"
+    head += "• 推算时间："
+
+    tail = "\n\n"
+
+    # 运势分析
+    tail += "🌟 运势分析\n"
+    tail += f"{record.analysis}\n\n"
+
+    # 详细解读
+    tail += "📖 掌诀深度解读\n"
+    tail += f"{record.detail or record.meaning}\n\n"
+
+    # 建议与提醒
+    tail += "💡 建议与提醒\n"
+    tail += f"• 适宜事项：{record.suitable}\n"
+    tail += f"• 忌讳事项：{record.avoid}\n"
+    tail += f"• 开运方法：{record.luck}\n\n"
+
+    tail += "═" * 65 + "\n"
+    tail += "🔮 温馨提示：命运掌握在自己手中，占卜结果仅供参考\n"
+
+    return head, tail
+
+
+# 预计算的完整占卜结果；时间戳之外的全部文本在导入时生成一次
+Reading = namedtuple("Reading", ["numbers", "indexes", "elements", "details",
+                                 "summary_head", "summary_tail"])
+
+
+def _build_reading_table():
+    """导入时一次性生成 1-9 输入范围内全部 9×9×9 种占卜结果"""
+    detail_cache = {}
+    tail_cache = {}
+    table = []
+    for n1 in range(1, 10):
+        for n2 in range(1, 10):
+            for n3 in range(1, 10):
+                indexes = get_element_indexes(n1, n2, n3)
+                elements = tuple(ELEMENTS[index] for index in indexes)
+                details = tuple(detail_cache.setdefault(element, sys.intern(format_element_detail(element)))
+                                for element in elements)
+                head, tail = build_summary_parts(n1, n2, n3, elements)
+                tail = tail_cache.setdefault(elements[2], sys.intern(tail))
+                table.append(Reading((n1, n2, n3), indexes, elements, details, head, tail))
+    return tuple(table)
+
+
+READING_TABLE = _build_reading_table()
+
+
+def lookup_reading(n1, n2, n3):
+    """查表获取预计算的占卜结果，输入须在 1-9 之间"""
+    if not (1 <= n1 <= 9 and 1 <= n2 <= 9 and 1 <= n3 <= 9):
+        raise ValueError("数字必须在1-9之间")
+    return READING_TABLE[(n1 - 1) * 81 + (n2 - 1) * 9 + (n3 - 1)]
+
+
+def render_summary(reading, now=None):
+    """为预计算结果填入推算时间，生成综合解读"""
+    if now is None:
+        now = datetime.now()
+    return f"{reading.summary_head}{now.strftime('%Y-%m-%d %H:%M:%S')}{reading.summary_tail}"
+
+
+# 综合解读片段缓存的容量
+SUMMARY_CACHE_SIZE = 1024
+
+
+class SummaryCache:
+    """综合解读片段的有界 LRU 缓存
+
+    以 (输入数字, 三掌掌诀) 为键缓存推算时间前后的两段文本，取用时只需填入时间；
+    可按键精确失效，线程安全。
+    """
+
+    def __init__(self, maxsize=SUMMARY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_parts(self, n1, n2, n3, elements):
+        """取出（必要时生成）综合解读片段"""
+        key = ((n1, n2, n3), tuple(elements))
+        with self._lock:
+            parts = self._data.get(key)
+            if parts is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return parts
+            self.misses += 1
+
+        parts = None
+        if 1 <= n1 <= 9 and 1 <= n2 <= 9 and 1 <= n3 <= 9:
+            reading = lookup_reading(n1, n2, n3)
+            if reading.elements == key[1]:
+                parts = reading.summary_head, reading.summary_tail
+        if parts is None:
+            parts = build_summary_parts(n1, n2, n3, elements)
+
+        with self._lock:
+            self._data[key] = parts
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return parts
+
+    def invalidate(self, numbers, elements):
+        """使某一组结果的缓存失效"""
+        with self._lock:
+            self._data.pop((tuple(numbers), tuple(elements)), None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+SUMMARY_CACHE = SummaryCache()
+
+
+def generate_summary_analysis(n1, n2, n3, elements, now=None):
+    """生成综合解读分析"""
+    if now is None:
+        now = datetime.now()
+    head, tail = SUMMARY_CACHE.get_parts(n1, n2, n3, elements)
+    return f"{head}{now.strftime('%Y-%m-%d %H:%M:%S')}{tail}"
+
+
+def divine(n1, n2, n3, now=None):
+    """完成一次完整占卜，返回掌诀、各掌详解与综合解读"""
+    if 1 <= n1 <= 9 and 1 <= n2 <= 9 and 1 <= n3 <= 9:
+        reading = lookup_reading(n1, n2, n3)
+        return {
+            "数字": reading.numbers,
+            "掌诀": reading.elements,
+            "详解": reading.details,
+            "综合解读": render_summary(reading, now)
+        }
+    elements = get_elements(n1, n2, n3)
+    return {
+        "数字": (n1, n2, n3),
+        "掌诀": elements,
+        "详解": tuple(format_element_detail(element) for element in elements),
+        "综合解读": generate_summary_analysis(n1, n2, n3, elements, now)
+    }
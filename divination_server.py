@@ -0,0 +1,316 @@
+"""本地占卜 HTTP/JSON 服务
+
+基于标准库 asyncio 的轻量 HTTP/1.1 服务，供其他工具直接获取占卜结果，无需操作图形界面。
+支持长连接（keep-alive）与请求流水线，批量接口一次请求处理多组数字，连接数有上限，
+超出时返回 503。
+
+接口：
+    GET  /health                          服务状态
+    GET  /reading?numbers=1,2,3[&time=]   单次占卜（time 为 POSIX 时间戳，用于综合解读）
+    POST /readings                        批量占卜 {"numbers": [[1,2,3], ...], "summary": true, "time": ...}
+    GET  /element?name=大安               掌诀详情
+    GET  /lunar[?time=]                   农历时间、占卜数字及对应的占卜结果
+    POST /lunar                           批量换算 {"timestamps": [...], "tz_offset": 28800}
+
+用法：python divination_server.py [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import divination_engine
+from lunar_calendar import LunarCalendar
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 同时处理的最大连接数
+MAX_CONNECTIONS = 256
+
+# 批量接口单次请求的最大条数
+MAX_BATCH = 10000
+
+# 请求体上限（字节）
+MAX_BODY = 4 * 1024 * 1024
+
+# 长连接空闲超时（秒）
+KEEPALIVE_TIMEOUT = 15
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+
+class HTTPError(Exception):
+    """带状态码的请求错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_numbers(values):
+    """校验一组三个 1-9 的整数，JSON 中的 true/false 与带小数的数字不算整数"""
+    if any(isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()) for value in values):
+        raise HTTPError(400, f"数字格式错误：{values}")
+    try:
+        numbers = tuple(int(value) for value in values)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"数字格式错误：{values}")
+    if len(numbers) != 3 or not all(1 <= n <= 9 for n in numbers):
+        raise HTTPError(400, f"需要三个1-9之间的数字：{values}")
+    return numbers
+
+
+def parse_time(value):
+    """把可选的 POSIX 时间戳转换为 datetime"""
+    if value is None:
+        return None
+    try:
+        return datetime.fromtimestamp(float(value))
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise HTTPError(400, f"时间戳格式错误：{value}")
+
+
+async def read_line(reader, status, message):
+    """读取一行；超出 StreamReader 的长度上限时抛出 HTTPError，缓冲区已错位，调用方随后关闭连接"""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HTTPError(status, message)
+
+
+def reading_json(numbers, now=None, summary=True):
+    """一次占卜的 JSON 结果"""
+    reading = divination_engine.lookup_reading(*numbers)
+    result = {
+        "数字": reading.numbers,
+        "掌诀": reading.elements,
+        "详解": reading.details
+    }
+    if summary:
+        result["综合解读"] = divination_engine.render_summary(reading, now)
+    return result
+
+
+class DivinationServer:
+    """占卜 HTTP 服务"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_connections=MAX_CONNECTIONS):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.active = 0
+        self.requests = 0
+        self._server = None
+        self.routes = {
+            ("GET", "/health"): self.handle_health,
+            ("GET", "/reading"): self.handle_reading,
+            ("POST", "/readings"): self.handle_readings,
+            ("GET", "/element"): self.handle_element,
+            ("GET", "/lunar"): self.handle_lunar,
+            ("POST", "/lunar"): self.handle_lunar_batch
+        }
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # 端口为 0 时使用系统分配的端口
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接上的全部请求，直到对方关闭或空闲超时"""
+        if self.active >= self.max_connections:
+            await self.send(writer, 503, {"error": "服务繁忙，请稍后重试"}, keep_alive=False)
+            writer.close()
+            return
+        self.active += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), KEEPALIVE_TIMEOUT)
+                except HTTPError as e:
+                    await self.send(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, keep_alive, body = request
+                self.requests += 1
+                try:
+                    status, payload = 200, self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"处理请求时发生错误：{str(e)}"}
+                await self.send(writer, status, payload, keep_alive)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def read_request(self, reader):
+        """读取一个请求，返回 (方法, 路径, 是否保持连接, 请求体)；连接关闭时返回 None"""
+        line = await read_line(reader, 400, "请求行过长")
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "请求行格式错误")
+
+        headers = {}
+        while True:
+            line = await read_line(reader, 431, "请求头过长")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Content-Length 格式错误")
+        if length < 0:
+            raise HTTPError(400, "Content-Length 格式错误")
+        if length > MAX_BODY:
+            raise HTTPError(413, "请求体过大")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, keep_alive, body
+
+    async def send(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                raise HTTPError(405, f"不支持的方法：{method}")
+            raise HTTPError(404, f"未知接口：{url.path}")
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if method == "POST":
+            try:
+                data = json.loads(body or b"{}")
+            except ValueError:
+                raise HTTPError(400, "请求体不是有效的 JSON")
+            if not isinstance(data, dict):
+                raise HTTPError(400, "请求体须为 JSON 对象")
+            return handler(query, data)
+        return handler(query)
+
+    def handle_health(self, query):
+        return {"status": "ok", "connections": self.active, "requests": self.requests}
+
+    def handle_reading(self, query):
+        if "numbers" in query:
+            values = query["numbers"].split(",")
+        else:
+            values = [query.get("n1"), query.get("n2"), query.get("n3")]
+        return reading_json(parse_numbers(values), parse_time(query.get("time")))
+
+    def handle_readings(self, query, data):
+        items = data.get("numbers")
+        if not isinstance(items, list):
+            raise HTTPError(400, "缺少 numbers 数组")
+        if len(items) > MAX_BATCH:
+            raise HTTPError(413, f"单次最多 {MAX_BATCH} 组数字")
+        batch = [parse_numbers(item if isinstance(item, list) else [item]) for item in items]
+        now = parse_time(data.get("time")) or datetime.now()
+        summary = data.get("summary", True)
+        if not isinstance(summary, bool):
+            raise HTTPError(400, "summary 须为 true 或 false")
+        return {"results": [reading_json(numbers, now, summary) for numbers in batch]}
+
+    def handle_element(self, query):
+        name = query.get("name")
+        if name not in divination_engine.ELEMENT_INDEX:
+            raise HTTPError(404, f"未知掌诀：{name}")
+        record = divination_engine.get_element_details(name)
+        result = {"掌诀": name}
+        result.update((key, record.get(key)) for key in record.KEYS)
+        return result
+
+    def handle_lunar(self, query):
+        when = parse_time(query.get("time"))
+        try:
+            lunar_info = LunarCalendar.get_lunar_date(when)
+        except (ValueError, OverflowError, OSError) as e:
+            raise HTTPError(400, str(e))
+        # 月数字可能大于 9，按完整算法推算
+        reading = divination_engine.divine(lunar_info["月数字"], lunar_info["日数字"], lunar_info["时数字"], when)
+        result = dict(lunar_info)
+        result["占卜"] = reading
+        return result
+
+    def handle_lunar_batch(self, query, data):
+        timestamps = data.get("timestamps")
+        if not isinstance(timestamps, list):
+            raise HTTPError(400, "缺少 timestamps 数组")
+        if len(timestamps) > MAX_BATCH:
+            raise HTTPError(413, f"单次最多 {MAX_BATCH} 个时间戳")
+        try:
+            months, days, hours = LunarCalendar.get_lunar_numbers_batch(timestamps, data.get("tz_offset"))
+        except (TypeError, ValueError) as e:
+            raise HTTPError(400, f"时间戳超出农历换算范围或格式错误：{e}")
+        return {"numbers": [[int(m), int(d), int(h)] for m, d, h in zip(months, days, hours)]}
+
+
+def run(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """启动服务并一直运行"""
+    server = DivinationServer(host, port)
+
+    async def serve():
+        await server.start()
+        print(f"占卜服务已启动：http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="小六壬占卜 HTTP/JSON 服务")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    run(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""后台文件写入
+
+保存结果、导出解读等文件写入交给后台线程完成，界面线程只负责生成内容。
+写入先写同目录下的临时文件再原子替换，不会留下写了一半的文件；同一路径尚未写入时再次保存，
+只写最新的内容。
+"""
+import os
+import queue
+import stat
+import tempfile
+import threading
+import traceback
+
+from metrics import METRICS
+
+
+def _current_umask():
+    # 只能通过设置来读取 umask，在启动时读一次，避免后台线程写入时临时改动进程的 umask
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# 新建文件的权限，与 open() 直接创建时相同
+NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def atomic_write(path, content, encoding='utf-8'):
+    """写入临时文件后替换目标文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 创建的文件权限为 0600，改为目标文件原有的权限（新文件按 umask）
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class FileWriter:
+    """文件写入队列
+
+    write 只登记内容后立即返回，由后台线程写入；完成后在后台线程上调用 callback(path, error)，
+    error 为 None 表示成功。界面代码须在回调中通过 root.after 切回界面线程。
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # 路径 -> [待写内容, 回调列表]
+        self._pending = {}
+        self._writer = threading.Thread(target=self._write_loop, name="file-writer", daemon=True)
+        self._writer.start()
+
+    def write(self, path, content, callback=None):
+        """登记一次写入（非阻塞）"""
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry is not None:
+                # 尚未写入，合并为一次写入最新内容
+                entry[0] = content
+                entry[1].append(callback)
+                return
+            self._pending[path] = [content, [callback]]
+        self._queue.put(path)
+
+    def flush(self):
+        """等待已登记的写入全部完成"""
+        self._queue.join()
+
+    def close(self):
+        """写完剩余内容并结束后台线程"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_loop(self):
+        while True:
+            path = self._queue.get()
+            try:
+                if path is None:
+                    return
+                with self._lock:
+                    content, callbacks = self._pending.pop(path)
+                try:
+                    with METRICS.timer("file_save"):
+                        atomic_write(path, content)
+                    error = None
+                except OSError as e:
+                    METRICS.count("file_save_errors")
+                    error = e
+                for callback in callbacks:
+                    if callback:
+                        # 回调出错（如窗口已销毁）不能结束写入线程，否则之后的写入都不会完成
+                        try:
+                            callback(path, error)
+                        except Exception:
+                            METRICS.count("file_callback_errors")
+                            traceback.print_exc()
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,78 @@
+"""共享字体
+
+界面中的控件共用少量具名 tkinter.font.Font 对象，而不是各自传入 ('Microsoft YaHei UI', N) 元组。
+字体族按候选列表选取系统中实际存在的第一个（Linux 通常没有微软雅黑），整体缩放时只需逐个修改
+这些字体的字号，Tk 会自动重新排版所有使用它们的控件，无需重建界面。
+
+字号以磅为单位，Tk 按屏幕 DPI（tk scaling）换算为像素，高 DPI 屏幕无需额外处理；
+缩放系数用于用户手动放大缩小（Ctrl+= / Ctrl+- / Ctrl+0）。
+"""
+import tkinter.font as tkfont
+
+# 界面字体候选：Windows、macOS、常见 Linux 发行版的中文字体
+UI_FAMILIES = ("Microsoft YaHei UI", "Microsoft YaHei", "PingFang SC", "Hiragino Sans GB",
+               "Noto Sans CJK SC", "Source Han Sans SC", "WenQuanYi Micro Hei", "WenQuanYi Zen Hei",
+               "Droid Sans Fallback")
+
+# 等宽字体候选（诊断窗口的表格）
+MONO_FAMILIES = ("Consolas", "Menlo", "DejaVu Sans Mono", "Noto Sans Mono", "Liberation Mono")
+
+MIN_SCALE = 0.7
+MAX_SCALE = 2.0
+SCALE_STEP = 0.1
+
+
+class FontRegistry:
+    """按 (字号, 粗细, 是否等宽) 缓存共享字体，字号为缩放前的磅数"""
+
+    def __init__(self, root):
+        self.root = root
+        self.scale = 1.0
+        # (字号, 粗细, 是否等宽) -> Font
+        self.fonts = {}
+        # 是否等宽 -> 选定的字体族
+        self._families = {}
+
+    def family(self, mono=False):
+        """候选列表中系统实际提供的第一个字体族，都没有时使用 Tk 默认字体"""
+        family = self._families.get(mono)
+        if family is None:
+            candidates = MONO_FAMILIES if mono else UI_FAMILIES
+            for candidate in candidates:
+                # 不存在的字体族会被替换为默认字体，比较实际字体族即可判断，无需枚举全部字体
+                probe = tkfont.Font(root=self.root, family=candidate, size=10)
+                if probe.actual("family").lower() == candidate.lower():
+                    family = candidate
+                    break
+            else:
+                default = "TkFixedFont" if mono else "TkDefaultFont"
+                family = tkfont.nametofont(default, root=self.root).actual("family")
+            self._families[mono] = family
+        return family
+
+    def get(self, size, weight='normal', mono=False):
+        """共享字体，相同参数返回同一个 Font 对象"""
+        key = (size, weight, mono)
+        font = self.fonts.get(key)
+        if font is None:
+            name = f"divination-{'mono' if mono else 'ui'}-{size}-{weight}"
+            font = self.fonts[key] = tkfont.Font(root=self.root, name=name, family=self.family(mono),
+                                                 size=self.scaled(size), weight=weight)
+        return font
+
+    def scaled(self, size):
+        return max(1, round(size * self.scale))
+
+    def set_scale(self, scale):
+        """按缩放系数修改全部共享字体的字号，返回是否有变化"""
+        scale = round(min(MAX_SCALE, max(MIN_SCALE, scale)), 2)
+        if scale == self.scale:
+            return False
+        self.scale = scale
+        for (size, _, _), font in self.fonts.items():
+            font.configure(size=self.scaled(size))
+        return True
+
+    def zoom(self, steps):
+        """放大（steps > 0）或缩小一档或多档"""
+        return self.set_scale(self.scale + steps * SCALE_STEP)
@@ -0,0 +1,202 @@
+"""占卜历史批量导出
+
+把全部或筛选范围内的历史记录按时间顺序分块导出为 CSV、JSONL 或紧凑的列式二进制文件，
+一次顺序扫描完成，内存占用与记录总数无关。导出先写临时文件，完成后再替换目标文件。
+
+列式格式由 16 字节文件头和若干个数据块组成，每块对应一次读取的记录：
+
+    文件头  magic(8) 版本(uint16) 保留(6)
+    数据块  条数 n(uint32) 保留(4)
+            id(int64 × n) 时间戳(float64 × n)
+            n1 n2 n3 e1 e2 e3(各 uint8 × n)
+
+全部为小端字节序。
+
+用法：python history_export.py 输出文件 [--format csv|jsonl|columnar] [--start 2024-01-01] [--end 2024-02-01] [--final 大安]
+"""
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime
+
+import divination_engine
+from history_store import DEFAULT_DB_PATH, EXPORT_CHUNK_SIZE, HistoryStore
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时读取为 array.array
+    np = None
+
+COLUMNAR_MAGIC = b"XLRCOL\x00\x00"
+COLUMNAR_VERSION = 1
+COLUMNAR_HEADER = struct.Struct("<8sH6x")
+BLOCK_HEADER = struct.Struct("<I4x")
+
+# 列名与 array 类型码
+COLUMNS = (("id", "q"), ("timestamp", "d"),
+           ("n1", "B"), ("n2", "B"), ("n3", "B"),
+           ("e1", "B"), ("e2", "B"), ("e3", "B"))
+
+CSV_HEADER = ["id", "时间戳", "时间", "数字1", "数字2", "数字3", "第1掌", "第2掌", "第3掌"]
+
+# 扩展名 -> 格式
+EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".xlrc": "columnar"}
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def write_csv(f, chunks):
+    writer = csv.writer(f)
+    writer.writerow(CSV_HEADER)
+    elements = divination_engine.ELEMENTS
+    for rows in chunks:
+        writer.writerows([row[0], row[1], _format_time(row[1]), row[2], row[3], row[4],
+                          elements[row[5]], elements[row[6]], elements[row[7]]] for row in rows)
+        yield len(rows)
+
+
+def write_jsonl(f, chunks):
+    # 掌诀组合只有 729 种，预先编码
+    fragments = {}
+    for rows in chunks:
+        lines = []
+        for row in rows:
+            key = row[2:]
+            fragment = fragments.get(key)
+            if fragment is None:
+                elements = tuple(divination_engine.ELEMENTS[index] for index in row[5:])
+                fragment = fragments[key] = (f'"数字": {json.dumps(row[2:5])}, '
+                                             f'"掌诀": {json.dumps(elements, ensure_ascii=False)}')
+            lines.append(f'{{"id": {row[0]}, "时间戳": {row[1]}, "时间": "{_format_time(row[1])}", {fragment}}}\n')
+        f.write("".join(lines))
+        yield len(rows)
+
+
+def write_columnar(f, chunks):
+    f.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION))
+    for rows in chunks:
+        f.write(BLOCK_HEADER.pack(len(rows)))
+        for (_, typecode), values in zip(COLUMNS, zip(*rows)):
+            column = array(typecode, values)
+            if sys.byteorder == "big":
+                column.byteswap()
+            f.write(column.tobytes())
+        yield len(rows)
+
+
+# 格式 -> (写入函数, 是否二进制)
+FORMATS = {
+    "csv": (write_csv, False),
+    "jsonl": (write_jsonl, False),
+    "columnar": (write_columnar, True)
+}
+
+
+def format_for_path(path):
+    """按扩展名推断导出格式，无法识别时为 csv"""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), "csv")
+
+
+def export_history(store, path, fmt=None, start=None, end=None, final_element=None,
+                   progress=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """导出历史记录，返回导出条数
+
+    start、end 为 POSIX 时间戳，范围为 [start, end)；final_element 为最终掌诀序号。
+    progress(已导出条数, 总条数) 在每块写完后调用。可在后台线程中调用。
+    """
+    fmt = fmt or format_for_path(path)
+    writer, binary = FORMATS[fmt]
+    store.flush()
+    total = store.count_range(start, end, final_element)
+    chunks = store.iter_chunks(start, end, final_element, chunk_size)
+
+    temp_path = f"{path}.tmp"
+    done = 0
+    try:
+        if binary:
+            f = open(temp_path, "wb")
+        else:
+            f = open(temp_path, "w", encoding="utf-8", newline="")
+        with f:
+            for count in writer(f, chunks):
+                done += count
+                if progress:
+                    progress(done, total)
+        os.replace(temp_path, path)
+    except BaseException:
+        chunks.close()
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return done
+
+
+def iter_columnar(path):
+    """逐块读取列式导出文件，每块返回 {列名: 数组}（安装了 NumPy 时为 NumPy 数组）"""
+    with open(path, "rb") as f:
+        header = f.read(COLUMNAR_HEADER.size)
+        if len(header) < COLUMNAR_HEADER.size or COLUMNAR_HEADER.unpack(header) != (COLUMNAR_MAGIC, COLUMNAR_VERSION):
+            raise ValueError(f"不是有效的列式导出文件：{path}")
+        while True:
+            block = f.read(BLOCK_HEADER.size)
+            if not block:
+                return
+            if len(block) < BLOCK_HEADER.size:
+                raise ValueError(f"列式导出文件不完整：{path}")
+            count, = BLOCK_HEADER.unpack(block)
+            columns = {}
+            for name, typecode in COLUMNS:
+                size = array(typecode).itemsize * count
+                data = f.read(size)
+                if len(data) < size:
+                    raise ValueError(f"列式导出文件不完整：{path}")
+                if np is not None:
+                    columns[name] = np.frombuffer(data, dtype=np.dtype(typecode).newbyteorder("<"))
+                else:
+                    column = array(typecode)
+                    column.frombytes(data)
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    columns[name] = column
+            yield columns
+
+
+def _parse_date(value):
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为 YYYY-MM-DD 或 YYYY-MM-DD HH:MM：{value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="导出占卜历史记录")
+    parser.add_argument("output", help="输出文件，格式默认按扩展名（.csv/.jsonl/.xlrc）判断")
+    parser.add_argument("--format", choices=sorted(FORMATS))
+    parser.add_argument("--start", type=_parse_date, help="起始时间（含）")
+    parser.add_argument("--end", type=_parse_date, help="截止时间（不含）")
+    parser.add_argument("--final", choices=divination_engine.ELEMENTS, help="只导出最终掌诀为该掌诀的记录")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="历史记录数据库路径")
+    args = parser.parse_args(argv)
+
+    def report(done, total):
+        sys.stderr.write(f"\r已导出 {done}/{total} 条")
+
+    final_element = divination_engine.ELEMENT_INDEX[args.final] if args.final else None
+    store = HistoryStore(args.db)
+    try:
+        count = export_history(store, args.output, args.format, args.start, args.end, final_element, report)
+    finally:
+        store.close()
+    sys.stderr.write(f"\n导出完成：{count} 条 -> {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""占卜历史二进制日志
+
+定长、只追加的记录格式，供离线统计分析快速扫描。文件由 16 字节文件头和若干条 10 字节记录组成：
+
+    文件头  magic(8) 版本(uint16) 记录长度(uint16) 保留(4)
+    记录    时间戳(uint32，UTC 秒) n1 n2 n3(uint8) e1 e2 e3(uint8，掌诀序号)
+
+读取时通过 mmap 映射文件，安装了 NumPy 时直接得到零拷贝的结构化数组视图。
+"""
+import mmap
+import os
+import struct
+import time
+
+import divination_engine
+from history_store import DATA_DIR
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时按 struct 逐条解析
+    np = None
+
+DEFAULT_LOG_PATH = os.path.join(DATA_DIR, "history.log")
+
+MAGIC = b"XLRLOG\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sHH4x")
+RECORD = struct.Struct("<I6B")
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([("timestamp", "<u4"),
+                             ("n1", "u1"), ("n2", "u1"), ("n3", "u1"),
+                             ("e1", "u1"), ("e2", "u1"), ("e3", "u1")])
+
+
+class HistoryLog:
+    """二进制历史日志写入端"""
+
+    def __init__(self, path=DEFAULT_LOG_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            _check_header(path)
+            # 上次写入中断时末尾可能留有不完整的记录，截掉后再追加，否则此后的记录全部错位
+            size = self._file.tell()
+            end = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+            if end != size:
+                self._file.truncate(end)
+
+    def append(self, numbers, indexes, timestamp=None):
+        """追加一条记录（写入缓冲区，close 或 flush 时落盘）"""
+        if timestamp is None:
+            timestamp = time.time()
+        self._file.write(RECORD.pack(int(timestamp), *numbers, *indexes))
+
+    def append_many(self, rows):
+        """批量追加 (时间戳, n1, n2, n3, e1, e2, e3) 记录"""
+        pack = RECORD.pack
+        self._file.write(b"".join(pack(int(row[0]), *row[1:]) for row in rows))
+
+    def flush(self):
+        self._file.flush()
+
+    def clear(self):
+        """清空全部记录，保留文件头"""
+        self._file.truncate(HEADER.size)
+
+    def close(self):
+        self._file.close()
+
+
+def _check_header(path):
+    """校验文件头，返回文件头长度"""
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"不是有效的占卜历史日志：{path}")
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"不是有效的占卜历史日志：{path}")
+    return HEADER.size
+
+
+class LogReader:
+    """通过 mmap 只读访问二进制日志
+
+    用法：
+        with LogReader(path) as reader:
+            final = reader.records["e3"]   # NumPy 结构化数组视图
+
+    关闭前须先释放 records 返回的数组，否则映射无法解除。
+    """
+
+    def __init__(self, path=DEFAULT_LOG_PATH):
+        _check_header(path)
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # 忽略末尾可能未写完整的记录
+        self.count = (len(self._map) - HEADER.size) // RECORD.size
+        self._view = memoryview(self._map)[HEADER.size:HEADER.size + self.count * RECORD.size]
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def records(self):
+        """全部记录的零拷贝 NumPy 结构化数组（需要 NumPy）"""
+        if np is None:
+            raise RuntimeError("读取结构化数组需要安装 NumPy")
+        return np.frombuffer(self._view, dtype=RECORD_DTYPE)
+
+    def __iter__(self):
+        """逐条返回 (时间戳, n1, n2, n3, e1, e2, e3)"""
+        return RECORD.iter_unpack(self._view)
+
+    def last(self):
+        """最后一条记录，没有记录时返回 None"""
+        if not self.count:
+            return None
+        return RECORD.unpack_from(self._view, (self.count - 1) * RECORD.size)
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+
+def final_element_counts(path=DEFAULT_LOG_PATH):
+    """统计日志中各最终掌诀出现的次数，返回按掌诀序号排列的列表"""
+    size = len(divination_engine.ELEMENTS)
+    with LogReader(path) as reader:
+        if np is not None:
+            records = reader.records
+            counts = np.bincount(records["e3"], minlength=size).tolist()
+            del records
+            return counts
+        counts = [0] * size
+        for record in reader:
+            counts[record[6]] += 1
+        return counts
@@ -0,0 +1,265 @@
+"""占卜历史记录
+
+每次占卜写入本地 SQLite 数据库（WAL 模式）。写入由后台线程批量提交，不占用界面线程；
+查询按 (时间, id) 键集分页，历史再多也只读取需要的一页。
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import divination_engine
+
+# 默认数据目录
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".divination_app")
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "history.db")
+
+# 后台线程单次提交的最大条数
+BATCH_SIZE = 5000
+
+# 导出时每次读取的条数
+EXPORT_CHUNK_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    n1 INTEGER NOT NULL,
+    n2 INTEGER NOT NULL,
+    n3 INTEGER NOT NULL,
+    e1 INTEGER NOT NULL,
+    e2 INTEGER NOT NULL,
+    e3 INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_readings_timestamp ON readings (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_readings_final ON readings (e3, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_readings_numbers ON readings (n1, n2, n3);
+"""
+
+
+class HistoryRecord(namedtuple("HistoryRecord", ["id", "timestamp", "numbers", "indexes"])):
+    """一条占卜历史"""
+    __slots__ = ()
+
+    @property
+    def elements(self):
+        """三掌掌诀名称"""
+        return tuple(divination_engine.ELEMENTS[index] for index in self.indexes)
+
+    @property
+    def cursor(self):
+        """用于继续翻页的键"""
+        return self.timestamp, self.id
+
+
+def _connect(path):
+    """打开数据库连接并确保表结构存在"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _range_conditions(start=None, end=None, final_element=None):
+    """时间范围 [start, end) 与最终掌诀筛选条件"""
+    conditions = []
+    params = []
+    if start is not None:
+        conditions.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("timestamp < ?")
+        params.append(end)
+    if final_element is not None:
+        conditions.append("e3 = ?")
+        params.append(final_element)
+    return conditions, params
+
+
+def _to_record(row):
+    return HistoryRecord(row[0], row[1], (row[2], row[3], row[4]), (row[5], row[6], row[7]))
+
+
+class HistoryStore:
+    """占卜历史数据库
+
+    record 只把记录放入队列，由后台线程批量写入；查询在调用线程上使用独立连接。
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.last_error = None
+        self._queue = queue.Queue()
+        self._connection = _connect(path)
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, numbers, indexes, timestamp=None):
+        """记录一次占卜（非阻塞）"""
+        if timestamp is None:
+            timestamp = time.time()
+        self._queue.put((timestamp, *numbers, *indexes))
+
+    def flush(self):
+        """等待队列中的记录全部写入"""
+        self._queue.join()
+
+    def close(self):
+        """写完剩余记录并关闭数据库"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._connection.close()
+
+    def _write_loop(self):
+        """后台写入线程：阻塞等待首条记录，再取走队列中已有的记录一并提交"""
+        connection = _connect(self.path)
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [item for item in batch if item is not None]
+            running = len(rows) == len(batch)
+            try:
+                if rows:
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO readings (timestamp, n1, n2, n3, e1, e2, e3) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            rows)
+            except sqlite3.Error as e:
+                self.last_error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
+
+    def query_page(self, limit=50, after=None, final_element=None, descending=True):
+        """按时间分页查询
+
+        after 为上一页最后一条记录的 cursor，final_element 为掌诀序号，用于按最终掌诀筛选。
+        """
+        conditions = []
+        params = []
+        if final_element is not None:
+            conditions.append("e3 = ?")
+            params.append(final_element)
+        if after is not None:
+            conditions.append(f"(timestamp, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "DESC" if descending else "ASC"
+        rows = self._connection.execute(
+            f"SELECT id, timestamp, n1, n2, n3, e1, e2, e3 FROM readings {where} "
+            f"ORDER BY timestamp {order}, id {order} LIMIT ?",
+            (*params, limit)).fetchall()
+        return [_to_record(row) for row in rows]
+
+    def id_range(self):
+        """返回 (最小 id, 最大 id)，无记录时为 (0, 0)
+
+        id 不一定连续（删除记录或事务回滚会留下空缺），按行号定位见 step_id。
+        """
+        low, high = self._connection.execute("SELECT MIN(id), MAX(id) FROM readings").fetchone()
+        return (low or 0), (high or 0)
+
+    def step_id(self, steps, from_id=None):
+        """按 id 倒序从 from_id 移动 steps 行后的记录 id，steps 为负时向较新的记录移动
+
+        from_id 为 None 时从最新一条起算。沿主键索引前进，耗时与 steps 成正比；超出范围时返回 None。
+        """
+        if from_id is None:
+            row = self._connection.execute(
+                "SELECT id FROM readings ORDER BY id DESC LIMIT 1 OFFSET ?", (steps,)).fetchone()
+        elif steps >= 0:
+            row = self._connection.execute(
+                "SELECT id FROM readings WHERE id <= ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+                (from_id, steps)).fetchone()
+        else:
+            row = self._connection.execute(
+                "SELECT id FROM readings WHERE id >= ? ORDER BY id ASC LIMIT 1 OFFSET ?",
+                (from_id, -steps)).fetchone()
+        return row[0] if row else None
+
+    def index_of(self, record_id):
+        """按 id 倒序时该记录的行号（比它新的记录数）"""
+        return self._connection.execute("SELECT COUNT(*) FROM readings WHERE id > ?", (record_id,)).fetchone()[0]
+
+    def fetch_window(self, start_id, limit):
+        """从 start_id 起按 id 倒序取 limit 条记录，用于按行号随机定位"""
+        rows = self._connection.execute(
+            "SELECT id, timestamp, n1, n2, n3, e1, e2, e3 FROM readings "
+            "WHERE id <= ? ORDER BY id DESC LIMIT ?",
+            (start_id, limit)).fetchall()
+        return [_to_record(row) for row in rows]
+
+    def id_at_or_before(self, timestamp):
+        """不晚于 timestamp 的最近一条记录的 id，没有则返回 None"""
+        row = self._connection.execute(
+            "SELECT id FROM readings WHERE timestamp <= ? ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (timestamp,)).fetchone()
+        return row[0] if row else None
+
+    def find_by_numbers(self, numbers, limit=50):
+        """查询某组输入数字的最近记录"""
+        rows = self._connection.execute(
+            "SELECT id, timestamp, n1, n2, n3, e1, e2, e3 FROM readings "
+            "WHERE n1 = ? AND n2 = ? AND n3 = ? ORDER BY id DESC LIMIT ?",
+            (*numbers, limit)).fetchall()
+        return [_to_record(row) for row in rows]
+
+    def count_range(self, start=None, end=None, final_element=None):
+        """筛选范围内的记录数（使用独立连接，可在任意线程调用）"""
+        conditions, params = _range_conditions(start, end, final_element)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(f"SELECT COUNT(*) FROM readings {where}", params).fetchone()[0]
+        finally:
+            connection.close()
+
+    def iter_chunks(self, start=None, end=None, final_element=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """按时间顺序分块返回筛选范围内的原始行 (id, timestamp, n1, n2, n3, e1, e2, e3)
+
+        按 (时间, id) 键集翻页，内存占用只与 chunk_size 有关；使用独立连接，可在任意线程调用。
+        """
+        conditions, params = _range_conditions(start, end, final_element)
+        connection = sqlite3.connect(self.path)
+        try:
+            after = None
+            while True:
+                page = list(conditions)
+                page_params = list(params)
+                if after is not None:
+                    page.append("(timestamp, id) > (?, ?)")
+                    page_params.extend(after)
+                where = f"WHERE {' AND '.join(page)}" if page else ""
+                rows = connection.execute(
+                    f"SELECT id, timestamp, n1, n2, n3, e1, e2, e3 FROM readings {where} "
+                    f"ORDER BY timestamp, id LIMIT ?",
+                    (*page_params, chunk_size)).fetchall()
+                if not rows:
+                    return
+                yield rows
+                after = rows[-1][1], rows[-1][0]
+        finally:
+            connection.close()
+
+    def count(self):
+        """历史记录总数"""
+        return self._connection.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
+
+    def clear(self):
+        """清除全部历史"""
+        self.flush()
+        with self._connection:
+            self._connection.execute("DELETE FROM readings")
@@ -0,0 +1,281 @@
+"""虚拟化历史记录窗口
+
+只为可见区域创建固定数量的行控件，滚动时复用这些控件并按需从数据库取出当前窗口的记录，
+打开和滚动的开销与历史总条数无关。记录 id 有空缺（删除过记录）时行号无法直接换算为 id，
+改为从最近的已知位置沿主键索引按行数移动，刷新时总数按 COUNT(*) 计算。
+"""
+import time
+import tkinter as tk
+from datetime import datetime
+
+# 每行最小高度（像素），字体放大后按行距增加
+ROW_HEIGHT = 28
+
+# 单次刷新的时间预算（毫秒），超出时在底栏提示
+FRAME_BUDGET_MS = 16
+
+COLUMNS = (("时间", 20), ("数字", 10), ("第1掌", 8), ("第2掌", 8), ("第3掌", 8))
+
+
+class HistoryView:
+    """历史记录窗口内容，由调用方提供 Toplevel"""
+
+    def __init__(self, window, store, colors, element_colors, fonts):
+        self.store = store
+        self.colors = colors
+        self.element_colors = element_colors
+        self.fonts = fonts
+        self.top_index = 0
+        self.total = 0
+        self.min_id = self.max_id = 0
+        # id 无空缺时行号可直接换算为 id，否则借助上次显示的首行 (行号, id) 按相对位置定位
+        self.contiguous = True
+        self.anchor = None
+        self.rows = []
+        self._pending = None
+
+        self.window = window
+        self.window.title("📜 历史记录")
+        self.window.configure(bg=colors['bg_dark'])
+
+        self.create_toolbar()
+        self.create_table()
+        self.create_footer()
+
+        self.reload()
+
+    def create_toolbar(self):
+        """跳转到日期"""
+        toolbar = tk.Frame(self.window, bg=self.colors['bg_dark'])
+        toolbar.pack(fill="x", padx=15, pady=(15, 5))
+
+        tk.Label(toolbar,
+                 text="📅 跳转到日期：",
+                 font=self.fonts.get(11),
+                 bg=self.colors['bg_dark'],
+                 fg=self.colors['text_light']).pack(side="left")
+
+        self.date_entry = tk.Entry(toolbar,
+                                   font=self.fonts.get(11),
+                                   width=18,
+                                   bg=self.colors['bg_light'],
+                                   fg=self.colors['text_light'],
+                                   insertbackground=self.colors['text_light'])
+        self.date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
+        self.date_entry.pack(side="left", padx=5)
+        self.date_entry.bind('<Return>', lambda e: self.jump_to_date())
+
+        tk.Button(toolbar,
+                  text="跳转",
+                  command=self.jump_to_date,
+                  font=self.fonts.get(10),
+                  bg=self.colors['accent_blue'],
+                  fg='white',
+                  padx=12,
+                  cursor="hand2").pack(side="left", padx=5)
+
+        tk.Button(toolbar,
+                  text="🔄 刷新",
+                  command=self.reload,
+                  font=self.fonts.get(10),
+                  bg=self.colors['warning'],
+                  fg='white',
+                  padx=12,
+                  cursor="hand2").pack(side="right")
+
+    def create_table(self):
+        """表头、行控件池与滚动条"""
+        container = tk.Frame(self.window, bg=self.colors['bg_medium'])
+        container.pack(fill="both", expand=True, padx=15, pady=5)
+
+        header = tk.Frame(container, bg=self.colors['bg_light'])
+        header.pack(fill="x")
+        for text, width in COLUMNS:
+            tk.Label(header,
+                     text=text,
+                     width=width,
+                     font=self.fonts.get(11, 'bold'),
+                     bg=self.colors['bg_light'],
+                     fg=self.colors['accent_gold']).pack(side="left")
+
+        self.scrollbar = tk.Scrollbar(container, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body = tk.Frame(container, bg=self.colors['bg_medium'])
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.pack_propagate(False)
+        self.body.bind('<Configure>', self.on_resize)
+
+        for widget in (self.window, self.body):
+            widget.bind('<MouseWheel>', self.on_mousewheel)
+            widget.bind('<Button-4>', lambda e: self.scroll_by(-3))
+            widget.bind('<Button-5>', lambda e: self.scroll_by(3))
+        self.window.bind('<Prior>', lambda e: self.scroll_by(-len(self.rows)))
+        self.window.bind('<Next>', lambda e: self.scroll_by(len(self.rows)))
+        self.window.bind('<Up>', lambda e: self.scroll_by(-1))
+        self.window.bind('<Down>', lambda e: self.scroll_by(1))
+
+    def create_footer(self):
+        footer = tk.Frame(self.window, bg=self.colors['bg_dark'])
+        footer.pack(fill="x", padx=15, pady=(5, 15))
+
+        self.info_label = tk.Label(footer,
+                                   text="",
+                                   font=self.fonts.get(10),
+                                   bg=self.colors['bg_dark'],
+                                   fg=self.colors['text_muted'],
+                                   anchor='w')
+        self.info_label.pack(side="left", fill="x", expand=True)
+
+        tk.Button(footer,
+                  text="❌ 关闭",
+                  command=self.window.withdraw,
+                  font=self.fonts.get(11),
+                  bg=self.colors['danger'],
+                  fg='white',
+                  padx=20,
+                  pady=6,
+                  cursor="hand2").pack(side="right")
+
+    def make_row(self):
+        """创建一行控件"""
+        frame = tk.Frame(self.body, bg=self.colors['bg_medium'], height=self.row_height())
+        frame.pack(fill="x")
+        cells = []
+        for _, width in COLUMNS:
+            cell = tk.Label(frame,
+                            width=width,
+                            font=self.fonts.get(11),
+                            bg=self.colors['bg_medium'],
+                            fg=self.colors['text_light'])
+            cell.pack(side="left")
+            cell.bind('<MouseWheel>', self.on_mousewheel)
+            cell.bind('<Button-4>', lambda e: self.scroll_by(-3))
+            cell.bind('<Button-5>', lambda e: self.scroll_by(3))
+            cells.append(cell)
+        return frame, cells
+
+    def row_height(self):
+        return max(ROW_HEIGHT, self.fonts.get(11).metrics("linespace") + 8)
+
+    def on_resize(self, event):
+        """按可见高度增减行控件"""
+        visible = max(1, event.height // self.row_height())
+        while len(self.rows) < visible:
+            self.rows.append(self.make_row())
+        while len(self.rows) > visible:
+            frame, _ = self.rows.pop()
+            frame.destroy()
+        self.schedule_render()
+
+    def reload(self):
+        """重新读取记录范围；仍在后台写入队列中的记录在下次刷新时显示"""
+        self.min_id, self.max_id = self.store.id_range()
+        self.total = self.store.count()
+        self.contiguous = self.total == (self.max_id - self.min_id + 1 if self.max_id else 0)
+        self.anchor = None
+        self.top_index = min(self.top_index, max(0, self.total - len(self.rows)))
+        self.schedule_render()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.top_index = int(float(amount) * self.total)
+            self.clamp_and_render()
+        elif action == "scroll":
+            step = len(self.rows) if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def scroll_by(self, rows):
+        self.top_index += rows
+        self.clamp_and_render()
+
+    def clamp_and_render(self):
+        self.top_index = max(0, min(self.top_index, self.total - len(self.rows)))
+        self.schedule_render()
+
+    def jump_to_date(self):
+        """跳转到不晚于输入时间的最近一条记录"""
+        text = self.date_entry.get().strip()
+        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                moment = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            self.info_label.config(text="❌ 日期格式应为 YYYY-MM-DD 或 YYYY-MM-DD HH:MM")
+            return
+        if len(text) <= 10:
+            moment = moment.replace(hour=23, minute=59, second=59)
+
+        record_id = self.store.id_at_or_before(moment.timestamp())
+        if record_id is None:
+            self.info_label.config(text="📭 该日期之前没有记录")
+            return
+        if self.contiguous:
+            self.top_index = self.max_id - record_id
+        else:
+            self.top_index = self.store.index_of(record_id)
+            self.anchor = (self.top_index, record_id)
+        self.clamp_and_render()
+
+    def top_id(self):
+        """当前首行记录的 id
+
+        id 有空缺时从最新、最旧记录或上次的首行中离目标最近的一处出发，按行数移动。
+        """
+        if self.contiguous:
+            return self.max_id - self.top_index
+        index = self.top_index
+        oldest = self.total - 1 - index
+        if self.anchor is not None:
+            anchor_index, anchor_id = self.anchor
+            if abs(index - anchor_index) <= min(index, oldest):
+                return self.store.step_id(index - anchor_index, anchor_id)
+        if index <= oldest:
+            return self.store.step_id(index)
+        return self.store.step_id(-oldest, self.min_id)
+
+    def schedule_render(self):
+        """合并同一轮事件中的多次滚动，只在空闲时刷新一次"""
+        if self._pending is None:
+            self._pending = self.window.after_idle(self.render)
+
+    def render(self):
+        """取出可见窗口的记录并写入复用的行控件"""
+        self._pending = None
+        if not self.window.winfo_exists():
+            return
+        start = time.perf_counter()
+
+        top_id = self.top_id() if self.total else None
+        records = self.store.fetch_window(top_id, len(self.rows)) if top_id is not None else []
+        if records:
+            self.anchor = (self.top_index, records[0].id)
+        for row, (frame, cells) in enumerate(self.rows):
+            if row < len(records):
+                record = records[row]
+                values = (datetime.fromtimestamp(record.timestamp).strftime("%Y-%m-%d %H:%M:%S"),
+                          ", ".join(str(n) for n in record.numbers),
+                          *record.elements)
+            else:
+                values = ("",) * len(COLUMNS)
+            for column, (cell, value) in enumerate(zip(cells, values)):
+                if cell.cget("text") != value:
+                    fg = self.element_colors.get(value, self.colors['text_light']) if column >= 2 else self.colors['text_light']
+                    cell.config(text=value, fg=fg)
+
+        if self.total:
+            first = self.top_index / self.total
+            last = min(1.0, (self.top_index + len(self.rows)) / self.total)
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        budget = "" if elapsed <= FRAME_BUDGET_MS else f"  ⚠️ 超出 {FRAME_BUDGET_MS} ms 预算"
+        shown = f"{self.top_index + 1}-{self.top_index + len(records)}" if records else "0"
+        self.info_label.config(text=f"共 {self.total} 条 | 显示第 {shown} 条 | 刷新 {elapsed:.1f} ms{budget}")
@@ -0,0 +1,177 @@
+"""界面事件循环卡顿监测
+
+用高频的 root.after 心跳测量事件循环的延迟：心跳实际触发时间与预定时间之差即为界面无法响应的时长，
+计入运行指标的 event_loop_lag 直方图。后台看门狗线程在心跳停顿超过阈值时抓取主线程当前的调用栈，
+即正在阻塞事件循环的处理函数，连同卡顿时长写入日志，便于定位“窗口卡住”的原因。
+
+随运行指标一同启用（诊断窗口、DIVINATION_METRICS=1 或 --metrics）。
+"""
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+
+from history_store import DATA_DIR
+from metrics import METRICS
+
+DEFAULT_LAG_LOG_PATH = os.path.join(DATA_DIR, "lag.log")
+
+# 心跳间隔与判定卡顿的阈值（毫秒）
+HEARTBEAT_MS = 50
+STALL_THRESHOLD_MS = 200
+
+# 内存中保留的最近卡顿条数
+RECENT_STALLS = 20
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class LagMonitor:
+    """事件循环心跳与卡顿调用栈记录"""
+
+    def __init__(self, root, interval_ms=HEARTBEAT_MS, threshold_ms=STALL_THRESHOLD_MS,
+                 log_path=DEFAULT_LAG_LOG_PATH, metrics=METRICS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.log_path = log_path
+        self.metrics = metrics
+        self.running = False
+        self.beats = 0
+        self.max_lag_ms = 0.0
+        # 最近的卡顿：(发生时间, 时长毫秒, 调用栈 FrameSummary 列表或 None)
+        self.stalls = deque(maxlen=RECENT_STALLS)
+        self.stall_count = 0
+
+        self._lock = threading.Lock()
+        self._last_beat = 0.0
+        # 看门狗为当前这次停顿抓取的 (心跳序号, 调用栈)
+        self._captured = None
+        self._main_thread = None
+        self._after = None
+        self._watchdog = None
+        self._stop = threading.Event()
+        # 待写入日志的卡顿记录，由看门狗线程写入，不在界面线程上做文件 I/O
+        self._log_queue = queue.Queue()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._main_thread = threading.get_ident()
+        with self._lock:
+            self._last_beat = time.perf_counter()
+            self._captured = None
+        self._after = self.root.after(self.interval_ms, self.beat)
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        """停止心跳与看门狗，写完待记录的卡顿"""
+        if not self.running:
+            return
+        self.running = False
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+        self._stop.set()
+        self._watchdog.join()
+        self._watchdog = None
+
+    def beat(self):
+        """心跳：计算本次延迟，超过阈值时记录卡顿"""
+        now = time.perf_counter()
+        with self._lock:
+            lag = max(0.0, now - self._last_beat - self.interval_ms / 1000)
+            self._last_beat = now
+            captured, self._captured = self._captured, None
+            beat = self.beats
+            self.beats += 1
+
+        lag_ms = lag * 1000
+        if lag_ms > self.max_lag_ms:
+            self.max_lag_ms = lag_ms
+        if self.metrics.enabled:
+            self.metrics.observe("event_loop_lag", lag)
+        if lag_ms >= self.threshold_ms:
+            # 只采用本次停顿期间抓到的调用栈
+            stack = captured[1] if captured and captured[0] == beat else None
+            self.record_stall(lag_ms, stack)
+
+        self._after = self.root.after(self.interval_ms, self.beat)
+
+    def record_stall(self, lag_ms, stack):
+        entry = (datetime.now(), lag_ms, stack)
+        self.stalls.append(entry)
+        self.stall_count += 1
+        self.metrics.count("event_loop_stalls")
+        if self.log_path:
+            self._log_queue.put(entry)
+
+    def _watch(self):
+        """看门狗线程：心跳停顿超过阈值时抓取主线程调用栈，并写入卡顿日志"""
+        poll = max(self.threshold_ms / 4, 10) / 1000
+        while not self._stop.is_set():
+            self._write_log()
+            self._stop.wait(poll)
+            with self._lock:
+                stalled = (time.perf_counter() - self._last_beat) * 1000 - self.interval_ms >= self.threshold_ms
+                if not stalled or (self._captured and self._captured[0] == self.beats):
+                    continue
+                frame = sys._current_frames().get(self._main_thread)
+                beat = self.beats
+            if frame is not None:
+                stack = traceback.extract_stack(frame)
+                with self._lock:
+                    # 抓取期间界面已恢复时丢弃
+                    if self.beats == beat:
+                        self._captured = (beat, stack)
+            del frame
+        self._write_log()
+
+    def _write_log(self):
+        entries = []
+        while True:
+            try:
+                entries.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not entries:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                for when, lag_ms, stack in entries:
+                    f.write(f"[{when:%Y-%m-%d %H:%M:%S}] 界面卡顿 {lag_ms:.0f} ms\n")
+                    if stack:
+                        f.write("".join(traceback.format_list(stack)))
+                    else:
+                        f.write("  （停顿过短，未抓取到调用栈）\n")
+                    f.write("\n")
+        except OSError:
+            pass
+
+    def summary(self):
+        """诊断窗口中显示的文本行"""
+        lines = [f"事件循环：心跳 {self.beats} 次，最大延迟 {self.max_lag_ms:.1f} ms，"
+                 f"卡顿 {self.stall_count} 次（阈值 {self.threshold_ms} ms）"]
+        for when, lag_ms, stack in reversed(self.stalls):
+            where = "未抓取到调用栈"
+            if stack:
+                frame = blocking_frame(stack)
+                where = f"{frame.name}（{os.path.basename(frame.filename)}:{frame.lineno}）"
+            lines.append(f"  {when:%H:%M:%S}  {lag_ms:>7.0f} ms  {where}")
+        return lines
+
+
+def blocking_frame(stack):
+    """调用栈中最内层的本程序代码帧，即阻塞事件循环的处理函数；找不到时取最内层帧"""
+    for frame in reversed(stack):
+        if os.path.dirname(os.path.abspath(frame.filename)) == APP_DIR:
+            return frame
+    return stack[-1]
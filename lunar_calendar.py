@@ -0,0 +1,302 @@
+"""农历换算
+
+公历转农历（含闰月），基于 1900-2100 年的位压缩年表。
+不依赖 tkinter，可单独导入。
+"""
+import csv
+import os
+import time
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时批量接口退回逐条换算
+    np = None
+
+# 每年一个整数：
+#   低 4 位     闰月月份（0 表示无闰月）
+#   第 4-15 位  第 1-12 月大小月（从高位 0x8000 对应正月起，1 为大月 30 天，0 为小月 29 天）
+#   第 16 位    闰月大小（1 为 30 天）
+LUNAR_YEAR_INFO = array('L', [
+    0x04bd8, 0x04ae0, 0x0a570, 0x054d5, 0x0d260, 0x0d950, 0x16554, 0x056a0, 0x09ad0, 0x055d2,  # 1900-1909
+    0x04ae0, 0x0a5b6, 0x0a4d0, 0x0d250, 0x1d255, 0x0b540, 0x0d6a0, 0x0ada2, 0x095b0, 0x14977,  # 1910-1919
+    0x04970, 0x0a4b0, 0x0b4b5, 0x06a50, 0x06d40, 0x1ab54, 0x02b60, 0x09570, 0x052f2, 0x04970,  # 1920-1929
+    0x06566, 0x0d4a0, 0x0ea50, 0x16a95, 0x05ad0, 0x02b60, 0x186e3, 0x092e0, 0x1c8d7, 0x0c950,  # 1930-1939
+    0x0d4a0, 0x1d8a6, 0x0b550, 0x056a0, 0x1a5b4, 0x025d0, 0x092d0, 0x0d2b2, 0x0a950, 0x0b557,  # 1940-1949
+    0x06ca0, 0x0b550, 0x15355, 0x04da0, 0x0a5b0, 0x14573, 0x052b0, 0x0a9a8, 0x0e950, 0x06aa0,  # 1950-1959
+    0x0aea6, 0x0ab50, 0x04b60, 0x0aae4, 0x0a570, 0x05260, 0x0f263, 0x0d950, 0x05b57, 0x056a0,  # 1960-1969
+    0x096d0, 0x04dd5, 0x04ad0, 0x0a4d0, 0x0d4d4, 0x0d250, 0x0d558, 0x0b540, 0x0b6a0, 0x195a6,  # 1970-1979
+    0x095b0, 0x049b0, 0x0a974, 0x0a4b0, 0x0b27a, 0x06a50, 0x06d40, 0x0af46, 0x0ab60, 0x09570,  # 1980-1989
+    0x04af5, 0x04970, 0x064b0, 0x074a3, 0x0ea50, 0x06b58, 0x05ac0, 0x0ab60, 0x096d5, 0x092e0,  # 1990-1999
+    0x0c960, 0x0d954, 0x0d4a0, 0x0da50, 0x07552, 0x056a0, 0x0abb7, 0x025d0, 0x092d0, 0x0cab5,  # 2000-2009
+    0x0a950, 0x0b4a0, 0x0baa4, 0x0ad50, 0x055d9, 0x04ba0, 0x0a5b0, 0x15176, 0x052b0, 0x0a930,  # 2010-2019
+    0x07954, 0x06aa0, 0x0ad50, 0x05b52, 0x04b60, 0x0a6e6, 0x0a4e0, 0x0d260, 0x0ea65, 0x0d530,  # 2020-2029
+    0x05aa0, 0x076a3, 0x096d0, 0x04afb, 0x04ad0, 0x0a4d0, 0x1d0b6, 0x0d250, 0x0d520, 0x0dd45,  # 2030-2039
+    0x0b5a0, 0x056d0, 0x055b2, 0x049b0, 0x0a577, 0x0a4b0, 0x0aa50, 0x1b255, 0x06d20, 0x0ada0,  # 2040-2049
+    0x14b63, 0x09370, 0x049f8, 0x04970, 0x064b0, 0x168a6, 0x0ea50, 0x06aa0, 0x1a6c4, 0x0aae0,  # 2050-2059
+    0x092e0, 0x0d2e3, 0x0c960, 0x0d557, 0x0d4a0, 0x0da50, 0x05d55, 0x056a0, 0x0a6d0, 0x055d4,  # 2060-2069
+    0x052d0, 0x0a9b8, 0x0a950, 0x0b4a0, 0x0b6a6, 0x0ad50, 0x055a0, 0x0aba4, 0x0a5b0, 0x052b0,  # 2070-2079
+    0x0b273, 0x06930, 0x07337, 0x06aa0, 0x0ad50, 0x14b55, 0x04b60, 0x0a570, 0x054e4, 0x0d160,  # 2080-2089
+    0x0e968, 0x0d520, 0x0daa0, 0x16aa6, 0x056d0, 0x04ae0, 0x0a9d4, 0x0a2d0, 0x0d150, 0x0f252,  # 2090-2099
+    0x0d520,                                                                                    # 2100
+])
+
+FIRST_YEAR = 1900
+# 农历 1900 年正月初一对应的公历日期
+BASE_DATE = date(1900, 1, 31)
+BASE_ORDINAL = BASE_DATE.toordinal()
+
+LUNAR_MONTH_NAMES = ("正月", "二月", "三月", "四月", "五月", "六月",
+                     "七月", "八月", "九月", "十月", "冬月", "腊月")
+
+LUNAR_DAY_NAMES = ("初一", "初二", "初三", "初四", "初五", "初六", "初七", "初八", "初九", "初十",
+                   "十一", "十二", "十三", "十四", "十五", "十六", "十七", "十八", "十九", "二十",
+                   "廿一", "廿二", "廿三", "廿四", "廿五", "廿六", "廿七", "廿八", "廿九", "三十")
+
+SHICHEN_NAMES = ("子时", "丑时", "寅时", "卯时", "辰时", "巳时",
+                 "午时", "未时", "申时", "酉时", "戌时", "亥时")
+
+# 小时到时辰序号（1-12）的对照表：23 点与 0 点为子时，此后每两小时一个时辰
+SHICHEN_BY_HOUR = tuple((hour + 1) // 2 % 12 + 1 for hour in range(24))
+
+# 1970-01-01 及其公历序数，用于把时间戳换算为日期
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+# 参考数据集，用于校验换算结果
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lunar_reference.csv")
+
+
+def _decode_year(info):
+    """解出一年各月（按先后顺序，含闰月）的 (月份, 是否闰月, 天数)"""
+    leap_month = info & 0xf
+    months = []
+    for month in range(1, 13):
+        months.append((month, False, 30 if info & (0x10000 >> month) else 29))
+        if month == leap_month:
+            months.append((month, True, 30 if info & 0x10000 else 29))
+    return months
+
+
+def _build_offsets():
+    """导入时一次性展开年表
+
+    返回每年正月初一距 BASE_DATE 的天数、每个农历月的起始天数以及对应的 (月份, 是否闰月)，
+    换算时只需两次二分查找，无需逐年累加。
+    """
+    year_starts = array('l')
+    month_starts = array('l')
+    month_keys = []
+    month_index = array('l')
+    offset = 0
+    for info in LUNAR_YEAR_INFO:
+        year_starts.append(offset)
+        month_index.append(len(month_starts))
+        for month, is_leap, days in _decode_year(info):
+            month_starts.append(offset)
+            month_keys.append((month, is_leap))
+            offset += days
+    year_starts.append(offset)
+    month_index.append(len(month_starts))
+    month_starts.append(offset)
+    return year_starts, month_starts, tuple(month_keys), month_index
+
+
+YEAR_STARTS, MONTH_STARTS, MONTH_KEYS, YEAR_MONTH_INDEX = _build_offsets()
+
+# 批量换算用的逐月对照表：每个农历月所在的农历年、月份与是否闰月
+MONTH_YEARS = array('H', (FIRST_YEAR + year_index
+                          for year_index in range(len(LUNAR_YEAR_INFO))
+                          for _ in range(YEAR_MONTH_INDEX[year_index + 1] - YEAR_MONTH_INDEX[year_index])))
+MONTH_NUMBERS = array('B', (month for month, _ in MONTH_KEYS))
+MONTH_LEAPS = array('B', (is_leap for _, is_leap in MONTH_KEYS))
+
+# 可换算的公历日期范围
+MIN_DATE = BASE_DATE
+MAX_DATE = date.fromordinal(BASE_ORDINAL + YEAR_STARTS[-1] - 1)
+
+
+def gregorian_to_lunar(value):
+    """公历转农历
+
+    value 为 date 或 datetime，返回 (农历年, 月, 日, 是否闰月)。
+    """
+    offset = value.toordinal() - BASE_ORDINAL
+    if not 0 <= offset < YEAR_STARTS[-1]:
+        raise ValueError(f"日期超出农历表范围（{MIN_DATE} 至 {MAX_DATE}）")
+
+    year_index = bisect_right(YEAR_STARTS, offset) - 1
+    month_pos = bisect_right(MONTH_STARTS, offset, YEAR_MONTH_INDEX[year_index],
+                             YEAR_MONTH_INDEX[year_index + 1]) - 1
+    month, is_leap = MONTH_KEYS[month_pos]
+    return FIRST_YEAR + year_index, month, offset - MONTH_STARTS[month_pos] + 1, is_leap
+
+
+def get_shichen(hour):
+    """返回小时对应的 (时辰名称, 时辰序号 1-12)"""
+    shichen_num = SHICHEN_BY_HOUR[hour]
+    return SHICHEN_NAMES[shichen_num - 1], shichen_num
+
+
+def local_utc_offset(timestamp=None):
+    """本机时区在 timestamp（默认为当前时间）时相对 UTC 的偏移秒数，含夏令时"""
+    return time.localtime(timestamp).tm_gmtoff
+
+
+def to_divination_number(value, modulus):
+    """把农历月、日或时辰序号折算为 1..modulus 的占卜数字"""
+    return value % modulus or modulus
+
+
+def format_lunar(month, day, is_leap):
+    """生成农历月日的中文写法，如“闰四月初五”"""
+    return f"{'闰' if is_leap else ''}{LUNAR_MONTH_NAMES[month - 1]}{LUNAR_DAY_NAMES[day - 1]}"
+
+
+def validate_reference(path=REFERENCE_PATH):
+    """用参考数据集校验换算结果，返回不一致的行"""
+    mismatches = []
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            solar = date.fromisoformat(row["公历"])
+            expected = (int(row["农历年"]), int(row["农历月"]), int(row["农历日"]), row["闰月"] == "1")
+            actual = gregorian_to_lunar(solar)
+            if actual != expected:
+                mismatches.append((solar, expected, actual))
+    return mismatches
+
+
+# 批量换算结果：各字段为等长数组
+LunarBatch = namedtuple("LunarBatch", ["year", "month", "day", "leap", "shichen"])
+
+
+# 各地时区偏移与夏令时切换都发生在整刻钟，同一刻钟内的时间戳偏移相同
+OFFSET_BUCKET_SECONDS = 900
+
+
+def _local_offsets(seconds):
+    """各 UTC 秒数对应时刻的本机时区偏移（NumPy 数组），每个刻钟只查询一次"""
+    buckets, inverse = np.unique(seconds // OFFSET_BUCKET_SECONDS, return_inverse=True)
+    try:
+        offsets = np.array([local_utc_offset(int(bucket) * OFFSET_BUCKET_SECONDS) for bucket in buckets],
+                           dtype=np.int64)
+    except (OverflowError, OSError):
+        raise ValueError(f"日期超出农历表范围（{MIN_DATE} 至 {MAX_DATE}）")
+    return offsets[inverse.reshape(seconds.shape)]
+
+
+def _batch_local_seconds(timestamps, tz_offset):
+    """把时间戳序列统一换算为本地时间的整数秒（NumPy 数组）
+
+    datetime64 数组与 datetime 对象按本地时间处理；数值按 UTC 秒数处理，加上 tz_offset，
+    tz_offset 为 None 时加上各时间戳当时的本机时区偏移。
+    """
+    if not hasattr(timestamps, "__len__"):
+        timestamps = list(timestamps)
+    values = np.asarray(timestamps)
+    if values.dtype.kind in "MO":
+        return values.astype("datetime64[s]").astype(np.int64)
+    seconds = np.floor(values).astype(np.int64)
+    if tz_offset is None:
+        return seconds + _local_offsets(seconds)
+    return seconds + tz_offset
+
+
+def gregorian_to_lunar_batch(timestamps, tz_offset=None):
+    """批量公历转农历
+
+    timestamps 可以是 datetime 对象的序列或迭代器、NumPy datetime64 数组，
+    或 UTC 秒数（POSIX 时间戳）数组。后者默认按本机时区换算为本地时间，每个时间戳使用当时的偏移
+    （含夏令时），与 LunarCalendar.get_lunar_date 一致；指定 tz_offset 时统一加上这一固定偏移秒数。
+    返回 LunarBatch，各字段为等长整数数组（安装了 NumPy 时为 numpy.ndarray，否则为 array.array）。
+    """
+    if np is not None:
+        seconds = _batch_local_seconds(timestamps, tz_offset)
+        days, day_seconds = np.divmod(seconds, 86400)
+        offsets = days + (EPOCH_ORDINAL - BASE_ORDINAL)
+        if offsets.size and (offsets.min() < 0 or offsets.max() >= YEAR_STARTS[-1]):
+            raise ValueError(f"日期超出农历表范围（{MIN_DATE} 至 {MAX_DATE}）")
+        month_starts = np.frombuffer(MONTH_STARTS, dtype=np.int64 if MONTH_STARTS.itemsize == 8 else np.int32)
+        month_pos = np.searchsorted(month_starts, offsets, side="right") - 1
+        return LunarBatch(
+            np.frombuffer(MONTH_YEARS, dtype=np.uint16)[month_pos],
+            np.frombuffer(MONTH_NUMBERS, dtype=np.uint8)[month_pos],
+            (offsets - month_starts[month_pos] + 1).astype(np.uint8),
+            np.frombuffer(MONTH_LEAPS, dtype=np.uint8)[month_pos],
+            np.asarray(SHICHEN_BY_HOUR, dtype=np.uint8)[day_seconds // 3600]
+        )
+
+    result = LunarBatch(array('H'), array('B'), array('B'), array('B'), array('B'))
+    for value in timestamps:
+        if not isinstance(value, datetime):
+            if tz_offset is not None:
+                value = EPOCH + timedelta(seconds=int(value // 1) + tz_offset)
+            else:
+                try:
+                    value = datetime.fromtimestamp(value // 1)
+                except (OverflowError, OSError):
+                    raise ValueError(f"日期超出农历表范围（{MIN_DATE} 至 {MAX_DATE}）")
+        year, month, day, is_leap = gregorian_to_lunar(value)
+        result.year.append(year)
+        result.month.append(month)
+        result.day.append(day)
+        result.leap.append(is_leap)
+        result.shichen.append(SHICHEN_BY_HOUR[value.hour])
+    return result
+
+
+def lunar_numbers_batch(timestamps, tz_offset=None):
+    """批量获取可用于占卜的 (月数字, 日数字, 时数字) 三个数组
+
+    结果可直接传给 divination_engine.get_element_indexes_batch。
+    """
+    batch = gregorian_to_lunar_batch(timestamps, tz_offset)
+    if np is not None:
+        return (batch.month,
+                ((batch.day - 1) % 9 + 1).astype(np.uint8),
+                ((batch.shichen - 1) % 9 + 1).astype(np.uint8))
+    return (array('B', (to_divination_number(month, 12) for month in batch.month)),
+            array('B', (to_divination_number(day, 9) for day in batch.day)),
+            array('B', (to_divination_number(shichen, 9) for shichen in batch.shichen)))
+
+
+class LunarCalendar:
+    """农历查询类"""
+    LUNAR_MONTHS = list(LUNAR_MONTH_NAMES)
+
+    @classmethod
+    def get_lunar_date(cls, when=None):
+        """获取农历日期
+
+        when 为 datetime 或 POSIX 时间戳，默认为当前时间。
+        """
+        if when is None:
+            when = datetime.now()
+        elif not isinstance(when, datetime):
+            when = datetime.fromtimestamp(when)
+
+        _, month, day, is_leap = gregorian_to_lunar(when)
+        shichen, shichen_num = get_shichen(when.hour)
+
+        return {
+            "月数字": to_divination_number(month, 12),
+            "日数字": to_divination_number(day, 9),
+            "时数字": to_divination_number(shichen_num, 9),
+            "时辰": shichen,
+            "农历": format_lunar(month, day, is_leap)
+        }
+
+    @classmethod
+    def get_lunar_numbers_batch(cls, timestamps, tz_offset=None):
+        """批量获取占卜数字，见 lunar_numbers_batch"""
+        return lunar_numbers_batch(timestamps, tz_offset)
+
+
+if __name__ == "__main__":
+    errors = validate_reference()
+    for solar, expected, actual in errors[:20]:
+        print(f"{solar}：期望 {expected}，实际 {actual}")
+    print("农历换算校验通过" if not errors else f"农历换算校验失败：{len(errors)} 处不一致")
@@ -0,0 +1,198 @@
+"""运行指标
+
+对占卜计算、综合解读生成、结果渲染、文件保存、农历查询等热点路径计时和计数。
+默认关闭：关闭时 timer 返回共享的空计时器，count 只判断一次开关，几乎不增加开销。
+可在诊断窗口（Ctrl+Shift+D）中开启，或设置环境变量 DIVINATION_METRICS=1、启动参数 --metrics 开启；
+结果可导出为 JSON 或 Prometheus 文本格式，便于随问题反馈附上实际数据。
+"""
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+# 耗时直方图的桶上界（秒）
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Prometheus 指标名前缀
+PREFIX = "divination_"
+
+
+class Timing:
+    """一项计时的累计值：次数、总耗时、最长耗时（秒）与各桶计数（非累积）"""
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # 最后一个桶对应 +Inf
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def to_dict(self):
+        cumulative = []
+        running = 0
+        for count in self.buckets:
+            running += count
+            cumulative.append(running)
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": {**{str(bound): n for bound, n in zip(BUCKETS, cumulative)}, "+Inf": cumulative[-1]}
+        }
+
+
+class _NullTimer:
+    """指标关闭时使用的空计时器"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "begin")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.begin)
+        return False
+
+
+class Metrics:
+    """计时与计数的集合，可在任意线程上记录"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # 名称 -> Timing
+        self.timings = {}
+        # 名称 -> 累计值
+        self.counters = {}
+        self.since = time.time()
+
+    def timer(self, name):
+        """with metrics.timer("名称"): ... 统计代码块耗时"""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """装饰器：统计函数每次调用的耗时"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                begin = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - begin)
+            return wrapper
+        return decorate
+
+    def observe(self, name, seconds):
+        """记录一次耗时（秒）"""
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = Timing()
+            timing.count += 1
+            timing.total += seconds
+            if seconds > timing.max:
+                timing.max = seconds
+            timing.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def count(self, name, amount=1):
+        """累加计数"""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+            self.since = time.time()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "since": datetime.fromtimestamp(self.since).isoformat(timespec="seconds"),
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "enabled": self.enabled,
+                "timings": {name: timing.to_dict() for name, timing in sorted(self.timings.items())},
+                "counters": dict(sorted(self.counters.items()))
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus 文本格式：计时为 histogram（秒），计数为 counter"""
+        snapshot = self.to_dict()
+        lines = []
+        for name, timing in snapshot["timings"].items():
+            metric = f"{PREFIX}{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for bound, count in timing["buckets"].items():
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {count}')
+            lines.append(f"{metric}_sum {timing['total_ms'] / 1000:.6f}")
+            lines.append(f"{metric}_count {timing['count']}")
+        for name, value in snapshot["counters"].items():
+            metric = f"{PREFIX}{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def render(self, fmt):
+        """按格式（json 或 prometheus）生成导出内容"""
+        if fmt == "prometheus":
+            return self.to_prometheus()
+        return self.to_json()
+
+    def format_report(self):
+        """诊断窗口中显示的文本表格"""
+        snapshot = self.to_dict()
+        lines = [f"统计起点：{snapshot['since']}    状态：{'收集中' if self.enabled else '已关闭'}", ""]
+        lines.append(f"{'计时项':<24}{'次数':>8}{'平均 ms':>12}{'最长 ms':>12}{'合计 ms':>12}")
+        lines.append("-" * 68)
+        for name, timing in snapshot["timings"].items():
+            lines.append(f"{name:<24}{timing['count']:>8}{timing['mean_ms']:>12.3f}"
+                         f"{timing['max_ms']:>12.3f}{timing['total_ms']:>12.1f}")
+        if not snapshot["timings"]:
+            lines.append("（暂无数据）")
+        if snapshot["counters"]:
+            lines.append("")
+            lines.append(f"{'计数项':<24}{'累计':>8}")
+            lines.append("-" * 68)
+            for name, value in snapshot["counters"].items():
+                lines.append(f"{name:<24}{value:>8}")
+        return "\n".join(lines)
+
+
+def format_for_path(path):
+    """按扩展名判断导出格式：.prom、.txt 为 Prometheus 文本，其余为 JSON"""
+    return "prometheus" if os.path.splitext(path)[1].lower() in (".prom", ".txt") else "json"
+
+
+# 全局指标，各模块直接导入使用
+METRICS = Metrics(os.environ.get("DIVINATION_METRICS", "") not in ("", "0"))
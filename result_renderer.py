@@ -0,0 +1,76 @@
+"""结果区域差量渲染
+
+记住每个控件当前显示的内容，新的结果只写入真正变化的控件；同一轮事件中的多次更新
+合并为一次空闲回调，连续快速占卜时界面只刷新最后一次结果。
+"""
+import tkinter as tk
+
+from metrics import METRICS
+
+
+class ResultRenderer:
+    """按控件缓存已显示内容，空闲时统一写入变化部分"""
+
+    def __init__(self, root):
+        self.root = root
+        # 控件 -> 已显示内容（标签为选项字典，文本框为字符串）
+        self.shown = {}
+        # 控件 -> 待写入内容
+        self.pending = {}
+        self._scheduled = None
+        # 刷新次数、实际写入的控件数、因内容未变而跳过的控件数
+        self.frames = 0
+        self.updates = 0
+        self.skipped = 0
+
+    def set_label(self, widget, **options):
+        """更新标签选项（text、fg 等）"""
+        self.pending[widget] = options
+        self.schedule()
+
+    def set_text(self, widget, text):
+        """替换只读文本框的全部内容"""
+        self.pending[widget] = text
+        self.schedule()
+
+    def invalidate(self):
+        """控件被直接修改（如更换主题）后调用，下次刷新时全部重新写入"""
+        self.shown.clear()
+
+    def schedule(self):
+        if self._scheduled is None:
+            self._scheduled = self.root.after_idle(self.flush)
+
+    def flush(self):
+        """写入待更新内容，跳过与当前显示相同的控件"""
+        if self._scheduled is not None:
+            self.root.after_cancel(self._scheduled)
+            self._scheduled = None
+        pending, self.pending = self.pending, {}
+        self.frames += 1
+        with METRICS.timer("render_flush"):
+            self.write(pending)
+
+    def write(self, pending):
+        """逐个控件对比并写入变化的内容"""
+        for widget, value in pending.items():
+            shown = self.shown.get(widget)
+            if isinstance(value, dict):
+                if shown is None:
+                    shown = self.shown[widget] = {}
+                changed = {key: option for key, option in value.items() if shown.get(key) != option}
+                if not changed:
+                    self.skipped += 1
+                    continue
+                widget.config(**changed)
+                shown.update(changed)
+            else:
+                if shown == value:
+                    self.skipped += 1
+                    continue
+                widget.config(state='normal')
+                widget.delete(1.0, tk.END)
+                widget.insert(1.0, value)
+                widget.config(state='disabled')
+                self.shown[widget] = value
+            self.updates += 1
@@ -0,0 +1,98 @@
+"""启动耗时统计
+
+记录模块导入、各界面区域构建以及窗口首帧显示的耗时，用于追踪冷启动性能变化。
+由 divination_app.py --profile-startup 启用。
+"""
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """按阶段记录启动耗时，时间均相对于 start（time.perf_counter 的值）"""
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        # (阶段, 距启动的毫秒数)
+        self.marks = []
+        # (区域, 耗时毫秒, 新建控件数)
+        self.sections = []
+        self._widget_count = None
+
+    def mark(self, name, moment=None):
+        """记录到达某一阶段的时间"""
+        if moment is None:
+            moment = time.perf_counter()
+        self.marks.append((name, (moment - self.start) * 1000))
+
+    @contextmanager
+    def section(self, name, root=None):
+        """统计一段界面构建的耗时，提供 root 时同时统计新建的控件数"""
+        widgets = count_widgets(root) if root is not None else 0
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - begin) * 1000
+            if root is not None:
+                widgets = count_widgets(root) - widgets
+            self.sections.append((name, elapsed, widgets))
+
+    def watch_first_frame(self, root, callback=None):
+        """窗口首次映射且完成挂起的重绘后记录首帧时间，然后调用 callback(profiler)"""
+        state = {"mapped": False}
+
+        def on_map(event):
+            # 不解除绑定：旧版 tkinter 的 unbind 会清除该事件上的全部绑定
+            if event.widget is root and not state["mapped"]:
+                state["mapped"] = True
+                root.after_idle(first_frame)
+
+        def first_frame():
+            self.mark("首帧显示")
+            self._widget_count = count_widgets(root)
+            if callback:
+                callback(self)
+
+        root.bind('<Map>', on_map, '+')
+
+    def to_dict(self):
+        return {
+            "marks": {name: round(ms, 2) for name, ms in self.marks},
+            "sections": [{"name": name, "ms": round(ms, 2), "widgets": widgets}
+                         for name, ms, widgets in self.sections],
+            "widgets": self._widget_count
+        }
+
+    def format_report(self):
+        lines = ["启动耗时统计", "=" * 40]
+        for name, ms in self.marks:
+            lines.append(f"{name:<12}{ms:>10.1f} ms")
+        lines.append("")
+        lines.append("界面构建（区域 / 耗时 / 新建控件）")
+        for name, ms, widgets in self.sections:
+            lines.append(f"{name:<12}{ms:>10.1f} ms{widgets:>8}")
+        if self._widget_count is not None:
+            lines.append("")
+            lines.append(f"首帧时控件总数：{self._widget_count}")
+        return "\n".join(lines)
+
+    def report(self, path="-"):
+        """输出统计结果：path 为 - 时打印文本报告，否则写入 JSON 文件"""
+        if path == "-":
+            print(self.format_report(), file=sys.stderr)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+def count_widgets(root):
+    """root 下的控件总数（含菜单）"""
+    count = 0
+    pending = [root]
+    while pending:
+        children = pending.pop().winfo_children()
+        count += len(children)
+        pending.extend(children)
+    return count
@@ -0,0 +1,258 @@
+"""主题
+
+各主题的配色在导入时一次算好（含按钮悬停色等派生颜色），切换主题时按“旧颜色 -> 新颜色”的映射
+原地修改现有控件的颜色，不销毁重建界面。
+
+每个顶层窗口记录自己当前使用的主题：切换时只为可见的窗口执行一次 Tcl 批量着色，
+隐藏的对话框在下次显示前（DialogManager.show）再着色，切换耗时与已创建的对话框数量无关。
+"""
+import json
+import os
+from functools import lru_cache
+
+from history_store import DATA_DIR
+
+THEME_SETTINGS_PATH = os.path.join(DATA_DIR, "theme.json")
+
+DEFAULT_THEME = "midnight"
+
+# 主题名 -> (显示名称, 基础配色)
+THEMES = {
+    "midnight": ("🌌 深夜紫", {
+        'bg_dark': '#1a1a2e',
+        'bg_medium': '#16213e',
+        'bg_light': '#0f3460',
+        'primary': '#e94560',
+        'secondary': '#533483',
+        'success': '#4CAF50',
+        'warning': '#FF9800',
+        'danger': '#F44336',
+        'text_light': '#ffffff',
+        'text_muted': '#b0b0b0',
+        'accent_gold': '#FFD700',
+        'accent_blue': '#2196F3',
+        'accent_purple': '#9C27B0',
+        'element_void': '#607D8B',
+        'element_sick': '#795548',
+        'element_romance': '#E91E63'
+    }),
+    "jade": ("🍃 青瓷", {
+        'bg_dark': '#0f2027',
+        'bg_medium': '#16323a',
+        'bg_light': '#1f4a52',
+        'primary': '#26a69a',
+        'secondary': '#00796b',
+        'success': '#66bb6a',
+        'warning': '#ffa726',
+        'danger': '#ef5350',
+        'text_light': '#f1f8f6',
+        'text_muted': '#a7c4bf',
+        'accent_gold': '#ffd54f',
+        'accent_blue': '#4fc3f7',
+        'accent_purple': '#ba68c8',
+        'element_void': '#78909c',
+        'element_sick': '#8d6e63',
+        'element_romance': '#f06292'
+    }),
+    "ink": ("🖌️ 墨韵", {
+        'bg_dark': '#121212',
+        'bg_medium': '#1e1e1e',
+        'bg_light': '#2c2c2c',
+        'primary': '#c62828',
+        'secondary': '#455a64',
+        'success': '#43a047',
+        'warning': '#fb8c00',
+        'danger': '#e53935',
+        'text_light': '#eeeeee',
+        'text_muted': '#9e9e9e',
+        'accent_gold': '#d4af37',
+        'accent_blue': '#1e88e5',
+        'accent_purple': '#8e24aa',
+        'element_void': '#78909c',
+        'element_sick': '#6d4c41',
+        'element_romance': '#d81b60'
+    }),
+    "paper": ("📜 宣纸", {
+        'bg_dark': '#f5efe0',
+        'bg_medium': '#ebe3cf',
+        'bg_light': '#fffaf0',
+        'primary': '#b23a48',
+        'secondary': '#6b4c9a',
+        'success': '#2e7d32',
+        'warning': '#e65100',
+        'danger': '#c62828',
+        'text_light': '#2b2b2b',
+        'text_muted': '#6d6d6d',
+        'accent_gold': '#9c6b00',
+        'accent_blue': '#1565c0',
+        'accent_purple': '#7b1fa2',
+        'element_void': '#546e7a',
+        'element_sick': '#5d4037',
+        'element_romance': '#ad1457'
+    })
+}
+
+# 掌诀 -> 配色中的颜色名
+ELEMENT_ROLES = {
+    "大安": 'success',
+    "留连": 'warning',
+    "速喜": 'danger',
+    "赤口": 'accent_purple',
+    "小吉": 'accent_blue',
+    "空亡": 'element_void',
+    "病符": 'element_sick',
+    "桃花": 'element_romance',
+    "天德": 'accent_gold'
+}
+
+# 按钮悬停色（activebackground）由这些颜色调亮得到
+BUTTON_ROLES = ('primary', 'secondary', 'success', 'warning', 'danger', 'accent_blue', 'accent_purple')
+HOVER_AMOUNT = 20
+
+
+def parse_color(color):
+    """'#rgb' 或 '#rrggbb' -> (r, g, b)；其他写法（颜色名等）返回 None"""
+    if not color.startswith('#') or len(color) not in (4, 7):
+        return None
+    digits = color[1:]
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    try:
+        return tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def adjust_color(color, amount):
+    """各通道加上 amount（可为负）并截断到 0-255；无法解析的颜色原样返回"""
+    rgb = parse_color(color)
+    if rgb is None:
+        return color
+    return "#" + "".join(f"{min(255, max(0, channel + amount)):02x}" for channel in rgb)
+
+
+def lighten(color, amount=30):
+    return adjust_color(color, amount)
+
+
+def darken(color, amount=30):
+    return adjust_color(color, -amount)
+
+
+def build_palette(base):
+    """基础配色加上派生颜色"""
+    palette = dict(base)
+    for role in BUTTON_ROLES:
+        palette[f"{role}_hover"] = lighten(base[role], HOVER_AMOUNT)
+    return palette
+
+
+PALETTES = {name: build_palette(base) for name, (_, base) in THEMES.items()}
+
+
+@lru_cache(maxsize=None)
+def transition(old, new):
+    """old 主题切换到 new 主题的颜色映射，展开为 Tcl 字典所需的 (旧, 新, 旧, 新, ...)"""
+    mapping = {}
+    old_palette, new_palette = PALETTES[old], PALETTES[new]
+    for role, color in old_palette.items():
+        # Tk 按设置时的写法返回颜色，统一小写后比较
+        mapping.setdefault(color.lower(), new_palette[role])
+    return tuple(item for pair in mapping.items() for item in pair)
+
+
+# 遍历一个顶层窗口下的全部控件（跳过嵌套的 Toplevel），按映射替换颜色选项，返回修改的选项数
+RECOLOR_SCRIPT = """
+proc ::divination_color_options {w} {
+    set class [winfo class $w]
+    if {![info exists ::divination_color_option_cache($class)]} {
+        set found {}
+        foreach spec [$w configure] {
+            set option [lindex $spec 0]
+            if {[llength $spec] == 5 && $option in {%s}} {
+                lappend found $option
+            }
+        }
+        set ::divination_color_option_cache($class) $found
+    }
+    return $::divination_color_option_cache($class)
+}
+
+proc ::divination_recolor {w map} {
+    set count 0
+    foreach option [::divination_color_options $w] {
+        set key [string tolower [$w cget $option]]
+        if {[dict exists $map $key]} {
+            $w configure $option [dict get $map $key]
+            incr count
+        }
+    }
+    foreach child [winfo children $w] {
+        if {[winfo class $child] ne "Toplevel"} {
+            incr count [::divination_recolor $child $map]
+        }
+    }
+    return $count
+}
+""" % " ".join(("-background", "-foreground", "-activebackground", "-activeforeground", "-insertbackground",
+                "-selectcolor", "-selectbackground", "-highlightbackground", "-disabledforeground",
+                "-troughcolor"))
+
+
+class ThemeManager:
+    """当前主题与各顶层窗口的着色状态
+
+    colors、element_colors 为共享的字典，切换时原地更新，持有引用的代码随后新建的控件自动使用新配色。
+    """
+
+    def __init__(self, root, name=DEFAULT_THEME):
+        if name not in PALETTES:
+            name = DEFAULT_THEME
+        self.root = root
+        self.name = name
+        self.colors = dict(PALETTES[name])
+        self.element_colors = {element: self.colors[role] for element, role in ELEMENT_ROLES.items()}
+        # 顶层窗口路径 -> 该窗口当前使用的主题
+        self.painted = {str(root): name}
+        self._script_loaded = False
+
+    def apply(self, name, windows):
+        """切换到 name 主题并立即为 windows（可见的顶层窗口）着色，返回修改的颜色选项数"""
+        self.name = name
+        self.colors.update(PALETTES[name])
+        for element, role in ELEMENT_ROLES.items():
+            self.element_colors[element] = self.colors[role]
+        return sum(self.sync(window) for window in windows)
+
+    def sync(self, window):
+        """使窗口与当前主题一致；新窗口按当前配色创建，只需登记"""
+        path = str(window)
+        painted = self.painted.get(path)
+        self.painted[path] = self.name
+        if painted is None or painted == self.name:
+            return 0
+        if not self._script_loaded:
+            self.root.tk.eval(RECOLOR_SCRIPT)
+            self._script_loaded = True
+        return int(self.root.tk.call("::divination_recolor", path, transition(painted, self.name)))
+
+
+def theme_names():
+    """(主题名, 显示名称) 列表"""
+    return [(name, label) for name, (label, _) in THEMES.items()]
+
+
+def load_theme_name(path=THEME_SETTINGS_PATH):
+    """读取上次选择的主题，没有或无法读取时返回默认主题"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            name = json.load(f).get("theme")
+    except (OSError, ValueError, AttributeError):
+        return DEFAULT_THEME
+    return name if name in THEMES else DEFAULT_THEME
+
+
+def theme_settings(name):
+    """保存到 THEME_SETTINGS_PATH 的内容"""
+    return json.dumps({"theme": name}, ensure_ascii=False)
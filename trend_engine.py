@@ -0,0 +1,203 @@
+"""运势趋势统计
+
+对占卜历史维护增量汇总：各掌诀出现次数、按日/周/月的吉凶得分滚动窗口以及连续出现的记录。
+每次占卜只做常数次更新，趋势窗口打开时直接读取汇总结果，与历史条数无关；
+需要时可从二进制历史日志一次顺序扫描重建。
+"""
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+
+import divination_engine
+from file_writer import atomic_write
+from history_log import LogReader
+from history_store import DATA_DIR
+
+DEFAULT_TRENDS_PATH = os.path.join(DATA_DIR, "trends.json")
+
+# 无星级信息的掌诀按中性得分计算
+NEUTRAL_SCORE = 3
+
+# 各周期保留的桶数
+WINDOWS = {"day": 30, "week": 12, "month": 12}
+
+WINDOW_LABELS = {"day": "日", "week": "周", "month": "月"}
+
+
+def fortune_score(record):
+    """由吉凶星级得出 0-5 分"""
+    if "★" in record.fortune or "☆" in record.fortune:
+        return record.fortune.count("★")
+    return NEUTRAL_SCORE
+
+
+# 各掌诀的吉凶得分，按掌诀序号索引
+ELEMENT_SCORES = tuple(fortune_score(record) for record in divination_engine.ELEMENT_CATALOG)
+
+
+# 各地时区偏移与夏令时切换都在整刻钟，本地零点（日、周、月的分界）总落在整刻钟上
+QUARTER_SECONDS = 900
+
+
+def bucket_keys(timestamp):
+    """时间戳所在的 (周期, 桶) 对：日、周、月
+
+    同一刻钟内的时间戳所在的桶相同，按刻钟缓存，重建时大量相邻记录无需逐条格式化日期。
+    """
+    return _quarter_bucket_keys(int(timestamp // QUARTER_SECONDS))
+
+
+@lru_cache(maxsize=256)
+def _quarter_bucket_keys(quarter):
+    moment = datetime.fromtimestamp(quarter * QUARTER_SECONDS)
+    year, week, _ = moment.isocalendar()
+    return (("day", moment.strftime("%Y-%m-%d")),
+            ("week", f"{year}-W{week:02d}"),
+            ("month", moment.strftime("%Y-%m")))
+
+
+class TrendEngine:
+    """增量趋势汇总"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.total = 0
+        self.score_sum = 0
+        self.element_counts = [0] * len(divination_engine.ELEMENTS)
+        # 周期 -> {桶: [次数, 得分合计]}
+        self.buckets = {period: {} for period in WINDOWS}
+        self.streak_element = None
+        self.streak_length = 0
+        self.longest_streak = [None, 0]
+        self.good_streak = 0
+        self.bad_streak = 0
+        self.longest_good = 0
+        self.longest_bad = 0
+        self.last_timestamp = None
+
+    def update(self, timestamp, final_index):
+        """记入一次占卜的最终掌诀"""
+        score = ELEMENT_SCORES[final_index]
+        self.total += 1
+        self.score_sum += score
+        self.element_counts[final_index] += 1
+        self.last_timestamp = timestamp
+
+        for period, key in bucket_keys(timestamp):
+            buckets = self.buckets[period]
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [0, 0]
+                if len(buckets) > WINDOWS[period]:
+                    del buckets[min(buckets)]
+            bucket[0] += 1
+            bucket[1] += score
+
+        if final_index == self.streak_element:
+            self.streak_length += 1
+        else:
+            self.streak_element = final_index
+            self.streak_length = 1
+        if self.streak_length > self.longest_streak[1]:
+            self.longest_streak = [final_index, self.streak_length]
+
+        self.good_streak = self.good_streak + 1 if score >= 4 else 0
+        self.bad_streak = self.bad_streak + 1 if score <= 2 else 0
+        self.longest_good = max(self.longest_good, self.good_streak)
+        self.longest_bad = max(self.longest_bad, self.bad_streak)
+
+    def rebuild(self, records):
+        """从 (时间戳, 最终掌诀序号) 序列一次顺序扫描重建汇总"""
+        self.reset()
+        for timestamp, final_index in records:
+            self.update(timestamp, final_index)
+
+    def rebuild_from_log(self, path):
+        """从二进制历史日志重建汇总（不涉及界面，可在后台线程中调用）"""
+        with LogReader(path) as reader:
+            self.rebuild((record[0], record[6]) for record in reader)
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "score_sum": self.score_sum,
+            "element_counts": self.element_counts,
+            "buckets": self.buckets,
+            "streak_element": self.streak_element,
+            "streak_length": self.streak_length,
+            "longest_streak": self.longest_streak,
+            "good_streak": self.good_streak,
+            "bad_streak": self.bad_streak,
+            "longest_good": self.longest_good,
+            "longest_bad": self.longest_bad,
+            "last_timestamp": self.last_timestamp
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        engine = cls()
+        for key, value in data.items():
+            if hasattr(engine, key):
+                setattr(engine, key, value)
+        return engine
+
+    def dumps(self):
+        """保存到文件的 JSON 文本"""
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def save(self, path=DEFAULT_TRENDS_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        atomic_write(path, self.dumps())
+
+    def behind_log(self, path):
+        """日志中是否有比汇总更新的记录（上次未正常退出、汇总没来得及保存）"""
+        with LogReader(path) as reader:
+            last = reader.last()
+        return last is not None and (self.last_timestamp is None or last[0] > int(self.last_timestamp))
+
+    @classmethod
+    def load(cls, path=DEFAULT_TRENDS_PATH):
+        """读取保存的汇总，文件不存在或损坏时返回空汇总"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def format_report(self):
+        """生成趋势分析文本"""
+        elements = divination_engine.ELEMENTS
+        if not self.total:
+            return "📭 暂无占卜记录，完成几次占卜后再来查看趋势吧。"
+
+        report = "📈 运势趋势分析\n"
+        report += "═" * 40 + "\n\n"
+        report += f"• 累计占卜：{self.total} 次\n"
+        report += f"• 平均吉凶得分：{self.score_sum / self.total:.2f} / 5\n\n"
+
+        report += "📊 最终掌诀分布\n"
+        for index in sorted(range(len(elements)), key=lambda i: -self.element_counts[i]):
+            count = self.element_counts[index]
+            if count:
+                report += f"• {elements[index]}：{count} 次（{count / self.total:.1%}）\n"
+        report += "\n"
+
+        for period, buckets in self.buckets.items():
+            report += f"🗓️ 最近各{WINDOW_LABELS[period]}平均得分\n"
+            for key in sorted(buckets, reverse=True)[:7]:
+                count, score = buckets[key]
+                report += f"• {key}：{score / count:.2f}（{count} 次）\n"
+            report += "\n"
+
+        report += "🔥 连续记录\n"
+        report += f"• 当前：{elements[self.streak_element]} 连续 {self.streak_length} 次\n"
+        longest_index, longest_length = self.longest_streak
+        report += f"• 最长：{elements[longest_index]} 连续 {longest_length} 次\n"
+        report += f"• 吉卦连续：当前 {self.good_streak} 次，最长 {self.longest_good} 次\n"
+        report += f"• 凶卦连续：当前 {self.bad_streak} 次，最长 {self.longest_bad} 次\n"
+        return report